@@ -0,0 +1,177 @@
+import argparse
+
+import numpy as np
+
+import growth_models
+import hiring_np
+from growth_models import BatchState
+from quarter import COUNTRIES, OCCUPATIONS
+from randomize_2 import get_country_weights, get_occupation_weights
+
+def initial_conditions(rng, num_companies):
+    """
+    Draws the first quarter for a batch of companies, mirroring generate_initial_conditions.
+
+    Returns:
+        tuple: (countries, occupations, capital) arrays with one row per company.
+    """
+    employees = rng.integers(3, 9, size=num_companies)
+
+    countries = np.zeros((num_companies, len(COUNTRIES)), dtype=np.int64)
+    countries[:, COUNTRIES.index("India")] = rng.binomial(employees, 0.1)
+    countries[:, COUNTRIES.index("USA")] = employees - countries[:, COUNTRIES.index("India")]
+
+    occupations = np.zeros((num_companies, len(OCCUPATIONS)), dtype=np.int64)
+    core = [OCCUPATIONS.index(o) for o in ("Software Engineering", "Sales", "Administration")]
+    occupations[:, core] = rng.multinomial(employees, [0.6, 0.3, 0.1])
+
+    capital = np.round(rng.uniform(0.5, 3.0, size=num_companies), 2)
+    return countries, occupations, capital
+
+def funding_schedule(rng, num_companies, num_quarters):
+    """
+    Picks funding-round quarters for every company, like clone_previous_quarter does for one.
+
+    Returns:
+        numpy.ndarray: Boolean array (companies, quarters), True in funding quarters.
+    """
+    funded = np.zeros((num_companies, num_quarters), dtype=bool)
+    candidates = np.arange(4, min(num_quarters, 20))
+    rounds = min(num_quarters // 5, 4)
+    if rounds and len(candidates):
+        picks = np.argsort(rng.random((num_companies, len(candidates))), axis=1)[:, :rounds]
+        funded[np.arange(num_companies)[:, None], candidates[picks]] = True
+    return funded
+
+def quarter_labels(num_quarters):
+    return [f"Q{q % 4 + 1}-{2022 + q // 4}" for q in range(num_quarters)]
+
+def simulate_batch(num_companies, growth_type="linear", num_quarters=12, seed=None, weights=None):
+    """
+    Simulates a batch of companies for every quarter at once.
+
+    Args:
+        num_companies (int): Number of trajectories to simulate.
+        growth_type (str or GrowthModel): Growth type by name, or a configured
+            model from growth_models; its batch kernel computes the hires.
+        num_quarters (int): Quarters per trajectory, including the first.
+        seed (int, optional): Seed for a reproducible batch.
+        weights (dict, optional): Hiring weight overrides, as in
+            randomize_2.simulate_quarters.
+
+    Returns:
+        dict: Columnar results. 'countries' and 'occupations' are
+            (companies, quarters, categories) arrays, 'capital', 'headcount' and
+            'funded' are (companies, quarters) arrays.
+    """
+    model = growth_models.resolve(growth_type)
+    rng = hiring_np.make_rng(seed)
+
+    weights = weights or {}
+    country_weights = get_country_weights(COUNTRIES, weights.get("countries"))
+    occupation_weights = get_occupation_weights(OCCUPATIONS, weights.get("occupations"))
+
+    countries = np.zeros((num_companies, num_quarters, len(COUNTRIES)), dtype=np.int32)
+    occupations = np.zeros((num_companies, num_quarters, len(OCCUPATIONS)), dtype=np.int32)
+    capital = np.zeros((num_companies, num_quarters))
+
+    current_countries, current_occupations, current_capital = initial_conditions(rng, num_companies)
+    funded = funding_schedule(rng, num_companies, num_quarters)
+    countries[:, 0], occupations[:, 0], capital[:, 0] = current_countries, current_occupations, current_capital
+
+    state = BatchState(rng, num_quarters, current_countries.sum(axis=1), None, None)
+
+    for i in range(1, num_quarters):
+        funded_now = funded[:, i]
+        round_size = np.round(rng.uniform(2.0, 5.0, size=num_companies) * (1 + (i / num_quarters)), 2)
+        current_capital = np.where(funded_now, np.round(current_capital + round_size, 2), current_capital)
+
+        state.total = current_countries.sum(axis=1)
+        state.multiplier = np.where(funded_now, 2.0, 1.0)
+        state.funded_now = funded_now
+        new_hires = model.new_hires(state, i)
+
+        hires = np.maximum(new_hires, 0)
+        current_countries = current_countries + hiring_np.draw_hires(rng, hires, country_weights)
+        current_occupations = current_occupations + hiring_np.draw_hires(rng, hires, occupation_weights)
+
+        departures = np.maximum(-new_hires, 0)
+        if departures.any():
+            current_countries, current_occupations = hiring_np.remove_employees(
+                rng, departures, current_countries, current_occupations, country_weights, occupation_weights)
+
+        countries[:, i], occupations[:, i], capital[:, i] = current_countries, current_occupations, current_capital
+
+    return {
+        "growth_type": model.name,
+        "quarters": quarter_labels(num_quarters),
+        "country_names": list(COUNTRIES),
+        "occupation_names": list(OCCUPATIONS),
+        "countries": countries,
+        "occupations": occupations,
+        "capital": capital,
+        "headcount": countries.sum(axis=2),
+        "funded": funded
+    }
+
+def summarize(results, percentiles=(5, 50, 95)):
+    """
+    Computes per-quarter percentile bands across all companies in a batch.
+
+    Args:
+        results (dict): Output of simulate_batch.
+        percentiles (tuple): Percentiles to report.
+
+    Returns:
+        dict: For each metric, a dict like {'p5': [...], 'p50': [...], 'p95': [...]}
+            with one value per quarter. Country and occupation bands have one
+            list per category.
+    """
+    def bands(values):
+        points = np.percentile(values, percentiles, axis=0)
+        return {f"p{p}": point.tolist() for p, point in zip(percentiles, points)}
+
+    summary = {
+        "growth_type": results["growth_type"],
+        "companies": len(results["headcount"]),
+        "quarters": results["quarters"],
+        "headcount": bands(results["headcount"]),
+        "capital": bands(results["capital"]),
+        "countries": {},
+        "occupations": {}
+    }
+    for index, country in enumerate(results["country_names"]):
+        summary["countries"][country] = bands(results["countries"][:, :, index])
+    for index, occupation in enumerate(results["occupation_names"]):
+        summary["occupations"][occupation] = bands(results["occupations"][:, :, index])
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of many companies per growth type.")
+    parser.add_argument("--growth-types", nargs="+", default=list(growth_models.MODELS))
+    parser.add_argument("--companies", type=int, default=10000)
+    parser.add_argument("--quarters", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Save the columnar results of every growth type to this .npz file")
+    parser.add_argument("-p", "--param", action="append", metavar="TYPE.PARAM=VALUE",
+                        help="Override a growth model parameter, e.g. logistic.carrying_capacity=200")
+    args = parser.parse_args()
+
+    try:
+        params = growth_models.parse_params(args.param)
+        models = [growth_models.get_model(g, **params.get(g, {})) for g in args.growth_types]
+    except ValueError as e:
+        parser.error(str(e))
+
+    arrays = {}
+    for growth_type, model in zip(args.growth_types, models):
+        results = simulate_batch(args.companies, model, args.quarters, args.seed)
+        bands = summarize(results)["headcount"]
+        print(f"{growth_type}: final headcount p5={bands['p5'][-1]:.0f} "
+              f"p50={bands['p50'][-1]:.0f} p95={bands['p95'][-1]:.0f}")
+        for key in ("countries", "occupations", "capital", "funded"):
+            arrays[f"{growth_type}/{key}"] = results[key]
+
+    if args.output:
+        np.savez(args.output, **arrays)
+        print(f"Saved results to {args.output}")
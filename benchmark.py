@@ -0,0 +1,334 @@
+import argparse
+import io
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import randomize_2
+import rev
+from quarter import COUNTRIES, OCCUPATIONS
+
+DEFAULT_GROWTH_TYPES = ["linear", "exponential", "acquisition", "linear_to_exponential"]
+# The hiring comparison also covers shrinking companies, where departures get clamped at zero
+HIRING_GROWTH_TYPES = DEFAULT_GROWTH_TYPES + ["decline", "failure", "exponential_to_decline"]
+
+def make_seed_quarter(employees=5, capital=1.5):
+    """
+    Builds a first quarter with the given headcount, split evenly across USA and India
+    and across Software Engineering, Sales and Administration.
+    """
+    countries = {country: 0 for country in COUNTRIES}
+    occupations = {occupation: 0 for occupation in OCCUPATIONS}
+    for i in range(employees):
+        countries[["USA", "India"][i % 2]] += 1
+        occupations[["Software Engineering", "Sales", "Administration"][i % 3]] += 1
+    return {"Quarter": "Q1-2022", "Countries": countries, "Occupations": occupations, "Capital": capital}
+
+def run_engine(engine, growth_type, num_quarters, seed, employees=5):
+    """
+    Runs one scenario through clone_previous_quarter and returns the final quarter.
+    """
+    data = [make_seed_quarter(employees)] + [{} for _ in range(num_quarters - 1)]
+    randomize_2.clone_previous_quarter(data, growth_type, engine=engine, seed=seed)
+    return data[-1]
+
+def bench_hiring(growth_types, num_quarters=40, runs=20, engines=("python", "alias", "numpy")):
+    """
+    Times the hiring engines against each other and compares their statistics.
+
+    All engines are run with the same seeds. The python engine shares its
+    random stream with the growth model, so runs differ seed by seed, but the
+    headcount statistics of every engine should agree.
+
+    Returns:
+        list: One result dict per (growth type, engine).
+    """
+    results = []
+    for growth_type in growth_types:
+        for engine in engines:
+            run_engine(engine, growth_type, num_quarters, seed=0)  # Warm up imports and caches
+            start = time.perf_counter()
+            finals = [run_engine(engine, growth_type, num_quarters, seed) for seed in range(runs)]
+            elapsed = time.perf_counter() - start
+
+            headcounts = [sum(q["Countries"].values()) for q in finals]
+            total = sum(headcounts) or 1
+            results.append({
+                "growth_type": growth_type,
+                "engine": engine,
+                "quarters": num_quarters,
+                "runs": runs,
+                "seconds_per_run": elapsed / runs,
+                "mean_headcount": statistics.mean(headcounts),
+                "usa_share": sum(q["Countries"]["USA"] for q in finals) / total,
+                "engineering_share": sum(q["Occupations"]["Software Engineering"] for q in finals) / total,
+                "balanced": all(sum(q["Countries"].values()) == sum(q["Occupations"].values()) for q in finals)
+            })
+    return results
+
+def print_results(results):
+    print(f"{'growth type':<24}{'engine':<8}{'ms/run':>10}{'headcount':>11}{'USA':>7}{'SWE':>7}  balanced")
+    for r in results:
+        print(f"{r['growth_type']:<24}{r['engine']:<8}{r['seconds_per_run'] * 1000:>10.2f}"
+              f"{r['mean_headcount']:>11.1f}{r['usa_share']:>7.3f}{r['engineering_share']:>7.3f}  {r['balanced']}")
+
+def measure(func, repeat=3):
+    """
+    Times func and records its peak traced memory.
+
+    An untimed first run pays for lazy imports (numpy, the engines) and cold
+    caches, so even repeat=1 times the steady state. The timed runs are
+    untraced; one extra run under tracemalloc measures the peak, since
+    tracing itself slows Python allocations down considerably.
+
+    Returns:
+        tuple: (best seconds over repeat runs, peak bytes allocated during one run).
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+def make_corpus(directory, growth_types, corpus_size, num_quarters, seed=0):
+    """
+    Writes corpus_size priced scenarios per growth type into directory.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        randomize_2.generate_parallel([(g, corpus_size) for g in growth_types], master_seed=seed, workers=1,
+                                      num_quarters=num_quarters, output_dir=directory)
+        rev.process_directory(directory, verbose=False)
+
+def bench_clone_previous_quarter(growth_type, quarters, size, engine="python"):
+    def run():
+        for seed in range(5):
+            run_engine(engine, growth_type, quarters, seed, employees=size)
+    return run, 5 * (quarters - 1), "quarters"
+
+def bench_generate_initial_conditions(growth_type, quarters, corpus):
+    directory = tempfile.mkdtemp(prefix="bench-generate-")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            randomize_2.generate_initial_conditions(corpus, growth_type, seed=0, num_quarters=quarters,
+                                                    output_dir=directory)
+    return run, corpus, "scenarios", directory
+
+def bench_calculate_revenue(quarters, size, engine="python"):
+    stack = []
+    for seed in range(10):
+        data = [make_seed_quarter(size)] + [{} for _ in range(quarters - 1)]
+        randomize_2.clone_previous_quarter(data, "linear", seed=seed)
+        stack.extend(data)
+
+    def run():
+        # Time the pricing itself, not lookups in the cache the previous repeat filled
+        rev.clear_revenue_cache()
+        rev.price_quarters(stack, engine)
+    return run, len(stack), "quarters"
+
+def bench_update_json_files(growth_type, quarters, corpus, engine="python"):
+    directory = tempfile.mkdtemp(prefix="bench-revenue-")
+    make_corpus(directory, [growth_type], corpus, quarters)
+    json_files = rev.list_json_files(directory)
+
+    def run():
+        rev.clear_revenue_cache()
+        rev.update_json_files(json_files, engine, verbose=False)
+    return run, len(json_files), "files", directory
+
+def bench_api_data(quarters, corpus, requests=200):
+    import run as webapp
+
+    directory = tempfile.mkdtemp(prefix="bench-api-")
+    make_corpus(directory, ["quadratic"], corpus, quarters)
+    original_cache = webapp.scenario_cache
+    webapp.scenario_cache = webapp.ScenarioCache(directory)
+    webapp.scenario_cache.load_all()
+    client = webapp.app.test_client()
+
+    def run():
+        for _ in range(requests):
+            response = client.get('/api/data')
+            assert response.status_code == 200
+
+    def restore():
+        webapp.scenario_cache = original_cache
+        shutil.rmtree(directory, ignore_errors=True)
+    return run, requests, "requests", restore
+
+def run_suite(suites, growth_types, quarter_counts, sizes, corpus_sizes, repeat=3, verbose=True):
+    """
+    Runs the selected benchmarks over every combination of their parameters.
+
+    Args:
+        suites (list): Any of "generation", "revenue", "api".
+        growth_types (list): Growth types for generation and revenue benchmarks.
+        quarter_counts (list): Scenario horizons.
+        sizes (list): Initial company headcounts.
+        corpus_sizes (list): Scenarios per corpus.
+        repeat (int): Timed runs per benchmark; the best is reported.
+
+    Returns:
+        list: One result dict per benchmark and parameter combination, with
+            'seconds', 'throughput' (items per second), 'unit' and 'peak_memory_bytes'.
+    """
+    cases = []
+    for quarters in quarter_counts:
+        if "generation" in suites:
+            for growth_type in growth_types:
+                for size in sizes:
+                    for engine in ("python", "numpy"):
+                        cases.append(("clone_previous_quarter",
+                                      {"growth_type": growth_type, "quarters": quarters, "size": size, "engine": engine},
+                                      bench_clone_previous_quarter))
+                for corpus in corpus_sizes:
+                    cases.append(("generate_initial_conditions",
+                                  {"growth_type": growth_type, "quarters": quarters, "corpus": corpus},
+                                  bench_generate_initial_conditions))
+        if "revenue" in suites:
+            for size in sizes:
+                for engine in ("python", "numpy"):
+                    cases.append(("calculate_revenue", {"quarters": quarters, "size": size, "engine": engine},
+                                  bench_calculate_revenue))
+            for growth_type in growth_types:
+                for corpus in corpus_sizes:
+                    for engine in ("python", "numpy"):
+                        cases.append(("update_json_files",
+                                      {"growth_type": growth_type, "quarters": quarters, "corpus": corpus, "engine": engine},
+                                      bench_update_json_files))
+        if "api" in suites:
+            for corpus in corpus_sizes:
+                cases.append(("api_data", {"quarters": quarters, "corpus": corpus}, bench_api_data))
+
+    results = []
+    for name, params, factory in cases:
+        setup = factory(**params)
+        func, items, unit = setup[:3]
+        cleanup = setup[3] if len(setup) > 3 else None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds, peak = measure(func, repeat)
+        finally:
+            if callable(cleanup):
+                cleanup()
+            elif cleanup:
+                shutil.rmtree(cleanup, ignore_errors=True)
+
+        result = {
+            "benchmark": name,
+            "params": params,
+            "seconds": seconds,
+            "throughput": items / seconds if seconds > 0 else float("inf"),
+            "unit": f"{unit}/s",
+            "peak_memory_bytes": peak
+        }
+        results.append(result)
+        if verbose:
+            print(format_result(result))
+    return results
+
+def format_result(result):
+    params = " ".join(f"{k}={v}" for k, v in result["params"].items())
+    return (f"{result['benchmark']:<28}{params:<64}{result['throughput']:>14,.1f} {result['unit']:<12}"
+            f"{result['peak_memory_bytes'] / 1024:>10,.0f} KiB")
+
+def result_key(result):
+    return result["benchmark"] + json.dumps(result["params"], sort_keys=True)
+
+def compare(baseline, results, threshold=0.1):
+    """
+    Compares throughput and peak memory against a baseline run.
+
+    Args:
+        baseline (list): Results of an earlier run.
+        results (list): Results of this run.
+        threshold (float): Relative throughput drop reported as a regression.
+
+    Returns:
+        list: (result, throughput ratio, memory ratio, regressed) for results present in both runs.
+    """
+    previous = {result_key(r): r for r in baseline}
+    comparison = []
+    for result in results:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        speed = result["throughput"] / before["throughput"] if before["throughput"] else float("inf")
+        memory = result["peak_memory_bytes"] / before["peak_memory_bytes"] if before["peak_memory_bytes"] else 1.0
+        comparison.append((result, speed, memory, speed < 1 - threshold))
+    return comparison
+
+def write_report(path, results, hiring=()):
+    """
+    Writes suite results, and the hiring engine comparison if it ran, as JSON.
+    """
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+        "hiring": list(hiring)
+    }
+    rev.write_json_atomic(path, report)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scenario generation, revenue pricing and API serving.")
+    parser.add_argument("suites", nargs="*", metavar="suite",
+                        help="Benchmarks to run (default: generation revenue api); hiring compares the hiring engines")
+    parser.add_argument("--growth-types", nargs="+",
+                        help=f"Growth types to benchmark (default: {' '.join(DEFAULT_GROWTH_TYPES)}; "
+                             "the hiring comparison adds decline, failure and exponential_to_decline)")
+    parser.add_argument("--quarters", type=int, nargs="+", default=[12, 40])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50], help="Initial company headcounts")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[10], help="Scenarios per corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--runs", type=int, default=20, help="Scenarios per engine in the hiring comparison")
+    parser.add_argument("-o", "--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results from an earlier --output file")
+    args = parser.parse_args()
+    args.suites = args.suites or ["generation", "revenue", "api"]
+    unknown = set(args.suites) - {"generation", "revenue", "api", "hiring"}
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))} (choose from generation, revenue, api, hiring)")
+
+    hiring = []
+    if "hiring" in args.suites:
+        for quarters in args.quarters:
+            hiring_results = bench_hiring(args.growth_types or HIRING_GROWTH_TYPES, quarters, args.runs)
+            print_results(hiring_results)
+            hiring.extend(hiring_results)
+
+    suites = [s for s in args.suites if s != "hiring"]
+    results = run_suite(suites, args.growth_types or DEFAULT_GROWTH_TYPES, args.quarters, args.sizes, args.corpus_sizes, args.repeat) if suites else []
+
+    if args.output:
+        write_report(args.output, results, hiring)
+        print(f"Wrote {len(results) + len(hiring)} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)["results"]
+        regressions = 0
+        for result, speed, memory, regressed in compare(baseline, results):
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{format_result(result)}  speed x{speed:.2f}  memory x{memory:.2f}{flag}")
+        print(f"{regressions} regressions against {args.compare}")
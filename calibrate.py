@@ -0,0 +1,301 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+import batch
+import growth_models
+import rev
+import stream
+
+# Starting grid of every growth type; refinement then moves around the best points
+SEARCH_SPACES = {
+    "linear": {"hires": [(0, 2), (1, 3), (2, 5), (3, 8), (5, 12), (8, 20)]},
+    "quadratic": {"divisor": [2, 4, 6, 10, 15, 25, 40]},
+    "exponential": {"rate": [(0.02, 0.08), (0.05, 0.15), (0.1, 0.3), (0.2, 0.4), (0.3, 0.6)]},
+    "bell_curve": {"peak": [0.2, 0.35, 0.5, 0.65, 0.8]},
+    "logistic": {"carrying_capacity": [50, 100, 200, 400, 800], "rate": [0.1, 0.2, 0.35, 0.5]},
+    "cyclic": {"period": [4, 8, 12, 20], "divisor": [5, 10, 20]},
+    "stagnation-growth": {"spurt_every": [2, 3, 4, 6]},
+    "decline": {"growth_until": [0.2, 0.3, 0.4], "slowdown_until": [0.5, 0.7], "max_decline": [0.02, 0.05, 0.1]},
+    "acquisition": {"acquisition_at": [0.3, 0.5, 0.7], "min_acquired": [5, 10, 25, 50]},
+    "failure": {"failure_at": [0.3, 0.5, 0.7, 0.9], "hires": [(1, 3), (2, 6)]},
+    "piecewise_funding": {"post_funding_quarters": [1, 2, 3, 5]},
+    "linear_to_exponential": {"transition": [0.2, 0.4, 0.6], "base_rate": [0.05, 0.1], "max_rate": [0.2, 0.3, 0.45]},
+    "exponential_to_decline": {"peak": [0.3, 0.5, 0.7], "decline": [0.6, 0.8]}
+}
+
+# Refinement multiplies or divides one parameter at a time by the step,
+# and takes the square root of the step whenever a round brings no improvement
+INITIAL_STEP = 1.25
+
+def load_target(filename):
+    """
+    Reads a target headcount trajectory.
+
+    Accepts a scenario file (.json array or .jsonl of quarter dicts, whose
+    headcount is the sum of Countries), a JSON array of numbers, or a text
+    file with one headcount per line, optionally as "label,headcount".
+
+    Returns:
+        list: Headcount per quarter, starting at the first quarter.
+    """
+    if filename.endswith((".json",) + stream.JSON_LINES_EXTENSIONS):
+        values = list(stream.iter_quarters(filename))
+    else:
+        with open(filename, 'r') as file:
+            values = [line.rsplit(",", 1)[-1].strip() for line in file if line.strip()]
+        if values and not values[0].replace(".", "", 1).isdigit():
+            values = values[1:]  # Header row
+        values = [float(value) for value in values]
+
+    target = [sum(value.get("Countries", {}).values()) if isinstance(value, dict) else value for value in values]
+    if len(target) < 2:
+        raise ValueError(f"{filename}: a target needs at least two quarters")
+    return target
+
+def candidate_key(growth_type, params):
+    """Hashable identity of a (growth_type, params) candidate."""
+    return growth_type, tuple(sorted(params.items()))
+
+def grid_candidates(growth_types):
+    """
+    Yields the (growth_type, params) pairs of the starting grid.
+
+    Growth types without a search space contribute their default parameters.
+    """
+    for growth_type in growth_types:
+        space = SEARCH_SPACES.get(growth_type, {})
+        names = list(space)
+        for values in itertools.product(*(space[name] for name in names)):
+            yield growth_type, dict(zip(names, values))
+
+def _scale(value, factor, minimum):
+    if isinstance(value, tuple):
+        return tuple(_scale(v, factor, 0) for v in value)
+    if isinstance(value, int):
+        scaled = round(value * factor)
+        if scaled == value:
+            # Small integers would never move otherwise
+            scaled = value + (1 if factor > 1 else -1)
+        return max(minimum, scaled)
+    # Float parameters are fractions of the horizon, probabilities or rates
+    return round(min(0.99, max(0.01, value * factor)), 4)
+
+def neighbours(growth_type, params, step):
+    """
+    Yields the candidates one step away from params, one parameter at a time.
+    """
+    for name, value in params.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float, tuple)):
+            continue
+        for factor in (1 / step, step):
+            moved = _scale(value, factor, 1)
+            if moved != value:
+                yield growth_type, {**params, name: moved}
+
+def score(target, headcount):
+    """
+    Scores simulated trajectories against a target.
+
+    Errors are taken on log(1 + headcount), so a miss by 10% weighs the same
+    for a 20-person startup as for a 2,000-person company.
+
+    Args:
+        target (list): Target headcount per quarter.
+        headcount (numpy.ndarray): Simulated headcount, (companies, quarters).
+
+    Returns:
+        dict: 'loss', the mean over companies of each trajectory's root mean
+            squared log error (what the search minimizes); 'median_error', the
+            same error for the median trajectory; 'coverage', the share of
+            target quarters inside the simulated 5-95% band; and the 'median'
+            trajectory.
+    """
+    target = np.log1p(np.asarray(target, dtype=float))
+    simulated = np.log1p(headcount.astype(float))
+    errors = np.sqrt(np.mean((simulated - target) ** 2, axis=1))
+    low, median, high = np.percentile(headcount, (5, 50, 95), axis=0)
+    return {
+        "loss": float(errors.mean()),
+        "median_error": float(np.sqrt(np.mean((np.log1p(median) - target) ** 2))),
+        "coverage": float(np.mean((np.expm1(target) >= low) & (np.expm1(target) <= high))),
+        "median": median.tolist()
+    }
+
+def evaluate(candidate, target, companies=256, seed=0):
+    """
+    Simulates one candidate with batch.simulate_batch and scores it.
+
+    Every candidate is simulated with the same seed (common random numbers),
+    so differences in score come from the parameters rather than from the
+    luck of the draw.
+
+    Returns:
+        dict: 'growth_type', 'params' and the score, or an 'error' and an
+            infinite loss if the parameters can't be simulated.
+    """
+    growth_type, params = candidate
+    result = {"growth_type": growth_type, "params": params}
+    try:
+        model = growth_models.get_model(growth_type, **params)
+        headcount = batch.simulate_batch(companies, model, len(target), seed)["headcount"]
+    except (ValueError, ZeroDivisionError, OverflowError) as e:
+        result.update(loss=float("inf"), error=f"{type(e).__name__}: {e}")
+        return result
+    result.update(score(target, headcount))
+    return result
+
+class Calibrator:
+    """
+    Fits growth types and parameters to a target trajectory.
+
+    Candidates are simulated in batches across a process pool. Results are
+    cached by candidate, so a candidate reached again during refinement (or
+    in a later run, with a cache file) is never simulated twice.
+    """
+
+    def __init__(self, target, companies=256, seed=0, workers=None, cache_file=None):
+        self.target = [float(value) for value in target]
+        self.companies = companies
+        self.seed = seed
+        self.workers = workers
+        self.cache_file = cache_file
+        self.simulated = 0
+        # Results only apply to this target, size and seed
+        self._context = hashlib.sha256(json.dumps([self.target, companies, seed]).encode()).hexdigest()[:16]
+        self._results = {}
+        if cache_file:
+            self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as file:
+                cached = json.load(file)
+        except (OSError, ValueError):
+            return
+        for entry in cached:
+            if entry.get("context") != self._context:
+                continue
+            params = {name: tuple(value) if isinstance(value, list) else value
+                      for name, value in entry["result"]["params"].items()}
+            result = dict(entry["result"], params=params)
+            self._results[candidate_key(result["growth_type"], params)] = result
+
+    def save_cache(self):
+        if not self.cache_file:
+            return
+        entries = [{"context": self._context, "result": result} for result in self._results.values()
+                   if "error" not in result]
+        try:
+            with open(self.cache_file, 'r') as file:
+                entries += [entry for entry in json.load(file) if entry.get("context") != self._context]
+        except (OSError, ValueError):
+            pass
+        rev.write_json_atomic(self.cache_file, entries, indent=None)
+
+    def evaluate(self, candidates):
+        """
+        Returns the results of candidates, simulating only the ones not seen before.
+        """
+        keys = [candidate_key(*candidate) for candidate in candidates]
+        pending = list({key: candidate for key, candidate in zip(keys, candidates)
+                        if key not in self._results}.items())
+        if pending:
+            work = partial(evaluate, target=self.target, companies=self.companies, seed=self.seed)
+            if self.workers == 1:
+                results = map(work, (candidate for _, candidate in pending))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    chunksize = max(1, len(pending) // ((self.workers or os.cpu_count() or 1) * 4))
+                    results = list(executor.map(work, (candidate for _, candidate in pending), chunksize=chunksize))
+            for (key, _), result in zip(pending, results):
+                self._results[key] = result
+            self.simulated += len(pending)
+        return [self._results[key] for key in keys]
+
+    def fit(self, growth_types=None, rounds=4, top=5, verbose=False):
+        """
+        Searches the starting grid, then refines the best candidates.
+
+        Args:
+            growth_types (list, optional): Growth types to consider; all by default.
+            rounds (int): Refinement rounds after the grid.
+            top (int): Candidates refined in each round.
+            verbose (bool): Print progress.
+
+        Returns:
+            list: Every evaluated candidate's result, best (lowest loss) first.
+        """
+        growth_types = list(growth_types or growth_models.MODELS)
+        start = time.perf_counter()
+        self.evaluate(list(grid_candidates(growth_types)))
+        best = self.ranked()[0]["loss"] if self._results else float("inf")
+        if verbose:
+            print(f"Grid: {self.simulated} candidates, best loss {best:.4f} ({time.perf_counter() - start:.1f}s)")
+
+        step = INITIAL_STEP
+        for round_number in range(1, rounds + 1):
+            leaders = [r for r in self.ranked() if r["growth_type"] in growth_types][:top]
+            self.evaluate([neighbour for r in leaders for neighbour in neighbours(r["growth_type"], r["params"], step)])
+            new_best = self.ranked()[0]["loss"]
+            if verbose:
+                print(f"Round {round_number} (step {step:.3f}): {self.simulated} candidates, "
+                      f"best loss {new_best:.4f} ({time.perf_counter() - start:.1f}s)")
+            if new_best >= best:
+                step = step ** 0.5
+            best = min(best, new_best)
+        return self.ranked()
+
+    def ranked(self):
+        """All results so far, best first."""
+        return sorted(self._results.values(), key=lambda result: result["loss"])
+
+def params_to_cli(growth_type, params):
+    """The randomize_2.py -p options that reproduce a candidate."""
+    return " ".join(f"-p {growth_type}.{name}={json.dumps(list(value) if isinstance(value, tuple) else value, separators=(',', ':'))}"
+                    for name, value in params.items())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the growth type and parameters that best reproduce a headcount trajectory.")
+    parser.add_argument("target", help="Scenario file, JSON array of headcounts, or text file with one headcount per line")
+    parser.add_argument("--growth-types", nargs="+", default=list(growth_models.MODELS), help="Growth types to fit (default: all)")
+    parser.add_argument("--companies", type=int, default=256, help="Simulated companies per candidate (default: 256)")
+    parser.add_argument("--rounds", type=int, default=4, help="Refinement rounds after the grid search (default: 4)")
+    parser.add_argument("--top", type=int, default=5, help="Candidates refined per round and shown (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed shared by every candidate (default: 0)")
+    parser.add_argument("-w", "--workers", type=int, default=0, help="Worker processes, 0 for one per CPU (default: 0)")
+    parser.add_argument("--cache", help="JSON file keeping evaluated candidates across runs")
+    parser.add_argument("--output", help="Write every evaluated candidate, best first, to this JSON file")
+    args = parser.parse_args()
+
+    unknown = [g for g in args.growth_types if g not in growth_models.MODELS]
+    if unknown:
+        parser.error(f"Unknown growth types: {', '.join(unknown)}")
+    try:
+        target = load_target(args.target)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    calibrator = Calibrator(target, args.companies, args.seed, args.workers or None, args.cache)
+    start = time.perf_counter()
+    ranked = calibrator.fit(args.growth_types, args.rounds, args.top, verbose=True)
+    calibrator.save_cache()
+
+    print(f"Simulated {calibrator.simulated} candidates for a {len(target)}-quarter target "
+          f"in {time.perf_counter() - start:.1f}s")
+    for result in ranked[:args.top]:
+        print(f"{result['loss']:8.4f}  coverage {result['coverage']:4.0%}  {result['growth_type']:<24}"
+              f"{params_to_cli(result['growth_type'], result['params'])}")
+
+    if args.output:
+        rows = [dict(result, params={name: list(value) if isinstance(value, tuple) else value
+                                     for name, value in result["params"].items()})
+                for result in ranked]
+        rev.write_json_atomic(args.output, rows)
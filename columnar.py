@@ -0,0 +1,229 @@
+import argparse
+import glob
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from scenario_index import scenario_name
+
+# Float columns; absent values are stored as NaN
+METRIC_COLUMNS = ["Capital", "Revenue", "RevenueMin", "RevenueMax", "RevenuePerEmployee", "CapitalToRevenueRatio"]
+INTEGER_METRICS = {"Revenue", "RevenueMin", "RevenueMax", "RevenuePerEmployee"}
+
+# Funding flags set by the piecewise_funding model; -1 means the key is absent
+FLAG_COLUMNS = ["JustFunded", "PostFunding"]
+
+def _column_names(prefix, names):
+    return [f"{prefix}.{name}" for name in names]
+
+def scenarios_to_table(scenarios):
+    """
+    Flattens scenarios into a columnar table with one row per (scenario, quarter).
+
+    Scenario names and quarter labels are stored once and referenced by integer
+    codes. Every country and occupation gets its own integer column, e.g.
+    'Countries.USA', and capital and revenue metrics are float columns.
+
+    Args:
+        scenarios (dict): Scenario name -> list of quarter dicts.
+
+    Returns:
+        dict: Column name -> numpy array.
+    """
+    quarters = [(name, index, q) for name, data in scenarios.items() for index, q in enumerate(data)]
+    country_names = list(dict.fromkeys(c for _, _, q in quarters for c in q.get("Countries", {})))
+    occupation_names = list(dict.fromkeys(o for _, _, q in quarters for o in q.get("Occupations", {})))
+    scenario_names = list(scenarios)
+    labels = list(dict.fromkeys(q.get("Quarter", "") for _, _, q in quarters))
+    scenario_codes = {name: code for code, name in enumerate(scenario_names)}
+    label_codes = {label: code for code, label in enumerate(labels)}
+
+    table = {
+        "scenario_names": np.array(scenario_names, dtype=str),
+        "quarter_labels": np.array(labels, dtype=str),
+        "country_names": np.array(country_names, dtype=str),
+        "occupation_names": np.array(occupation_names, dtype=str),
+        "scenario": np.array([scenario_codes[name] for name, _, _ in quarters], dtype=np.int32),
+        "quarter_index": np.array([index for _, index, _ in quarters], dtype=np.int32),
+        "quarter": np.array([label_codes[q.get("Quarter", "")] for _, _, q in quarters], dtype=np.int32)
+    }
+    for column, country in zip(_column_names("Countries", country_names), country_names):
+        table[column] = np.array([q["Countries"].get(country, 0) for _, _, q in quarters], dtype=np.int32)
+    for column, occupation in zip(_column_names("Occupations", occupation_names), occupation_names):
+        table[column] = np.array([q["Occupations"].get(occupation, 0) for _, _, q in quarters], dtype=np.int32)
+    for column in METRIC_COLUMNS:
+        table[column] = np.array([q.get(column, np.nan) for _, _, q in quarters], dtype=float)
+    for column in FLAG_COLUMNS:
+        table[column] = np.array([int(q.get(column, -1)) for _, _, q in quarters], dtype=np.int8)
+    return table
+
+def table_to_scenarios(table):
+    """
+    Rebuilds the JSON shape of every scenario from a columnar table.
+
+    Returns:
+        dict: Scenario name -> list of quarter dicts, in table order.
+    """
+    scenario_names = table["scenario_names"].tolist()
+    labels = table["quarter_labels"].tolist()
+    country_names = table["country_names"].tolist()
+    occupation_names = table["occupation_names"].tolist()
+    countries = np.stack([table[c] for c in _column_names("Countries", country_names)], axis=1).tolist()
+    occupations = np.stack([table[o] for o in _column_names("Occupations", occupation_names)], axis=1).tolist()
+    metrics = {column: table[column].tolist() for column in METRIC_COLUMNS}
+    flags = {column: table[column].tolist() for column in FLAG_COLUMNS}
+
+    scenarios = {name: [] for name in scenario_names}
+    for row, (code, label) in enumerate(zip(table["scenario"].tolist(), table["quarter"].tolist())):
+        quarter = {
+            "Quarter": labels[label],
+            "Countries": dict(zip(country_names, countries[row])),
+            "Occupations": dict(zip(occupation_names, occupations[row])),
+            "Capital": metrics["Capital"][row]
+        }
+        if flags["JustFunded"][row] >= 0:
+            quarter["JustFunded"] = bool(flags["JustFunded"][row])
+        if flags["PostFunding"][row] >= 0:
+            quarter["PostFunding"] = flags["PostFunding"][row]
+        for column in METRIC_COLUMNS[1:]:
+            value = metrics[column][row]
+            if value != value:  # NaN, i.e. not priced yet
+                continue
+            if column in INTEGER_METRICS:
+                value = int(value)
+            elif column == "CapitalToRevenueRatio" and not metrics["Revenue"][row] > 0:
+                value = 0  # calculate_revenue returns an int 0 when there is no revenue
+            quarter[column] = value
+        scenarios[scenario_names[code]].append(quarter)
+    return scenarios
+
+def headcount_matrices(table):
+    """
+    Returns (countries, occupations) as (rows, categories) integer matrices.
+    """
+    countries = np.stack([table[c] for c in _column_names("Countries", table["country_names"].tolist())], axis=1)
+    occupations = np.stack([table[o] for o in _column_names("Occupations", table["occupation_names"].tolist())], axis=1)
+    return countries, occupations
+
+def write_table(path, table):
+    """
+    Writes a table atomically as .npz, or as .parquet when pyarrow is installed.
+
+    Args:
+        path (str): Destination; the extension selects the format.
+        table (dict): Column name -> numpy array.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            if path.endswith(".parquet"):
+                _write_parquet(file, table)
+            else:
+                np.savez_compressed(file, **table)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def read_table(path):
+    """
+    Reads a table written by write_table.
+
+    Returns:
+        dict: Column name -> numpy array.
+    """
+    if path.endswith(".parquet"):
+        return _read_parquet(path)
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+# Parquet columns must all have one length, so the name lists go into the schema metadata
+_LOOKUP_COLUMNS = ["scenario_names", "quarter_labels", "country_names", "occupation_names"]
+
+def import_pyarrow():
+    """
+    Imports pyarrow for Parquet files.
+
+    Raises:
+        ImportError: With a hint to use .npz instead if pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet support requires pyarrow; use a .npz path or install pyarrow") from None
+    return pyarrow
+
+def _write_parquet(file, table):
+    pa = import_pyarrow()
+    metadata = {name: json.dumps(table[name].tolist()) for name in _LOOKUP_COLUMNS}
+    columns = {name: values for name, values in table.items() if name not in _LOOKUP_COLUMNS}
+    pa.parquet.write_table(pa.table(columns).replace_schema_metadata(metadata), file)
+
+def _read_parquet(path):
+    pa = import_pyarrow()
+    arrow_table = pa.parquet.read_table(path)
+    metadata = arrow_table.schema.metadata
+    table = {name: arrow_table.column(name).to_numpy() for name in arrow_table.column_names}
+    for name in _LOOKUP_COLUMNS:
+        table[name] = np.array(json.loads(metadata[name.encode()]), dtype=str)
+    return table
+
+def json_to_columnar(json_files, path):
+    """
+    Converts scenario JSON files into one columnar file.
+
+    Args:
+        json_files (list): Scenario JSON filenames.
+        path (str): Destination .npz or .parquet file.
+
+    Returns:
+        int: Number of rows written.
+    """
+    scenarios = {}
+    for filename in sorted(json_files):
+        with open(filename, 'r') as file:
+            scenarios[scenario_name(filename)] = json.load(file)
+    table = scenarios_to_table(scenarios)
+    write_table(path, table)
+    return len(table["scenario"])
+
+def columnar_to_json(path, output_dir=".", indent=4):
+    """
+    Writes every scenario in a columnar file back out as <scenario>.json.
+
+    Returns:
+        list: Written filenames.
+    """
+    filenames = []
+    for name, data in table_to_scenarios(read_table(path)).items():
+        filename = os.path.join(output_dir, f"{name}.json")
+        with open(filename, 'w') as file:
+            json.dump(data, file, indent=indent)
+        filenames.append(filename)
+    return filenames
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert scenarios between JSON files and a columnar file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    to_columnar = subparsers.add_parser("to-columnar", help="Pack saas_growth_*.json files into one .npz/.parquet file")
+    to_columnar.add_argument("directory", help="Directory containing scenario JSON files")
+    to_columnar.add_argument("output", help="Destination .npz or .parquet file")
+
+    to_json = subparsers.add_parser("to-json", help="Unpack a columnar file into one JSON file per scenario")
+    to_json.add_argument("input", help="Source .npz or .parquet file")
+    to_json.add_argument("output_dir", nargs="?", default=".", help="Directory to write JSON files to (default: .)")
+
+    args = parser.parse_args()
+    if args.command == "to-columnar":
+        rows = json_to_columnar(glob.glob(os.path.join(args.directory, "saas_growth_*.json")), args.output)
+        print(f"Wrote {rows} scenario quarters to {args.output}")
+    else:
+        os.makedirs(args.output_dir, exist_ok=True)
+        filenames = columnar_to_json(args.input, args.output_dir)
+        print(f"Wrote {len(filenames)} scenarios to {args.output_dir}")
@@ -0,0 +1,518 @@
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+class ScenarioState:
+    """
+    State of one company handed to a growth model by the reference engine.
+
+    Attributes:
+        rng: random module or random.Random instance; models draw from it directly.
+        num_quarters (int): Length of the scenario.
+        total (int): Headcount at the end of the previous quarter.
+        multiplier (float): 2.0 in funding quarters, 1.0 otherwise.
+        funded_now (bool): Whether a funding round closes this quarter.
+        record (Quarter): The quarter being built; models keep funding state on it.
+    """
+
+    __slots__ = ("rng", "num_quarters", "total", "multiplier", "funded_now", "record")
+
+    def __init__(self, rng, num_quarters):
+        self.rng = rng
+        self.num_quarters = num_quarters
+        self.total = 0
+        self.multiplier = 1.0
+        self.funded_now = False
+        self.record = None
+
+class BatchState:
+    """
+    Array-backed state for a batch of companies at one point in the simulation.
+
+    Every per-company field is an array with one entry per company, so a growth
+    model can compute a whole quarter's hiring for the batch at once.
+    """
+
+    def __init__(self, rng, num_quarters, total, multiplier, funded_now):
+        import numpy as np
+        self.rng = rng
+        self.num_quarters = num_quarters
+        self.total = total
+        self.multiplier = multiplier
+        self.funded_now = funded_now
+        self.just_funded = np.zeros(len(total), dtype=bool)
+        self.post_funding = np.zeros(len(total), dtype=np.int64)
+
+    @property
+    def size(self):
+        return len(self.total)
+
+    def randint(self, low, high):
+        """Inclusive per-company random integers, like random.randint."""
+        import numpy as np
+        return self.rng.integers(low, np.asarray(high) + 1, size=self.size)
+
+    def uniform(self, low, high):
+        return self.rng.uniform(low, high, size=self.size)
+
+def _trunc(values):
+    # int() in the reference engine truncates toward zero
+    import numpy as np
+    return np.trunc(values).astype(np.int64)
+
+class GrowthModel:
+    """
+    Base class of the growth models.
+
+    A model turns a company's state into the net number of hires in one
+    quarter; negative values are departures. Parameters are set per instance,
+    with defaults in the class's `defaults` dict, and are available as
+    attributes.
+
+    Subclasses implement two kernels over the same parameters:
+
+    - new_hires_scalar(state, i) for one company (ScenarioState) in the
+      reference engine, drawing from the python random stream;
+    - new_hires(state, i) for a whole batch (BatchState) in batch.simulate_batch,
+      returning one integer per company.
+
+    i is the index of the quarter being simulated; quarter 0 is the first.
+    """
+
+    name = None
+    defaults = {}
+
+    def __init__(self, **params):
+        unknown = set(params) - set(self.defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameters for growth type {self.name}: {', '.join(sorted(unknown))}")
+        self.params = {**self.defaults, **params}
+        for key, value in self.params.items():
+            setattr(self, key, value)
+
+    def new_hires_scalar(self, state, i):
+        raise NotImplementedError
+
+    def new_hires(self, state, i):
+        raise NotImplementedError
+
+    def __repr__(self):
+        params = ", ".join(f"{key}={value!r}" for key, value in self.params.items())
+        return f"{type(self).__name__}({params})"
+
+# Growth type name -> GrowthModel subclass, in the order the CLI lists them
+MODELS = {}
+
+def register(cls):
+    """Class decorator adding a GrowthModel subclass to the registry under its name."""
+    MODELS[cls.name] = cls
+    return cls
+
+def get_model(growth_type, **params):
+    """
+    Instantiates a registered growth model.
+
+    Args:
+        growth_type (str): Registered model name, e.g. "logistic".
+        **params: Overrides of the model's default parameters.
+
+    Returns:
+        GrowthModel: The configured model.
+    """
+    if growth_type not in MODELS:
+        raise ValueError(f"Unknown growth type: {growth_type}")
+    return MODELS[growth_type](**params)
+
+def resolve(model):
+    """Returns model itself if it is a GrowthModel, else the default model of that name."""
+    return model if isinstance(model, GrowthModel) else get_model(model)
+
+@register
+class Linear(GrowthModel):
+    """Steady predictable growth."""
+
+    name = "linear"
+    defaults = {"hires": (1, 3)}
+
+    def new_hires_scalar(self, state, i):
+        return state.rng.randint(*self.hires) * state.multiplier
+
+    def new_hires(self, state, i):
+        return _trunc(state.randint(*self.hires) * state.multiplier)
+
+@register
+class Quadratic(GrowthModel):
+    """Growth accelerates over time."""
+
+    name = "quadratic"
+    defaults = {"divisor": 10}
+
+    def new_hires_scalar(self, state, i):
+        return (state.total // self.divisor + 1) * state.multiplier
+
+    def new_hires(self, state, i):
+        return _trunc((state.total // self.divisor + 1) * state.multiplier)
+
+@register
+class Exponential(GrowthModel):
+    """Rapid scaling."""
+
+    name = "exponential"
+    defaults = {"rate": (0.1, 0.3)}
+
+    def new_hires_scalar(self, state, i):
+        return max(1, int(state.total * state.rng.uniform(*self.rate) * state.multiplier))
+
+    def new_hires(self, state, i):
+        import numpy as np
+        return np.maximum(1, _trunc(state.total * state.uniform(*self.rate) * state.multiplier))
+
+@register
+class BellCurve(GrowthModel):
+    """Fast growth then slowdown, peaking at `peak` of the horizon."""
+
+    name = "bell_curve"
+    defaults = {"peak": 0.5}
+
+    def new_hires_scalar(self, state, i):
+        midpoint = int(state.num_quarters * self.peak)
+        variance = max(1, int((midpoint - abs(midpoint - i)) * state.multiplier))
+        return state.rng.randint(1, variance)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        midpoint = int(state.num_quarters * self.peak)
+        variance = np.maximum(1, _trunc((midpoint - abs(midpoint - i)) * state.multiplier))
+        return state.randint(1, variance)
+
+@register
+class Logistic(GrowthModel):
+    """S-curve growth (slow, fast, plateau) towards a carrying capacity."""
+
+    name = "logistic"
+    defaults = {"carrying_capacity": 100, "rate": 0.2}
+
+    def new_hires_scalar(self, state, i):
+        total = state.total
+        new_hires = int(self.rate * total * (1 - total / self.carrying_capacity) * state.multiplier)
+        return max(1, new_hires)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        total = state.total
+        return np.maximum(1, _trunc(self.rate * total * (1 - total / self.carrying_capacity) * state.multiplier))
+
+@register
+class Cyclic(GrowthModel):
+    """Seasonal hiring patterns with a period of `period` quarters."""
+
+    name = "cyclic"
+    defaults = {"period": 12, "divisor": 10}
+
+    def new_hires_scalar(self, state, i):
+        base = max(1, state.total // self.divisor)
+        return int(base + base * math.sin(i * math.pi / (self.period / 2)) * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        base = np.maximum(1, state.total // self.divisor)
+        return _trunc(base + base * math.sin(i * math.pi / (self.period / 2)) * state.multiplier)
+
+@register
+class StagnationGrowth(GrowthModel):
+    """Periods of little growth followed by a spurt every `spurt_every` quarters."""
+
+    name = "stagnation-growth"
+    defaults = {"spurt_every": 3}
+
+    def new_hires_scalar(self, state, i):
+        total = state.total
+        if i % self.spurt_every != 0:
+            new_hires = state.rng.randint(0, max(1, total // 20))
+        else:
+            new_hires = state.rng.randint(max(1, total // 10), max(2, total // 5))
+        return int(new_hires * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        if i % self.spurt_every != 0:
+            new_hires = state.randint(0, np.maximum(1, state.total // 20))
+        else:
+            new_hires = state.randint(np.maximum(1, state.total // 10), np.maximum(2, state.total // 5))
+        return _trunc(new_hires * state.multiplier)
+
+@register
+class Decline(GrowthModel):
+    """
+    A company gradually losing employees, but not catastrophically.
+
+    Grows until `growth_until`, stalls until `slowdown_until`, then loses up
+    to `max_decline` of its staff per quarter, with a `recovery_chance` of a
+    small recovery quarter.
+    """
+
+    name = "decline"
+    defaults = {"growth_until": 0.3, "slowdown_until": 0.5, "max_decline": 0.05, "recovery_chance": 0.2}
+
+    def new_hires_scalar(self, state, i):
+        rng = state.rng
+        quarter_percentage = i / state.num_quarters
+        if quarter_percentage < self.growth_until:
+            return rng.randint(1, 3)
+        if quarter_percentage < self.slowdown_until:
+            return rng.randint(0, 1)
+
+        decline_rate = min(self.max_decline, (quarter_percentage - self.slowdown_until) * 0.1)
+        new_hires = -max(1, int(state.total * decline_rate))
+        if rng.random() < self.recovery_chance:
+            new_hires = rng.randint(1, max(2, abs(new_hires) // 2))
+        return new_hires
+
+    def new_hires(self, state, i):
+        import numpy as np
+        quarter_percentage = i / state.num_quarters
+        if quarter_percentage < self.growth_until:
+            return state.randint(1, 3)
+        if quarter_percentage < self.slowdown_until:
+            return state.randint(0, 1)
+
+        decline_rate = min(self.max_decline, (quarter_percentage - self.slowdown_until) * 0.1)
+        loss = np.maximum(1, _trunc(state.total * decline_rate))
+        recovery = state.randint(1, np.maximum(2, loss // 2))
+        return np.where(state.rng.random(state.size) < self.recovery_chance, recovery, -loss)
+
+@register
+class Acquisition(GrowthModel):
+    """
+    Normal growth with a major acquisition spike at `acquisition_at` of the
+    horizon and extra hiring within `window` of it.
+    """
+
+    name = "acquisition"
+    defaults = {"acquisition_at": 0.5, "window": 0.1, "min_acquired": 10}
+
+    def new_hires_scalar(self, state, i):
+        rng = state.rng
+        total = state.total
+        quarter_percentage = i / state.num_quarters
+
+        new_hires = rng.randint(1, max(2, total // 15))
+        if self.acquisition_at - self.window < quarter_percentage < self.acquisition_at + self.window:
+            if abs(quarter_percentage - self.acquisition_at) < self.window / 2:  # The acquisition quarter
+                acquired_size = rng.randint(self.min_acquired, max(2 * self.min_acquired, total))
+                new_hires += acquired_size
+                logger.debug("Acquisition event: +%d employees in Q%d", acquired_size, i + 1)
+            elif abs(quarter_percentage - self.acquisition_at) < self.window:  # Pre/post acquisition hiring
+                new_hires += rng.randint(3, 8)
+        return int(new_hires * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        quarter_percentage = i / state.num_quarters
+        new_hires = state.randint(1, np.maximum(2, state.total // 15))
+        if self.acquisition_at - self.window < quarter_percentage < self.acquisition_at + self.window:
+            if abs(quarter_percentage - self.acquisition_at) < self.window / 2:
+                new_hires += state.randint(self.min_acquired, np.maximum(2 * self.min_acquired, state.total))
+            elif abs(quarter_percentage - self.acquisition_at) < self.window:
+                new_hires += state.randint(3, 8)
+        return _trunc(new_hires * state.multiplier)
+
+@register
+class Failure(GrowthModel):
+    """
+    A company that grows linearly, then fails after `failure_at` of the
+    horizon and sheds a `shed_rate` share of its staff every quarter.
+    Funding rounds no longer speed up hiring once it fails.
+    """
+
+    name = "failure"
+    defaults = {"failure_at": 0.5, "hires": (1, 3), "shed_rate": (0.3, 0.6)}
+
+    def new_hires_scalar(self, state, i):
+        if i / state.num_quarters < self.failure_at:
+            return int(state.rng.randint(*self.hires) * state.multiplier)
+        return -max(1, int(state.total * state.rng.uniform(*self.shed_rate)))
+
+    def new_hires(self, state, i):
+        import numpy as np
+        if i / state.num_quarters < self.failure_at:
+            return _trunc(state.randint(*self.hires) * state.multiplier)
+        return -np.maximum(1, _trunc(state.total * state.uniform(*self.shed_rate)))
+
+@register
+class PiecewiseFunding(GrowthModel):
+    """
+    Linear growth that switches to exponential for `post_funding_quarters`
+    quarters after each funding round.
+    """
+
+    name = "piecewise_funding"
+    defaults = {"post_funding_quarters": 3}
+
+    def new_hires_scalar(self, state, i):
+        rng = state.rng
+        record = state.record
+        if state.funded_now:
+            # Remember that we got funding this quarter for future growth
+            record.just_funded = True
+            new_hires = rng.randint(3, 6)  # Immediately hire a few people post-funding
+        elif record.just_funded:
+            # First quarter after funding - exponential growth kicks in
+            new_hires = max(2, int(state.total * rng.uniform(0.15, 0.3)))  # 15-30% growth
+            record.just_funded = False
+            record.post_funding = self.post_funding_quarters
+        elif (record.post_funding or 0) > 0:
+            # We're in the post-funding growth phase
+            new_hires = max(2, int(state.total * rng.uniform(0.1, 0.2)))  # 10-20% growth
+            record.post_funding -= 1
+        else:
+            # Back to linear growth until next funding
+            new_hires = rng.randint(1, 3)
+        return int(new_hires * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        funded_now = state.funded_now
+        first_after = ~funded_now & state.just_funded
+        post = ~funded_now & ~state.just_funded & (state.post_funding > 0)
+
+        new_hires = state.randint(1, 3)
+        new_hires = np.where(funded_now, state.randint(3, 6), new_hires)
+        new_hires = np.where(first_after, np.maximum(2, _trunc(state.total * state.uniform(0.15, 0.3))), new_hires)
+        new_hires = np.where(post, np.maximum(2, _trunc(state.total * state.uniform(0.1, 0.2))), new_hires)
+
+        state.just_funded = np.where(funded_now, True, np.where(first_after, False, state.just_funded))
+        state.post_funding = np.where(first_after, self.post_funding_quarters,
+                                      np.where(post, state.post_funding - 1, state.post_funding))
+        return _trunc(new_hires * state.multiplier)
+
+@register
+class LinearToExponential(GrowthModel):
+    """
+    Linear growth until product-market fit at `transition` of the horizon,
+    then exponential growth whatever the funding.
+    """
+
+    name = "linear_to_exponential"
+    defaults = {"transition": 0.4, "base_rate": 0.1, "max_rate": 0.3}
+
+    def _rate(self, quarter_percentage):
+        # Growth rate increases over time
+        return min(self.max_rate, self.base_rate + (quarter_percentage - self.transition))
+
+    def new_hires_scalar(self, state, i):
+        quarter_percentage = i / state.num_quarters
+        if quarter_percentage < self.transition:
+            new_hires = state.rng.randint(1, 3)
+        else:
+            new_hires = max(2, int(state.total * self._rate(quarter_percentage)))
+        return int(new_hires * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        quarter_percentage = i / state.num_quarters
+        if quarter_percentage < self.transition:
+            new_hires = state.randint(1, 3)
+        else:
+            new_hires = np.maximum(2, _trunc(state.total * self._rate(quarter_percentage)))
+        return _trunc(new_hires * state.multiplier)
+
+@register
+class ExponentialToDecline(GrowthModel):
+    """
+    Exponential growth until `peak`, a plateau until `decline`, then a slow
+    decline with a `stable_chance` of a quarter without departures.
+    """
+
+    name = "exponential_to_decline"
+    defaults = {"peak": 0.5, "decline": 0.7, "stable_chance": 0.3}
+
+    def new_hires_scalar(self, state, i):
+        rng = state.rng
+        total = state.total
+        quarter_percentage = i / state.num_quarters
+
+        if quarter_percentage < self.peak:
+            # Growth rate increases over time (20-40%)
+            new_hires = max(2, int(total * (0.2 + (quarter_percentage * 0.4))))
+        elif quarter_percentage < self.decline:
+            # Plateau phase - growth slows dramatically
+            new_hires = rng.randint(1, max(2, int(total * 0.05)))
+        else:
+            # Decline phase - losing employees gradually
+            decline_rate = min(0.1, 0.03 + ((quarter_percentage - self.decline) * 0.2))
+            new_hires = -max(1, int(total * decline_rate))
+            if rng.random() < self.stable_chance:
+                new_hires = 0
+        return int(new_hires * state.multiplier)
+
+    def new_hires(self, state, i):
+        import numpy as np
+        quarter_percentage = i / state.num_quarters
+        if quarter_percentage < self.peak:
+            new_hires = np.maximum(2, _trunc(state.total * (0.2 + (quarter_percentage * 0.4))))
+        elif quarter_percentage < self.decline:
+            new_hires = state.randint(1, np.maximum(2, _trunc(state.total * 0.05)))
+        else:
+            decline_rate = min(0.1, 0.03 + (quarter_percentage - self.decline) * 0.2)
+            loss = np.maximum(1, _trunc(state.total * decline_rate))
+            new_hires = np.where(state.rng.random(state.size) < self.stable_chance, 0, -loss)
+        return _trunc(new_hires * state.multiplier)
+
+def _matches_default(value, default):
+    # Whole numbers are accepted for float parameters, but not the other way round
+    if isinstance(default, tuple):
+        return isinstance(value, tuple) and len(value) == len(default) and \
+            all(_matches_default(v, d) for v, d in zip(value, default))
+    if isinstance(value, bool):
+        return False
+    if isinstance(default, int):
+        return isinstance(value, int)
+    if isinstance(default, float):
+        return isinstance(value, (int, float))
+    return isinstance(value, type(default))
+
+def _describe(default):
+    if isinstance(default, tuple):
+        kind = "whole numbers" if all(isinstance(d, int) for d in default) else "numbers"
+        return f"a list of {len(default)} {kind} like {list(default)}"
+    return "a whole number" if isinstance(default, int) else "a number"
+
+def parse_params(specs):
+    """
+    Parses CLI parameter overrides of the form "growth_type.param=value".
+
+    Values are read as JSON, so numbers and lists like [1, 3] work, and must
+    have the type of the parameter's default: a whole number, a number, or a
+    list of as many numbers as the default (integers where it has integers).
+
+    Returns:
+        dict: growth_type -> {param: value}.
+
+    Raises:
+        ValueError: For malformed specs, unknown growth types or parameters,
+            and values of the wrong type.
+    """
+    import json
+
+    params = {}
+    for spec in specs or []:
+        key, sep, value = spec.partition("=")
+        growth_type, dot, name = key.partition(".")
+        if not sep or not dot:
+            raise ValueError(f"Expected growth_type.param=value, got: {spec}")
+        if growth_type not in MODELS:
+            raise ValueError(f"Unknown growth type: {growth_type}")
+        if name not in MODELS[growth_type].defaults:
+            raise ValueError(f"Unknown parameter for growth type {growth_type}: {name}")
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+        value = tuple(value) if isinstance(value, list) else value
+        default = MODELS[growth_type].defaults[name]
+        if not _matches_default(value, default):
+            raise ValueError(f"{growth_type}.{name} must be {_describe(default)}, got: {spec.partition('=')[2]}")
+        params.setdefault(growth_type, {})[name] = value
+    return params
@@ -0,0 +1,127 @@
+from time import perf_counter
+
+import numpy as np
+
+import instrument
+
+def make_rng(seed=None):
+    """
+    Creates the NumPy generator used to place hires.
+
+    Args:
+        seed (int, optional): Seed for a reproducible run. None draws fresh entropy.
+
+    Returns:
+        numpy.random.Generator: The random generator.
+    """
+    return np.random.default_rng(seed)
+
+def _normalize(weights):
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum(axis=-1, keepdims=True)
+    return np.divide(weights, total, out=np.zeros_like(weights), where=total > 0)
+
+def draw_hires(rng, n, weights):
+    """
+    Places n hires across categories with a single multinomial draw.
+
+    This has the same distribution as n independent weighted draws, which is
+    what the reference engine does one employee at a time.
+
+    Args:
+        rng (numpy.random.Generator): Random generator.
+        n (int or array): Number of hires, or one count per company.
+        weights (array): Category weights, shape (K,) or (..., K).
+
+    Returns:
+        numpy.ndarray: Hires per category, shape (..., K).
+    """
+    return rng.multinomial(n, _normalize(weights))
+
+def draw_departures(rng, n, counts, weights):
+    """
+    Removes n employees across categories by weight, clamping each category at zero.
+
+    This has the same distribution as the reference engine, which removes one
+    weighted draw at a time and clamps afterwards: departures that land on a
+    category with no employees left are lost, so fewer than n may leave.
+
+    Args:
+        rng (numpy.random.Generator): Random generator.
+        n (int or array): Number of departures, or one count per company.
+        counts (array): Current headcount per category, shape (K,) or (..., K).
+        weights (array): Category weights, shape (K,) or (..., K).
+
+    Returns:
+        numpy.ndarray: Departures per category, shape (..., K).
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    return np.minimum(rng.multinomial(n, _normalize(weights)), counts)
+
+def remove_employees(rng, n, countries, occupations, country_weights, occupation_weights):
+    """
+    Removes n employees from both dimensions like the reference engine.
+
+    Each dimension loses draw_departures, which may clamp them by different
+    amounts; the dimension left with fewer employees then gets the difference
+    back as weighted hires, as the reference engine's rebalance pass does.
+
+    Args:
+        rng (numpy.random.Generator): Random generator.
+        n (int or array): Number of departures, or one count per company.
+        countries (array): Headcount per country, shape (K,) or (companies, K).
+        occupations (array): Headcount per occupation, shape (M,) or (companies, M).
+        country_weights (array): Weight per country.
+        occupation_weights (array): Weight per occupation.
+
+    Returns:
+        tuple: New (countries, occupations) arrays with equal totals.
+    """
+    countries = countries - draw_departures(rng, n, countries, country_weights)
+    occupations = occupations - draw_departures(rng, n, occupations, occupation_weights)
+    gap = countries.sum(axis=-1) - occupations.sum(axis=-1)
+    countries = countries + draw_hires(rng, np.maximum(-gap, 0), country_weights)
+    occupations = occupations + draw_hires(rng, np.maximum(gap, 0), occupation_weights)
+    return countries, occupations
+
+def distribute_counts(countries, occupations, new_hires, country_weights, occupation_weights, rng):
+    """
+    Adds or removes a quarter's employees with one multinomial draw per dimension.
+
+    Drop-in replacement for randomize_2.distribute_counts, with the same
+    distribution of headcount: hires add exactly the same number to countries
+    and occupations, and departures are clamped and rebalanced like the
+    reference engine (see remove_employees).
+
+    Args:
+        countries (list or array): Headcount per country, updated in place.
+        occupations (list or array): Headcount per occupation, updated in place.
+        new_hires (int): Net headcount change; negative for departures.
+        country_weights (list): Weight per country, in the same order.
+        occupation_weights (list): Weight per occupation, in the same order.
+        rng (numpy.random.Generator): Random generator.
+    """
+    n = int(abs(new_hires))
+    if n == 0:
+        return
+    timed = instrument.enabled
+    if timed:
+        start = perf_counter()
+
+    country_counts = np.array(countries, dtype=np.int64)
+    occupation_counts = np.array(occupations, dtype=np.int64)
+
+    if new_hires > 0:
+        country_counts += draw_hires(rng, n, country_weights)
+        occupation_counts += draw_hires(rng, n, occupation_weights)
+    else:
+        country_counts, occupation_counts = remove_employees(
+            rng, n, country_counts, occupation_counts, country_weights, occupation_weights)
+
+    for index, count in enumerate(country_counts.tolist()):
+        countries[index] = count
+    for index, count in enumerate(occupation_counts.tolist()):
+        occupations[index] = count
+
+    if timed:
+        instrument.record("generate.draw", perf_counter() - start)
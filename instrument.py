@@ -0,0 +1,160 @@
+import functools
+import json
+import os
+import sys
+import threading
+from time import perf_counter
+
+# Set PS_INSTRUMENT=1 to record timings from startup, or call enable()
+enabled = os.environ.get("PS_INSTRUMENT", "") not in ("", "0")
+
+# Timer name -> [calls, total seconds, slowest call in seconds]
+_stats = {}
+_lock = threading.Lock()
+
+def enable(on=True):
+    """Turns recording on (or off with on=False) for this process."""
+    global enabled
+    enabled = bool(on)
+
+def disable():
+    enable(False)
+
+def record(name, seconds, calls=1):
+    """
+    Adds one timed call to the named timer.
+
+    Hot paths check `instrument.enabled` themselves before timing anything,
+    so this is only reached while recording is on.
+    """
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            _stats[name] = [calls, seconds, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+class timer:
+    """
+    Context manager timing a block under a name, if recording is on.
+
+    Meant for blocks that run a handful of times per request or file; hot
+    loops use perf_counter and record directly behind an `enabled` check.
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if enabled:
+            self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            record(self.name, perf_counter() - self.start)
+        return False
+
+def timed(name):
+    """
+    Decorator recording every call of a function under a name, if recording is on.
+
+    When recording is off a call costs one extra function call and a global
+    lookup.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    return decorate
+
+def stats():
+    """
+    Returns the recorded timers.
+
+    Returns:
+        dict: Timer name -> {'calls', 'seconds', 'mean_ms', 'max_ms'}, sorted by name.
+    """
+    with _lock:
+        items = sorted((name, list(entry)) for name, entry in _stats.items())
+    return {
+        name: {
+            "calls": calls,
+            "seconds": round(total, 6),
+            "mean_ms": round(total / calls * 1000, 4) if calls else 0,
+            "max_ms": round(slowest * 1000, 4)
+        }
+        for name, (calls, total, slowest) in items
+    }
+
+def reset():
+    """Clears all timers."""
+    with _lock:
+        _stats.clear()
+
+def merge(other):
+    """
+    Adds timers exported by another process (see collect) to this one.
+
+    Args:
+        other (dict): Output of stats().
+    """
+    for name, entry in other.items():
+        if not entry["calls"]:
+            continue
+        with _lock:
+            current = _stats.setdefault(name, [0, 0.0, 0.0])
+            current[0] += entry["calls"]
+            current[1] += entry["seconds"]
+            current[2] = max(current[2], entry["max_ms"] / 1000)
+
+def collect(func, *args, **kwargs):
+    """
+    Calls func with recording on and returns (result, timers of that call).
+
+    Used as the work function of process pools, whose workers don't share
+    this module's timers with the parent; the parent merges the timers of
+    every result.
+    """
+    enable()
+    reset()
+    result = func(*args, **kwargs)
+    return result, stats()
+
+def report(file=None):
+    """
+    Prints the timers as a table, slowest total first.
+    """
+    file = file or sys.stdout
+    rows = sorted(stats().items(), key=lambda item: item[1]["seconds"], reverse=True)
+    if not rows:
+        print("No timings recorded.", file=file)
+        return
+    width = max(len(name) for name, _ in rows)
+    print(f"{'Timer':<{width}}  {'Calls':>9}  {'Total (s)':>10}  {'Mean (ms)':>10}  {'Max (ms)':>10}", file=file)
+    for name, entry in rows:
+        print(f"{name:<{width}}  {entry['calls']:>9}  {entry['seconds']:>10.4f}  "
+              f"{entry['mean_ms']:>10.4f}  {entry['max_ms']:>10.4f}", file=file)
+
+def dump(destination):
+    """
+    Writes the timers as JSON to a file, or prints the table for "-".
+    """
+    if destination == "-":
+        report()
+        return
+    with open(destination, 'w') as file:
+        json.dump(stats(), file, indent=2)
@@ -0,0 +1,108 @@
+from array import array
+
+COUNTRIES = ("USA", "UK", "India", "Brazil", "France")
+OCCUPATIONS = (
+    "Software Engineering",
+    "Sales",
+    "Administration",
+    "Product Management",
+    "Customer Success",
+    "Finance",
+    "Legal"
+)
+
+# Keys of the JSON shape that map onto Quarter fields; anything else is kept in 'extra'
+_FIELDS = ("Quarter", "Countries", "Occupations", "Capital", "JustFunded", "PostFunding")
+
+# Name tuples are shared between quarters, so equal ones are only stored once
+_interned_names = {COUNTRIES: COUNTRIES, OCCUPATIONS: OCCUPATIONS}
+
+def intern_names(names):
+    names = tuple(names)
+    return _interned_names.setdefault(names, names)
+
+class Quarter:
+    """
+    Compact state of one company in one quarter.
+
+    Headcounts are integer arrays indexed like country_names and
+    occupation_names; the name tuples are shared by every quarter of a
+    scenario. Funding state has typed fields instead of ad-hoc dict keys.
+    Convert with from_dict and to_dict at the edges, where the JSON shape
+    is needed.
+    """
+
+    __slots__ = ("quarter", "capital", "country_names", "countries", "occupation_names", "occupations",
+                 "just_funded", "post_funding", "extra")
+
+    def __init__(self, quarter, capital, countries, occupations, country_names=COUNTRIES,
+                 occupation_names=OCCUPATIONS, just_funded=None, post_funding=None, extra=None):
+        self.quarter = quarter
+        self.capital = capital
+        self.country_names = intern_names(country_names)
+        self.countries = array('q', countries)
+        self.occupation_names = intern_names(occupation_names)
+        self.occupations = array('q', occupations)
+        # None means the flag has never been set, and it is left out of to_dict
+        self.just_funded = just_funded
+        self.post_funding = post_funding
+        # Other keys of the source dict, passed through unchanged
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a Quarter from a quarter dict in the JSON shape.
+        """
+        countries = data.get("Countries", {})
+        occupations = data.get("Occupations", {})
+        extra = {key: value for key, value in data.items() if key not in _FIELDS}
+        return cls(
+            data.get("Quarter", ""),
+            data.get("Capital", 0),
+            countries.values(),
+            occupations.values(),
+            countries.keys(),
+            occupations.keys(),
+            data.get("JustFunded"),
+            data.get("PostFunding"),
+            extra or None
+        )
+
+    def to_dict(self):
+        """
+        Returns the quarter in the JSON shape written to scenario files.
+        """
+        data = {
+            "Quarter": self.quarter,
+            "Countries": dict(zip(self.country_names, self.countries)),
+            "Occupations": dict(zip(self.occupation_names, self.occupations)),
+            "Capital": self.capital
+        }
+        if self.extra:
+            data.update(self.extra)
+        if self.just_funded is not None:
+            data["JustFunded"] = self.just_funded
+        if self.post_funding is not None:
+            data["PostFunding"] = self.post_funding
+        return data
+
+    def copy(self):
+        return Quarter(self.quarter, self.capital, self.countries, self.occupations, self.country_names,
+                       self.occupation_names, self.just_funded, self.post_funding,
+                       dict(self.extra) if self.extra else None)
+
+    @property
+    def headcount(self):
+        return sum(self.countries)
+
+    def __repr__(self):
+        return f"Quarter({self.quarter!r}, capital={self.capital!r}, headcount={self.headcount})"
+
+def as_quarter(quarter):
+    """Returns quarter as a Quarter, converting it if it is a dict."""
+    return quarter if isinstance(quarter, Quarter) else Quarter.from_dict(quarter)
+
+def as_dict(quarter):
+    """Returns quarter in the JSON shape, converting it if it is a Quarter."""
+    return quarter.to_dict() if isinstance(quarter, Quarter) else quarter
@@ -1,406 +1,606 @@
 import random
 import json
-import math
+import hashlib
+import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
 
-def clone_previous_quarter(data, growth_type="linear"):
+import growth_models
+import instrument
+import sampling
+import scenario_index
+import stream
+from quarter import COUNTRIES, OCCUPATIONS, Quarter, as_quarter
+
+GROWTH_TYPES = list(growth_models.MODELS)
+
+def get_country_weights(country_keys, overrides=None):
     """
-    Clones the previous quarter and adds employees to categories and countries.
-    Growth can be linear, quadratic, exponential, bell_curve, logistic, cyclic, 
-    stagnation-growth, decline, acquisition, failure, piecewise_funding, 
-    linear_to_exponential, or exponential_to_decline.
-    
+    Returns hiring weights for the given countries.
+
+    Limited to US, UK, India, Brazil, and France, heavily weighted toward US
+    growth unless overridden; see sampling.COUNTRY_WEIGHTS.
+    """
+    return sampling.country_weights(country_keys, overrides)
+
+def get_occupation_weights(occupation_keys, overrides=None):
+    """
+    Returns hiring weights for the given occupations, favouring Software
+    Engineering and Sales unless overridden; see sampling.OCCUPATION_WEIGHTS.
+    """
+    return sampling.occupation_weights(occupation_keys, overrides)
+
+def distribute_counts(countries, occupations, new_hires, country_weights, occupation_weights, rng=random):
+    """
+    Adds or removes employees one at a time while keeping country and occupation totals equal.
+
+    This is the reference engine: every hire or departure is placed with its own
+    weighted draw, and totals are rebalanced afterwards if clamping at zero made
+    them drift apart.
+
+    Args:
+        countries (list or array): Headcount per country, updated in place.
+        occupations (list or array): Headcount per occupation, updated in place.
+        new_hires (int): Net headcount change; negative for departures.
+        country_weights (list or table): Weight per country, in the same order,
+            or a prebuilt sampling.WeightTable or AliasTable.
+        occupation_weights (list or table): Weight per occupation, likewise.
+        rng: random module or random.Random instance.
+    """
+    if new_hires == 0:
+        return
+    timed = instrument.enabled
+    if timed:
+        start = perf_counter()
+
+    # WeightTable draws consume the random stream exactly like random.choices
+    draw_country = sampling.as_table(country_weights).draw
+    draw_occupation = sampling.as_table(occupation_weights).draw
+    country_additions = [0] * len(countries)
+    occupation_additions = [0] * len(occupations)
+    step = 1 if new_hires > 0 else -1
+
+    # Distribute additions/removals
+    for _ in range(int(abs(new_hires))):
+        # Select country based on weights
+        country_additions[draw_country(rng)] += step
+
+        # Select occupation based on weights
+        occupation_additions[draw_occupation(rng)] += step
+
+    # Apply changes with protection against negative values
+    for index, change in enumerate(country_additions):
+        countries[index] = max(0, countries[index] + change)
+
+    for index, change in enumerate(occupation_additions):
+        occupations[index] = max(0, occupations[index] + change)
+
+    if timed:
+        drawn = perf_counter()
+        instrument.record("generate.draw", drawn - start)
+
+    # Normalize to ensure country total equals occupation total
+    country_total = sum(countries)
+    occupation_total = sum(occupations)
+
+    # Adjust if totals aren't equal
+    if country_total > occupation_total:
+        # Need to add employees to occupations
+        for _ in range(country_total - occupation_total):
+            occupations[draw_occupation(rng)] += 1
+    elif occupation_total > country_total:
+        # Need to add employees to countries
+        for _ in range(occupation_total - country_total):
+            countries[draw_country(rng)] += 1
+
+    if timed:
+        instrument.record("generate.rebalance", perf_counter() - drawn)
+
+def distribute_changes(entry, new_hires, country_weights, occupation_weights, rng=random, engine="python"):
+    """
+    Applies distribute_counts to a quarter dict, updating its Countries and Occupations in place.
+
+    Args:
+        engine (str): "python" or "alias" use distribute_counts here, with the
+            weights and rng it takes; "numpy" uses hiring_np.distribute_counts,
+            with weight arrays and a generator from hiring_np.make_rng.
+    """
+    if engine == "numpy":
+        import hiring_np
+        distribute = hiring_np.distribute_counts
+    elif engine in ("python", "alias"):
+        distribute = distribute_counts
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+    countries = list(entry['Countries'].values())
+    occupations = list(entry['Occupations'].values())
+    distribute(countries, occupations, new_hires, country_weights, occupation_weights, rng)
+    entry['Countries'].update(zip(entry['Countries'], countries))
+    entry['Occupations'].update(zip(entry['Occupations'], occupations))
+    return entry
+
+def simulate_quarters(first_quarter, num_quarters, growth_type="linear", engine="python", seed=None, weights=None):
+    """
+    Yields the quarters that follow first_quarter, one at a time.
+
+    Each quarter is cloned from the previous one with employees added to
+    categories and countries.
+    Growth can be any type registered in growth_models.MODELS; see
+    growth_models for what each does and its parameters.
+
     Capital is only added once every 4-7 quarters to simulate funding rounds.
-    
+
     Prioritizes growth in the USA, India, Sales, and Software Engineering,
     with more realistic B2B SaaS company progression.
+
+    The engine selects how each quarter's hires are placed: "python" draws one
+    employee at a time, "alias" does the same with O(1) alias-table draws
+    (same distribution, different seeded output), and "numpy" places the
+    whole quarter with one multinomial draw per dimension (see hiring_np).
+    Passing a seed makes any engine reproducible; without one the global
+    random state is used.
+
+    Only the previous quarter is kept between steps, so memory stays flat
+    however long the horizon is. Every yielded quarter is a fresh Quarter that
+    the caller may keep or discard; first_quarter itself is never modified.
+
+    Args:
+        first_quarter (Quarter or dict): The first quarter of the company.
+        num_quarters (int): Length of the whole scenario, including first_quarter.
+            Funding rounds and the phases of most growth types depend on it.
+        growth_type (str or GrowthModel): Growth pattern, by name or as a
+            configured model from growth_models.
+        engine (str): Hiring engine, "python", "alias" or "numpy".
+        seed (int, optional): Seed for a reproducible scenario.
+        weights (dict, optional): Hiring weight overrides for this scenario,
+            as {'countries': {name: weight}, 'occupations': {name: weight}}.
+
+    Yields:
+        Quarter: Quarters 2 to num_quarters.
     """
-    num_quarters = len(data)
-    
+    rng = random.Random(seed) if seed is not None else random
+    model = growth_models.resolve(growth_type)
+    model_new_hires = model.new_hires_scalar
+    # Checked once per scenario; per-quarter timings are recorded per growth model
+    timed = instrument.enabled
+    timer_name = f"generate.model.{model.name}"
+    state = growth_models.ScenarioState(rng, num_quarters)
+
+    # Countries and occupations are the same in every quarter, so the weight tables are built once
+    previous_entry = as_quarter(first_quarter)
+    weights = weights or {}
+    country_weights = sampling.WeightTable(get_country_weights(previous_entry.country_names, weights.get("countries")))
+    occupation_weights = sampling.WeightTable(
+        get_occupation_weights(previous_entry.occupation_names, weights.get("occupations")))
+
+    if engine == "numpy":
+        import hiring_np
+        distribute = hiring_np.distribute_counts
+        # Without a seed the generator is seeded from the global random state,
+        # so random.seed() makes this engine reproducible too
+        distribute_rng = hiring_np.make_rng(seed if seed is not None else random.getrandbits(64))
+        country_weights, occupation_weights = country_weights.weights, occupation_weights.weights
+    elif engine == "python":
+        distribute = distribute_counts
+        distribute_rng = rng
+    elif engine == "alias":
+        distribute = distribute_counts
+        distribute_rng = rng
+        country_weights, occupation_weights = country_weights.alias(), occupation_weights.alias()
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+
     # Determine funding rounds (typically series A, B, C, etc.)
-    capital_increase_intervals = sorted(random.sample(range(4, min(num_quarters, 20)), k=min(num_quarters // 5, 4)))
-    
+    capital_increase_intervals = sorted(rng.sample(range(4, min(num_quarters, 20)), k=min(num_quarters // 5, 4)))
+
     for i in range(1, num_quarters):
-        previous_entry = json.loads(json.dumps(data[i - 1]))  # Deep copy
+        if timed:
+            start = perf_counter()
+        previous_entry = previous_entry.copy()
         current_quarter = i + 1
         
-        # Calculate total headcount from previous quarter
-        total_employees = sum(previous_entry['Countries'].values())
-        
         # Determine if this quarter should have a capital increase (funding round)
-        capital_raised = False
-        if i in capital_increase_intervals:
+        state.funded_now = i in capital_increase_intervals
+        if state.funded_now:
             # Simulate funding rounds increasing in size
-            round_size = round(random.uniform(2.0, 5.0) * (1 + (i / num_quarters)), 2)
-            previous_entry['Capital'] = round(previous_entry['Capital'] + round_size, 2)
-            capital_raised = True
+            round_size = round(rng.uniform(2.0, 5.0) * (1 + (i / num_quarters)), 2)
+            previous_entry.capital = round(previous_entry.capital + round_size, 2)
             
             # After funding, growth accelerates
-            growth_multiplier = 2.0
+            state.multiplier = 2.0
         else:
-            growth_multiplier = 1.0
-        
-        new_hires = 0 
+            state.multiplier = 1.0
         
         # Determine employee growth based on type and current company size
-        if growth_type == "linear":
-            # Steady predictable growth
-            new_hires = random.randint(1, 3) * growth_multiplier
-        
-        elif growth_type == "quadratic":
-            # Growth accelerates over time
-            new_hires = (total_employees // 10 + 1) * growth_multiplier
-        
-        elif growth_type == "exponential":
-            # Rapid scaling
-            new_hires = max(1, int(total_employees * random.uniform(0.1, 0.3) * growth_multiplier))
-        
-        elif growth_type == "bell_curve":
-            # Fast growth then slowdown
-            midpoint = num_quarters // 2
-            variance = max(1, int((midpoint - abs(midpoint - i)) * growth_multiplier))
-            new_hires = random.randint(1, variance)
-        
-        elif growth_type == "logistic":
-            # S-curve growth (slow, fast, plateau)
-            k = 100  # Carrying capacity
-            r = 0.2   # Growth rate
-            new_hires = int(r * total_employees * (1 - total_employees / k) * growth_multiplier)
-            new_hires = max(1, new_hires)
-        
-        elif growth_type == "cyclic":
-            # Seasonal hiring patterns
-            base = max(1, total_employees // 10)
-            new_hires = int(base + base * math.sin(i * math.pi / 6) * growth_multiplier)
-        
-        elif growth_type == "stagnation-growth":
-            # Periods of little growth followed by spurts
-            if i % 3 != 0:
-                new_hires = random.randint(0, max(1, total_employees // 20))
-            else:
-                new_hires = random.randint(max(1, total_employees // 10), max(2, total_employees // 5))
-            new_hires = int(new_hires * growth_multiplier)
-        
-        elif growth_type == "decline":
-            # Company that's gradually losing employees (but not catastrophically)
-            quarter_percentage = i / num_quarters
-            
-            if quarter_percentage < 0.3:
-                # Initial growth phase
-                new_hires = random.randint(1, 3)
-            elif quarter_percentage < 0.5:
-                # Slowdown phase
-                new_hires = random.randint(0, 1)
-            else:
-                # Decline phase - losing employees but not collapsing
-                decline_rate = min(0.05, (quarter_percentage - 0.5) * 0.1)  # 5% max quarterly decline
-                loss = max(1, int(total_employees * decline_rate))
-                new_hires = -loss
-                
-                # Occasional small recovery quarters
-                if random.random() < 0.2:  # 20% chance of a small recovery quarter
-                    new_hires = random.randint(1, max(2, abs(new_hires) // 2))
-        
-        elif growth_type == "acquisition":
-            # Normal growth with a major acquisition spike
-            quarter_percentage = i / num_quarters
-            
-            # Base growth
-            new_hires = random.randint(1, max(2, total_employees // 15))
-            
-            # Acquisition event
-            if 0.4 < quarter_percentage < 0.6:
-                if abs(quarter_percentage - 0.5) < 0.05:  # The acquisition quarter
-                    # Major spike - acquire another company
-                    acquired_size = random.randint(10, max(20, total_employees))
-                    new_hires += acquired_size
-                    print(f"Acquisition event: +{acquired_size} employees in Q{i+1}")
-                elif abs(quarter_percentage - 0.5) < 0.1:  # Quarters around acquisition
-                    # Pre/post acquisition hiring
-                    new_hires += random.randint(3, 8)
-            
-            new_hires = int(new_hires * growth_multiplier)
-        
-        elif growth_type == "piecewise_funding":
-            # Linear growth that switches to exponential after funding rounds
-            
-            # Check if this is a funding quarter
-            if i in capital_increase_intervals:
-                # Remember that we got funding this quarter for future growth
-                previous_entry['JustFunded'] = True
-                new_hires = random.randint(3, 6)  # Immediately hire a few people post-funding
-            elif previous_entry.get('JustFunded', False):
-                # First quarter after funding - exponential growth kicks in
-                growth_rate = random.uniform(0.15, 0.3)  # 15-30% growth
-                new_hires = max(2, int(total_employees * growth_rate))
-                previous_entry['JustFunded'] = False  # Reset the flag
-                previous_entry['PostFunding'] = 3  # Track 3 quarters of post-funding growth
-            elif previous_entry.get('PostFunding', 0) > 0:
-                # We're in the post-funding growth phase
-                growth_rate = random.uniform(0.1, 0.2)  # 10-20% growth
-                new_hires = max(2, int(total_employees * growth_rate))
-                previous_entry['PostFunding'] -= 1  # Decrement the counter
-            else:
-                # Back to linear growth until next funding
-                new_hires = random.randint(1, 3)
-            
-            new_hires = int(new_hires * growth_multiplier)
-        
-        elif growth_type == "linear_to_exponential":
-            # Company that starts with linear growth, then hits product-market fit
-            # and transitions to exponential growth regardless of funding
-            
-            quarter_percentage = i / num_quarters
-            transition_point = 0.4  # Transition at 40% of the timeline
-            
-            if quarter_percentage < transition_point:
-                # Linear growth phase (pre product-market fit)
-                new_hires = random.randint(1, 3)
-            else:
-                # After product-market fit, exponential growth
-                time_since_transition = quarter_percentage - transition_point
-                growth_accelerator = min(0.3, 0.1 + time_since_transition)  # Growth rate increases over time
-                new_hires = max(2, int(total_employees * growth_accelerator))
-            
-            new_hires = int(new_hires * growth_multiplier)
-        
-        elif growth_type == "exponential_to_decline":
-            # Hot company that grows exponentially then hits a market ceiling or competition
-            # and begins a slow decline
-            
-            quarter_percentage = i / num_quarters
-            peak_point = 0.5  # Peak at halfway point
-            decline_point = 0.7  # Begin decline at 70% of the timeline
-            
-            if quarter_percentage < peak_point:
-                # Strong exponential growth phase
-                growth_rate = 0.2 + (quarter_percentage * 0.4)  # Growth rate increases over time (20-40%)
-                new_hires = max(2, int(total_employees * growth_rate))
-            elif quarter_percentage < decline_point:
-                # Plateau phase - growth slows dramatically
-                new_hires = random.randint(1, max(2, int(total_employees * 0.05)))
-            else:
-                # Decline phase - losing employees gradually
-                time_since_decline = quarter_percentage - decline_point
-                decline_rate = min(0.1, 0.03 + (time_since_decline * 0.2))  # Gradually increasing decline
-                loss = max(1, int(total_employees * decline_rate))
-                new_hires = -loss
-                
-                # Occasional stability quarters
-                if random.random() < 0.3:  # 30% chance of a stable quarter
-                    new_hires = 0
-            
-            new_hires = int(new_hires * growth_multiplier)
+        state.total = previous_entry.headcount
+        state.record = previous_entry
+        new_hires = model_new_hires(state, i)
         
         # Process employee changes
-        country_keys = list(previous_entry['Countries'].keys())
-        occupation_keys = list(previous_entry['Occupations'].keys())
-        
-        # Define weights based on company size and stage
-        # Limited to US, UK, India, Brazil, and France
-        # Heavily weighted toward US growth
-        country_weights = []
-        for c in country_keys:
-            if c == 'USA':
-                country_weights.append(0.8)  # Significantly increased US weight
-            elif c == 'India':
-                country_weights.append(0.1)  # Reduced India weight
-            elif c == 'UK':
-                country_weights.append(0.05)
-            elif c == 'France':
-                country_weights.append(0.03)
-            elif c == 'Brazil':
-                country_weights.append(0.02)
-            else:
-                country_weights.append(0.05)
-        
-        occupation_weights = []
-        for o in occupation_keys:
-            if o == 'Software Engineering':
-                occupation_weights.append(0.4)
-            elif o == 'Sales':
-                occupation_weights.append(0.3)
-            elif o in ['Customer Success', 'Product Management']:
-                occupation_weights.append(0.15)
-            else:
-                occupation_weights.append(0.15 / (len(occupation_keys) - 4) if len(occupation_keys) > 4 else 0.15)
-        
-        # Add or remove employees while keeping country and occupation totals equal
-        if new_hires != 0:
-            country_additions = {}
-            occupation_additions = {}
-            
-            # Initialize additions counters
-            for country in country_keys:
-                country_additions[country] = 0
-            for occupation in occupation_keys:
-                occupation_additions[occupation] = 0
-            
-            # Distribute additions/removals
-            for _ in range(int(abs(new_hires))):
-                # Select country based on weights
-                selected_country = random.choices(country_keys, weights=country_weights)[0]
-                country_additions[selected_country] += 1 if new_hires > 0 else -1
-                
-                # Select occupation based on weights
-                selected_occupation = random.choices(occupation_keys, weights=occupation_weights)[0]
-                occupation_additions[selected_occupation] += 1 if new_hires > 0 else -1
-            
-            # Apply changes with protection against negative values
-            for country, change in country_additions.items():
-                previous_entry['Countries'][country] = max(0, previous_entry['Countries'][country] + change)
-            
-            for occupation, change in occupation_additions.items():
-                previous_entry['Occupations'][occupation] = max(0, previous_entry['Occupations'][occupation] + change)
-            
-            # Normalize to ensure country total equals occupation total
-            country_total = sum(previous_entry['Countries'].values())
-            occupation_total = sum(previous_entry['Occupations'].values())
-            
-            # Adjust if totals aren't equal
-            if country_total != occupation_total:
-                if country_total > occupation_total:
-                    # Need to add employees to occupations
-                    diff = country_total - occupation_total
-                    for _ in range(diff):
-                        selected_occupation = random.choices(occupation_keys, weights=occupation_weights)[0]
-                        previous_entry['Occupations'][selected_occupation] += 1
-                else:
-                    # Need to add employees to countries
-                    diff = occupation_total - country_total
-                    for _ in range(diff):
-                        selected_country = random.choices(country_keys, weights=country_weights)[0]
-                        previous_entry['Countries'][selected_country] += 1
+        distribute(previous_entry.countries, previous_entry.occupations, new_hires,
+                   country_weights, occupation_weights, distribute_rng)
         
         # Update quarter label
         year = 2022 + (current_quarter - 1) // 4
         q_num = ((current_quarter - 1) % 4) + 1
-        previous_entry['Quarter'] = f"Q{q_num}-{year}"
+        previous_entry.quarter = f"Q{q_num}-{year}"
         
-        # Store the updated entry
-        data[i] = previous_entry
-    
+        if timed:
+            instrument.record(timer_name, perf_counter() - start)
+        yield previous_entry
+
+def clone_previous_quarter(data, growth_type="linear", engine="python", seed=None, weights=None):
+    """
+    Fills data[1:] by cloning each previous quarter and adding employees.
+
+    See simulate_quarters for the growth types and engines; the length of data
+    sets the horizon. Prefer simulate_quarters or stream_scenario for long
+    horizons, which don't need the whole list in memory.
+    """
+    quarters = simulate_quarters(data[0], len(data), growth_type, engine, seed, weights)
+    for i, quarter in enumerate(to_dicts(quarters), 1):
+        data[i] = quarter
     return data
 
-def generate_initial_conditions(num_conditions, growth_type="linear"):
+def to_dicts(quarters):
     """
-    Generates multiple initial conditions and saves each to a JSON file.
-    
-    Growth type can be "linear", "quadratic", "exponential", "bell_curve", "logistic", 
-    "cyclic", "stagnation-growth", "decline", "acquisition", or "failure".
-    
+    Yields each Quarter as a dict, timing the conversion as "generate.serialize"
+    when instrumentation is on.
+    """
+    if not instrument.enabled:
+        for quarter in quarters:
+            yield quarter.to_dict()
+        return
+    for quarter in quarters:
+        start = perf_counter()
+        data = quarter.to_dict()
+        instrument.record("generate.serialize", perf_counter() - start)
+        yield data
+
+def make_initial_quarter(rng=random):
+    """
+    Creates the first quarter of a new company.
+
     For B2B SaaS companies, the initial conditions reflect early-stage startups
     with focus on engineering, sales, and admin, and typically concentrated in
     1-2 locations.
     """
-    for i in range(num_conditions):
-        # For early B2B SaaS, we'll start with a small team balanced between countries and roles
-        initial_employees = random.randint(3, 8)
+    # For early B2B SaaS, we'll start with a small team balanced between countries and roles
+    initial_employees = rng.randint(3, 8)
+    
+    # Initialize all countries with 0 employees
+    countries = {country: 0 for country in COUNTRIES}
+    
+    # Initialize all occupations with 0 employees
+    occupations = {occupation: 0 for occupation in OCCUPATIONS}
+    
+    # Distribute initial employees with strong US preference
+    for _ in range(initial_employees):
+        # 90% chance of placing employees in USA for initial team
+        if rng.random() < 0.9:
+            selected_country = "USA"
+        else:
+            # 10% chance of placing in India
+            selected_country = "India"
         
-        # Initialize all countries with 0 employees
-        countries = {
-            "USA": 0,
-            "UK": 0,
-            "India": 0,
-            "Brazil": 0,
-            "France": 0
-        }
+        countries[selected_country] += 1
         
-        # Initialize all occupations with 0 employees
-        occupations = {
-            "Software Engineering": 0,
-            "Sales": 0,
-            "Administration": 0,
-            "Product Management": 0,
-            "Customer Success": 0,
-            "Finance": 0,
-            "Legal": 0
-        }
+        # Distribute roles focusing on core functions
+        role_chance = rng.random()
+        if role_chance < 0.6:
+            # 60% chance of Software Engineering
+            selected_occupation = "Software Engineering"
+        elif role_chance < 0.9:
+            # 30% chance of Sales
+            selected_occupation = "Sales"
+        else:
+            # 10% chance of Administration
+            selected_occupation = "Administration"
         
-        # Distribute initial employees with strong US preference
-        for _ in range(initial_employees):
-            # 90% chance of placing employees in USA for initial team
-            if random.random() < 0.9:
-                selected_country = "USA"
-            else:
-                # 10% chance of placing in India
-                selected_country = "India"
-            
-            countries[selected_country] += 1
-            
-            # Distribute roles focusing on core functions
-            role_chance = random.random()
-            if role_chance < 0.6:
-                # 60% chance of Software Engineering
-                selected_occupation = "Software Engineering"
-            elif role_chance < 0.9:
-                # 30% chance of Sales
-                selected_occupation = "Sales"
+        occupations[selected_occupation] += 1
+    
+    # Ensure occupation total matches country total by adjusting as needed
+    country_total = sum(countries.values())
+    occupation_total = sum(occupations.values())
+    
+    if country_total > occupation_total:
+        # Add to occupations (focused on core functions)
+        for _ in range(country_total - occupation_total):
+            if rng.random() < 0.7:
+                occupations["Software Engineering"] += 1
             else:
-                # 10% chance of Administration
-                selected_occupation = "Administration"
-            
-            occupations[selected_occupation] += 1
-        
-        # Ensure occupation total matches country total by adjusting as needed
-        country_total = sum(countries.values())
-        occupation_total = sum(occupations.values())
-        
-        if country_total > occupation_total:
-            # Add to occupations (focused on core functions)
-            for _ in range(country_total - occupation_total):
-                if random.random() < 0.7:
-                    occupations["Software Engineering"] += 1
-                else:
-                    occupations["Sales"] += 1
-        elif occupation_total > country_total:
-            # Add to countries (focused on US)
-            for _ in range(occupation_total - country_total):
-                countries["USA"] += 1
-        
-        # Initial capital (seed funding, typically $0.5M - $3M for early stage B2B SaaS)
-        initial_capital = round(random.uniform(0.5, 3.0), 2)
-        
-        # Create initial data entry
-        data = [
-            {
-                "Quarter": "Q1-2022", 
-                "Countries": countries,
-                "Occupations": occupations, 
-                "Capital": initial_capital
-            }
-        ]
-        
-        # Create empty slots for additional quarters
-        for _ in range(11):
-            data.append({})
-        
-        # Generate growth data
-        updated_data = clone_previous_quarter(data, growth_type)
-        
-        # Save to file
-        with open(f'saas_growth_{growth_type}_{i+1}.json', 'w') as f:
-            json.dump(updated_data, f, indent=4)
-
-# Generate different growth types
-growth_types = [
-    ("linear", 3),
-    ("quadratic", 3),
-    ("exponential", 3),
-    ("bell_curve", 3),
-    ("logistic", 3),
-    ("cyclic", 3),
-    ("stagnation-growth", 3),
-    ("decline", 3),
-    ("acquisition", 3),
-    ("failure", 3),
-    ("piecewise_funding", 3),
-    ("linear_to_exponential", 3),
-    ("exponential_to_decline", 3)
-]
-
-# Generate all scenarios
-for growth_type, count in growth_types:
-    generate_initial_conditions(count, growth_type)
-    print(f"Generated {count} scenarios with {growth_type} growth pattern")
-
-print("All B2B SaaS growth scenarios generated successfully")
\ No newline at end of file
+                occupations["Sales"] += 1
+    elif occupation_total > country_total:
+        # Add to countries (focused on US)
+        for _ in range(occupation_total - country_total):
+            countries["USA"] += 1
+    
+    # Initial capital (seed funding, typically $0.5M - $3M for early stage B2B SaaS)
+    initial_capital = round(rng.uniform(0.5, 3.0), 2)
+    
+    return {
+        "Quarter": "Q1-2022", 
+        "Countries": countries,
+        "Occupations": occupations, 
+        "Capital": initial_capital
+    }
+
+def derive_seed(master_seed, growth_type, index):
+    """
+    Derives the seed of one scenario from the master seed of a run.
+
+    The seed depends only on (master_seed, growth_type, index), so a scenario
+    comes out the same whichever worker generates it and in whatever order.
+    Hashing keeps the streams of neighbouring scenarios unrelated.
+    """
+    digest = hashlib.sha256(f"{master_seed}:{growth_type}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+def generate_scenario(growth_type="linear", seed=None, engine="python", num_quarters=12, weights=None):
+    """
+    Generates one company's quarters without writing anything to disk.
+
+    Args:
+        growth_type (str or GrowthModel): Growth pattern passed to simulate_quarters.
+        seed (int, optional): Seed for a reproducible scenario. None uses the global random state.
+        engine (str): Hiring engine, "python", "alias" or "numpy".
+        num_quarters (int): Number of quarters to simulate, including the first.
+        weights (dict, optional): Hiring weight overrides, see simulate_quarters.
+
+    Returns:
+        list: One dict per quarter.
+    """
+    return list(to_dicts(stream_scenario(growth_type, seed, engine, num_quarters, weights)))
+
+def stream_scenario(growth_type="linear", seed=None, engine="python", num_quarters=12, weights=None):
+    """
+    Yields one company's quarters one at a time, starting with the first.
+
+    Same arguments and same quarters as generate_scenario, but as Quarter
+    records, and memory stays flat however many quarters are simulated.
+    """
+    rng = random.Random(seed) if seed is not None else random
+
+    first_quarter = Quarter.from_dict(make_initial_quarter(rng))
+    yield first_quarter
+    
+    growth_seed = rng.getrandbits(64) if seed is not None else None
+    yield from simulate_quarters(first_quarter, num_quarters, growth_type, engine=engine, seed=growth_seed,
+                                 weights=weights)
+
+def write_json_stream(filename, items, indent=4):
+    """
+    Writes an iterable as a JSON array, one element at a time.
+
+    The output is byte-identical to json.dump(list(items), file, indent=indent),
+    without materializing the list.
+    """
+    with open(filename, 'w') as file:
+        stream.write_json_array(file, items, indent)
+
+def _generate_unit(unit, num_quarters=12, output_dir=".", engine="python", model_params=None, weights=None):
+    """
+    Generates one (growth_type, index, seed) work unit; runs in pool workers.
+
+    Streams the scenario as JSON into output_dir and returns the filename and
+    its scenario index entry, or returns (name, data) when output_dir is None.
+    """
+    growth_type, index, seed = unit
+    model = growth_models.get_model(growth_type, **(model_params or {}).get(growth_type, {}))
+    quarters = to_dicts(stream_scenario(model, seed, engine, num_quarters, weights))
+    name = f'saas_growth_{growth_type}_{index + 1}'
+    if output_dir is None:
+        return name, list(quarters)
+    filename = os.path.join(output_dir, f'{name}.json')
+    summary = scenario_index.ScenarioSummary()
+    write_json_stream(filename, summary.track(quarters), indent=4)
+    return filename, scenario_index.make_entry(filename, summary.record(name, seed))
+
+def generate_initial_conditions(num_conditions, growth_type="linear", seed=None, num_quarters=12, output_dir="."):
+    """
+    Generates multiple initial conditions and saves each to a JSON file.
+    
+    Growth type can be any name registered in growth_models.MODELS.
+    
+    With a master seed, every scenario gets its own seed from derive_seed, so
+    the files match what generate_parallel writes for the same seed.
+    """
+    entries = []
+    for i in range(num_conditions):
+        scenario_seed = derive_seed(seed, growth_type, i) if seed is not None else None
+        entries.append(_generate_unit((growth_type, i, scenario_seed), num_quarters, output_dir)[1])
+    scenario_index.update_index(output_dir, entries)
+
+def generate_parallel(growth_types, master_seed=None, workers=None, num_quarters=12, output_dir=".", engine="python",
+                      output_format="json", model_params=None, weights=None):
+    """
+    Generates scenarios for several growth types across a process pool.
+
+    Every (growth_type, index) pair is an independent work unit with its own
+    random stream derived from the master seed, so the files are bit-identical
+    regardless of the number of workers.
+    JSON output also records every scenario in the directory's index, see
+    scenario_index.
+
+    Args:
+        growth_types (list): (growth_type, count) pairs.
+        master_seed (int, optional): Seed of the whole run. A random one is drawn if omitted.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        num_quarters (int): Quarters per scenario.
+        output_dir (str): Directory the JSON files are written to.
+        engine (str): Hiring engine, "python", "alias" or "numpy".
+        output_format (str): "json" writes one file per scenario; "npz" or
+            "parquet" writes all scenarios to one columnar saas_growth.<format>
+            file (see columnar).
+        model_params (dict, optional): growth_type -> {param: value} overrides
+            of the growth model parameters (see growth_models).
+        weights (dict, optional): Hiring weight overrides for every scenario,
+            see simulate_quarters.
+
+    Returns:
+        tuple: (master_seed, list of written filenames).
+    """
+    if master_seed is None:
+        master_seed = random.randrange(2 ** 63)
+
+    units = [
+        (growth_type, i, derive_seed(master_seed, growth_type, i))
+        for growth_type, count in growth_types
+        for i in range(count)
+    ]
+    columnar_output = output_format != "json"
+    generate = partial(_generate_unit, num_quarters=num_quarters, engine=engine, model_params=model_params,
+                       weights=weights, output_dir=None if columnar_output else output_dir)
+
+    if workers == 1:
+        results = [generate(unit) for unit in units]
+    else:
+        # Workers keep their own timers; bring them back to this process with every result
+        instrumented = instrument.enabled
+        if instrumented:
+            generate = partial(instrument.collect, generate)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(units) // ((workers or os.cpu_count() or 1) * 4))
+            results = list(executor.map(generate, units, chunksize=chunksize))
+        if instrumented:
+            for _, timers in results:
+                instrument.merge(timers)
+            results = [result for result, _ in results]
+
+    if not columnar_output:
+        scenario_index.update_index(output_dir, [entry for _, entry in results])
+        return master_seed, [filename for filename, _ in results]
+
+    import columnar
+    filename = os.path.join(output_dir, f"saas_growth.{output_format}")
+    columnar.write_table(filename, columnar.scenarios_to_table(dict(results)))
+    return master_seed, [filename]
+
+def parse_growth_types(specs, default_count):
+    """
+    Parses CLI growth type specs of the form "name" or "name:count".
+
+    Returns:
+        list: (growth_type, count) pairs.
+
+    Raises:
+        ValueError: For unknown growth types and counts that are not positive whole numbers.
+    """
+    growth_types = []
+    for spec in specs:
+        name, _, count = spec.partition(":")
+        if name not in GROWTH_TYPES:
+            raise ValueError(f"Unknown growth type: {name}")
+        try:
+            count = int(count) if count else default_count
+        except ValueError:
+            raise ValueError(f"Expected name:count with a whole number of scenarios, got: {spec}") from None
+        if count < 1:
+            raise ValueError(f"The number of scenarios must be at least 1, got: {spec}")
+        growth_types.append((name, count))
+    return growth_types
+
+def load_weights(filename):
+    """
+    Reads hiring weight overrides from a JSON file.
+
+    Returns:
+        dict: {'countries': {name: weight}, 'occupations': {name: weight}}, either key optional.
+
+    Raises:
+        ValueError: If the file is not such an object, names a country or
+            occupation that scenarios don't have, holds a weight that is not a
+            non-negative number, or leaves every country or occupation with zero weight.
+    """
+    with open(filename, 'r') as file:
+        weights = json.load(file)
+    if not isinstance(weights, dict) or set(weights) - {"countries", "occupations"}:
+        raise ValueError(f"{filename}: expected an object with 'countries' and/or 'occupations'")
+    dimensions = {
+        "countries": (COUNTRIES, get_country_weights),
+        "occupations": (OCCUPATIONS, get_occupation_weights)
+    }
+    for key, overrides in weights.items():
+        names, get_weights = dimensions[key]
+        if not isinstance(overrides, dict):
+            raise ValueError(f"{filename}: '{key}' must be an object of name: weight")
+        unknown = set(overrides) - set(names)
+        if unknown:
+            raise ValueError(f"{filename}: unknown {key} {', '.join(sorted(unknown))}; "
+                             f"expected any of {', '.join(names)}")
+        for name, weight in overrides.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < float("inf"):
+                raise ValueError(f"{filename}: the weight of {name} must be a non-negative number, got {weight!r}")
+        if not sum(get_weights(names, overrides)) > 0:
+            raise ValueError(f"{filename}: at least one of the {key} needs a positive weight")
+    return weights
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate B2B SaaS growth scenarios as JSON files.")
+    parser.add_argument("growth_types", nargs="*", default=GROWTH_TYPES,
+                        help="Growth types to generate, optionally as name:count (default: all)")
+    parser.add_argument("-n", "--count", type=int, default=3, help="Scenarios per growth type (default: 3)")
+    parser.add_argument("-q", "--quarters", type=int, default=12, help="Quarters per scenario (default: 12)")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="Master seed for a reproducible run")
+    parser.add_argument("-o", "--output-dir", default=".", help="Directory to write scenarios to (default: .)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--engine", choices=["python", "alias", "numpy"], default="python",
+                        help="Hiring engine (default: python)")
+    parser.add_argument("--format", choices=["json", "npz", "parquet"], default="json",
+                        help="One JSON file per scenario, or one columnar file for all, read back with "
+                             "rev.py or columnar.py to-json (default: json)")
+    parser.add_argument("-p", "--param", action="append", metavar="TYPE.PARAM=VALUE",
+                        help="Override a growth model parameter, e.g. logistic.carrying_capacity=200")
+    parser.add_argument("--weights", help='JSON file of hiring weight overrides, e.g. {"countries": {"USA": 0.5}}')
+    parser.add_argument("--stats", metavar="FILE",
+                        help="Record per-model and per-phase timings and write them as JSON to FILE, or - for a table")
+    args = parser.parse_args(argv)
+    if args.stats:
+        instrument.enable()
+
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.workers < 0:
+        parser.error("--workers must be a positive number, or 0 for one per CPU")
+    try:
+        growth_types = parse_growth_types(args.growth_types, args.count)
+        model_params = growth_models.parse_params(args.param)
+        weights = load_weights(args.weights) if args.weights else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.quarters < 1:
+        parser.error("--quarters must be at least 1")
+    if args.format != "json":
+        # Fail before generating anything rather than when the corpus is written
+        try:
+            import columnar
+            if args.format == "parquet":
+                columnar.import_pyarrow()
+        except ImportError as e:
+            parser.error(f"--format {args.format}: {e}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    master_seed, filenames = generate_parallel(
+        growth_types,
+        master_seed=args.seed,
+        workers=args.workers or None,
+        num_quarters=args.quarters,
+        output_dir=args.output_dir,
+        engine=args.engine,
+        output_format=args.format,
+        model_params=model_params,
+        weights=weights
+    )
+
+    for growth_type, count in growth_types:
+        print(f"Generated {count} scenarios with {growth_type} growth pattern")
+    total = sum(count for _, count in growth_types)
+    destination = args.output_dir if args.format == "json" else filenames[0]
+    print(f"Generated {total} B2B SaaS growth scenarios in {destination} (seed {master_seed})")
+    if args.stats:
+        instrument.dump(args.stats)
+
+if __name__ == "__main__":
+    main()
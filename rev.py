@@ -1,73 +1,163 @@
+import hashlib
 import json
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 
+import instrument
+import stream
+from quarter import Quarter
+
+# Country salary multipliers (normalized to USA = 1.0)
+COUNTRY_MULTIPLIERS = {
+    "USA": 1.0,     # Base reference country
+    "UK": 0.85,     # 85% of US salaries
+    "India": 0.30,  # 30% of US salaries
+    "France": 0.78, # 78% of US salaries
+    "Brazil": 0.38  # 38% of US salaries
+}
+
+# Role revenue multipliers (min and max revenue per $1 of salary)
+ROLE_MULTIPLIERS = {
+    "Sales": (2.5, 4),                    # Sales directly impacts revenue
+    "Software Engineering": (2.0, 3.5),   # Engineering creates product value
+    "Product Management": (2.0, 3.0),     # Product influences revenue significantly
+    "Customer Success": (2.0, 3.0),       # Customer retention drives recurring revenue
+    "Administration": (1.0, 2.0),         # Support function
+    "Finance": (1.5, 2.5),                # Financial optimization
+    "Legal": (1.0, 2.0)                   # Risk mitigation
+}
+
+# Base salary by role (in USD for USA)
+BASE_SALARIES = {
+    "Sales": 110000,
+    "Software Engineering": 130000,
+    "Product Management": 125000,
+    "Customer Success": 85000,
+    "Administration": 65000,
+    "Finance": 95000,
+    "Legal": 120000
+}
+
+# Fallbacks for countries and roles missing from the tables above
+DEFAULT_COUNTRY_MULTIPLIER = 0.7
+DEFAULT_ROLE_MULTIPLIER = (1.5, 2.5)
+DEFAULT_BASE_SALARY = 90000
+
+# Per-directory record of what each file was last priced from (see process_directory)
+MANIFEST_NAME = ".revenue_manifest.json"
+
+# Quarters priced per call of the vectorized engine when streaming a file
+STREAM_BATCH = 1024
+
+# Scenario files are named saas_growth_<growth type>_<n>; nothing else in a directory is priced
+SCENARIO_PREFIX = "saas_growth_"
+
+DEFAULT_REVENUE_CACHE_SIZE = 65536
+
+def revenue_cache_size():
+    """
+    Number of headcount configurations whose revenue calculate_revenue keeps.
+
+    Read from the PS_REVENUE_CACHE environment variable: a whole number of
+    entries, with 0 disabling the cache. Unset, empty or invalid values give
+    DEFAULT_REVENUE_CACHE_SIZE; invalid ones also print a warning.
+    """
+    value = os.environ.get("PS_REVENUE_CACHE", "").strip()
+    if not value:
+        return DEFAULT_REVENUE_CACHE_SIZE
+    try:
+        size = int(value)
+        if size < 0:
+            raise ValueError(value)
+        return size
+    except ValueError:
+        print(f"Warning: PS_REVENUE_CACHE must be a whole number of entries (0 disables the cache), "
+              f"got {value!r}; using {DEFAULT_REVENUE_CACHE_SIZE}", file=sys.stderr)
+        return DEFAULT_REVENUE_CACHE_SIZE
+
+REVENUE_CACHE_SIZE = revenue_cache_size()
+
+REVENUE_FIELDS = ("Revenue", "RevenueMin", "RevenueMax", "RevenuePerEmployee", "CapitalToRevenueRatio")
+
+@instrument.timed("revenue.calculate")
 def calculate_revenue(employee_data):
     """
     Calculate revenue based on employee distribution across countries and job roles
     using salary estimates with min and max ranges.
     
+    The headcount part is memoized in a bounded LRU cache shared by every
+    caller in the process, the web app included, so quarters with the same
+    headcount (the seed quarters of generate_initial_conditions, a stagnating
+    company) are priced once. Keys are a quarter's names and counts in their
+    own order, since that order fixes the order of the float sums, plus the
+    version of the tables, which is checked on every call so that editing
+    the tables never serves stale revenue; see check_revenue_cache and
+    revenue_cache_stats.
+    
     Args:
-        employee_data (dict): A dictionary containing employee distribution data.
+        employee_data (dict or Quarter): A quarter dict containing employee
+            distribution data, or a Quarter record.
         
     Returns:
         dict: Revenue calculations and related metrics.
     """
-    # Country salary multipliers (normalized to USA = 1.0)
-    country_multipliers = {
-        "USA": 1.0,     # Base reference country
-        "UK": 0.85,     # 85% of US salaries
-        "India": 0.30,  # 30% of US salaries
-        "France": 0.78, # 78% of US salaries
-        "Brazil": 0.38  # 38% of US salaries
-    }
+    version = check_revenue_cache()
+    if isinstance(employee_data, Quarter):
+        revenue = _cached_headcount_revenue(
+            version, employee_data.country_names, tuple(employee_data.countries),
+            employee_data.occupation_names, tuple(employee_data.occupations))
+        capital = employee_data.capital * 1000000
+    else:
+        countries = employee_data.get("Countries", {})
+        occupations = employee_data.get("Occupations", {})
+        revenue = _cached_headcount_revenue(
+            version, tuple(countries), tuple(countries.values()), tuple(occupations), tuple(occupations.values()))
+        capital = employee_data.get("Capital", 0) * 1000000 
     
-    # Role revenue multipliers (min and max revenue per $1 of salary)
-    role_multipliers = {
-        "Sales": (2.5, 4),                    # Sales directly impacts revenue
-        "Software Engineering": (2.0, 3.5),   # Engineering creates product value
-        "Product Management": (2.0, 3.0),     # Product influences revenue significantly
-        "Customer Success": (2.0, 3.0),       # Customer retention drives recurring revenue
-        "Administration": (1.0, 2.0),         # Support function
-        "Finance": (1.5, 2.5),                # Financial optimization
-        "Legal": (1.0, 2.0)                   # Risk mitigation
-    }
+    total_revenue_min, total_revenue_max, total_revenue, revenue_per_employee = revenue
+    capital_to_revenue_ratio = capital / total_revenue if total_revenue > 0 else 0
     
-    # Base salary by role (in USD for USA)
-    base_salaries = {
-        "Sales": 110000,
-        "Software Engineering": 130000,
-        "Product Management": 125000,
-        "Customer Success": 85000,
-        "Administration": 65000,
-        "Finance": 95000,
-        "Legal": 120000
+    return {
+        "Revenue": total_revenue,
+        "RevenueMin": total_revenue_min,
+        "RevenueMax": total_revenue_max,
+        "RevenuePerEmployee": revenue_per_employee,
+        "CapitalToRevenueRatio": capital_to_revenue_ratio
     }
 
-    countries = employee_data.get("Countries", {})
-    occupations = employee_data.get("Occupations", {})
-    capital = employee_data.get("Capital", 0) * 1000000 
+def headcount_revenue(country_names, country_counts, occupation_names, occupation_counts):
+    """
+    The part of calculate_revenue that depends only on headcount.
     
-    total_employees = sum(countries.values())
+    Args:
+        country_names (sequence): Countries.
+        country_counts (sequence): Headcount per country, in the same order.
+        occupation_names (sequence): Job roles.
+        occupation_counts (sequence): Headcount per role, in the same order.
+        
+    Returns:
+        tuple: (RevenueMin, RevenueMax, Revenue, RevenuePerEmployee).
+    """
+    total_employees = sum(country_counts)
     total_revenue_min = 0
     total_revenue_max = 0
     
-    country_distribution = {}
-    for country, count in countries.items():
-        country_distribution[country] = count / total_employees if total_employees > 0 else 0
-    
     role_distribution = {}
-    role_total = sum(occupations.values())
-    for role, count in occupations.items():
+    role_total = sum(occupation_counts)
+    for role, count in zip(occupation_names, occupation_counts):
         role_distribution[role] = count / role_total if role_total > 0 else 0
     
-    for country, country_percent in country_distribution.items():
-        country_count = countries[country]
-        country_factor = country_multipliers.get(country, 0.7) 
+    for country, country_count in zip(country_names, country_counts):
+        country_factor = COUNTRY_MULTIPLIERS.get(country, DEFAULT_COUNTRY_MULTIPLIER) 
     
         for role, role_percent in role_distribution.items():
             role_count = country_count * role_percent
-            base_salary = base_salaries.get(role, 90000) 
-            role_multiplier_min, role_multiplier_max = role_multipliers.get(role, (1.5, 2.5))
+            base_salary = BASE_SALARIES.get(role, DEFAULT_BASE_SALARY) 
+            role_multiplier_min, role_multiplier_max = ROLE_MULTIPLIERS.get(role, DEFAULT_ROLE_MULTIPLIER)
             salary_cost = base_salary * country_factor * role_count
             role_revenue_min = salary_cost * role_multiplier_min
             role_revenue_max = salary_cost * role_multiplier_max
@@ -80,77 +170,598 @@ def calculate_revenue(employee_data):
     total_revenue = round(total_revenue / 1000) * 1000
     
     revenue_per_employee = round(total_revenue / total_employees) if total_employees > 0 else 0
-    capital_to_revenue_ratio = capital / total_revenue if total_revenue > 0 else 0
+    return total_revenue_min, total_revenue_max, total_revenue, revenue_per_employee
+
+def price_quarters(quarters, engine="python"):
+    """
+    Calculate revenue for a list of quarters.
     
+    Args:
+        quarters (list): Quarter dicts to price.
+        engine (str): "python" calls calculate_revenue per quarter, "numpy" prices
+            the whole list as one matrix operation (see rev_np).
+        
+    Returns:
+        list: One revenue dict per quarter.
+    """
+    if engine == "numpy":
+        import rev_np
+        return rev_np.price_quarters(quarters)
+    if engine != "python":
+        raise ValueError(f"Unknown engine: {engine}")
+    return [calculate_revenue(quarter) for quarter in quarters]
+
+def price_stream(quarters, engine="python", batch_size=STREAM_BATCH):
+    """
+    Prices quarters as they arrive from an iterable.
+    
+    The python engine prices one quarter at a time; the numpy engine prices
+    batches of batch_size, so at most that many quarters are held at once.
+    
+    Yields:
+        tuple: (quarter, revenue dict) for every quarter, in order.
+    """
+    if engine == "python":
+        for quarter in quarters:
+            yield quarter, calculate_revenue(quarter)
+        return
+    
+    batch = []
+    for quarter in quarters:
+        batch.append(quarter)
+        if len(batch) == batch_size:
+            yield from zip(batch, price_quarters(batch, engine))
+            batch = []
+    if batch:
+        yield from zip(batch, price_quarters(batch, engine))
+
+def iter_scenario_quarters(filename):
+    """
+    Yields the quarters of a scenario file one at a time, see stream.iter_quarters.
+    
+    Raises:
+        ValueError: If a quarter has no Countries or Occupations, so that
+            files which are not scenarios are never priced as zero revenue.
+    """
+    for number, quarter in enumerate(stream.iter_quarters(filename), 1):
+        if not isinstance(quarter, dict) or "Countries" not in quarter or "Occupations" not in quarter:
+            raise ValueError(f"Quarter {number} has no Countries or Occupations")
+        yield quarter
+
+def write_json_atomic(filename, data, indent=4):
+    """
+    Write JSON to a temporary file next to filename, then rename it into place.
+    
+    Readers never see a half-written file, and a crash leaves the original intact.
+    
+    Args:
+        filename (str): Destination path.
+        data: JSON-serializable data.
+        indent (int): Indentation passed to json.dump, or None for compact output.
+    """
+    write_atomic(filename, lambda file: json.dump(data, file, indent=indent))
+
+def write_atomic(filename, write):
+    """
+    Calls write(file) on a temporary file next to filename, then renames it into place.
+    
+    Returns:
+        The return value of write.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as file:
+            result = write(file)
+        # mkstemp creates owner-only files; keep the permissions of the file being replaced
+        try:
+            mode = os.stat(filename).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return result
+
+def tables_version():
+    """
+    Hash of the multiplier and salary tables.
+    
+    Stored in the incremental manifest so that editing any table forces every
+    file to be repriced.
+    
+    Returns:
+        str: Hex digest identifying the current tables.
+    """
+    tables = [
+        COUNTRY_MULTIPLIERS,
+        ROLE_MULTIPLIERS,
+        BASE_SALARIES,
+        DEFAULT_COUNTRY_MULTIPLIER,
+        DEFAULT_ROLE_MULTIPLIER,
+        DEFAULT_BASE_SALARY
+    ]
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode()).hexdigest()[:16]
+
+@lru_cache(maxsize=REVENUE_CACHE_SIZE)
+def _cached_headcount_revenue(version, country_names, country_counts, occupation_names, occupation_counts):
+    return headcount_revenue(country_names, country_counts, occupation_names, occupation_counts)
+
+def _current_tables():
+    # Looked up at call time, so replacing a table is noticed as well as editing it
+    return (COUNTRY_MULTIPLIERS, ROLE_MULTIPLIERS, BASE_SALARIES,
+            DEFAULT_COUNTRY_MULTIPLIER, DEFAULT_ROLE_MULTIPLIER, DEFAULT_BASE_SALARY)
+
+def _snapshot_tables():
+    return tuple(dict(table) if isinstance(table, dict) else table for table in _current_tables())
+
+# Copy and version of the tables the cached revenue was computed with, see check_revenue_cache
+_cached_tables = _snapshot_tables()
+_cache_version = tables_version()
+
+# Lookups made by worker processes, see merge_revenue_cache_stats
+_worker_lookups = {"hits": 0, "misses": 0}
+
+def check_revenue_cache():
+    """
+    Drops the cached revenue if the multiplier or salary tables changed.
+    
+    Called by calculate_revenue on every lookup and by rev_np.get_engine.
+    The tables are compared with a copy taken when they were last seen,
+    which costs a few dict comparisons; they are only hashed again when
+    they differ.
+    
+    Returns:
+        str: tables_version() of the current tables.
+    """
+    global _cached_tables, _cache_version
+    if _current_tables() != _cached_tables:
+        _cached_headcount_revenue.cache_clear()
+        _cached_tables = _snapshot_tables()
+        _cache_version = tables_version()
+    return _cache_version
+
+def clear_revenue_cache():
+    """Drops every cached configuration and resets the statistics."""
+    _cached_headcount_revenue.cache_clear()
+    _worker_lookups.update(hits=0, misses=0)
+
+def merge_revenue_cache_stats(counts):
+    """Adds the cache 'hits' and 'misses' of a worker process to revenue_cache_stats."""
+    _worker_lookups["hits"] += counts["hits"]
+    _worker_lookups["misses"] += counts["misses"]
+
+def revenue_cache_stats():
+    """
+    Hit and miss statistics of the revenue cache of calculate_revenue.
+    
+    Returns:
+        dict: 'size' and 'maxsize' of the cache in this process, and 'hits',
+            'misses' and 'hit_rate' including those merged from workers.
+    """
+    info = _cached_headcount_revenue.cache_info()
+    hits = info.hits + _worker_lookups["hits"]
+    misses = info.misses + _worker_lookups["misses"]
     return {
-        "Revenue": total_revenue,
-        "RevenueMin": total_revenue_min,
-        "RevenueMax": total_revenue_max,
-        "RevenuePerEmployee": revenue_per_employee,
-        "CapitalToRevenueRatio": capital_to_revenue_ratio
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0
     }
 
-def update_json_files(json_files):
+def input_hash(company_data):
+    """
+    Hash of the fields revenue is computed from (headcount and capital) in every quarter.
+    
+    Args:
+        company_data (list): Quarter dicts of one scenario.
+        
+    Returns:
+        str: Hex digest of the revenue inputs.
+    """
+    hasher = InputHasher()
+    for quarter in company_data:
+        hasher.update(quarter)
+    return hasher.hexdigest()
+
+class InputHasher:
+    """
+    Computes input_hash one quarter at a time, for files read as a stream.
+    """
+    
+    def __init__(self):
+        self._sha = hashlib.sha256(b"[")
+        self._separator = b""
+        self.all_priced = True
+    
+    def update(self, quarter):
+        inputs = [quarter.get("Countries", {}), quarter.get("Occupations", {}), quarter.get("Capital", 0)]
+        # Hashes the same bytes as json.dumps of the whole list of inputs
+        self._sha.update(self._separator + json.dumps(inputs).encode())
+        self._separator = b", "
+        self.all_priced = self.all_priced and "Revenue" in quarter
+    
+    def hexdigest(self):
+        sha = self._sha.copy()
+        sha.update(b"]")
+        return sha.hexdigest()[:16]
+
+def load_manifest(directory_path="."):
+    """
+    Load the incremental manifest of a directory.
+    
+    Returns:
+        dict: Manifest with 'tables_version' and per-file 'files' entries, or an
+            empty manifest if none exists or it cannot be read.
+    """
+    try:
+        with open(os.path.join(directory_path, MANIFEST_NAME), 'r') as file:
+            manifest = json.load(file)
+        if isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"tables_version": None, "files": {}}
+
+def save_manifest(directory_path, manifest):
+    write_json_atomic(os.path.join(directory_path, MANIFEST_NAME), manifest)
+
+def _add_revenue(priced, hasher):
+    for quarter, revenue_info in priced:
+        hasher.update(quarter)
+        for field in REVENUE_FIELDS:
+            quarter[field] = revenue_info[field]
+        yield quarter
+
+@instrument.timed("revenue.update_file")
+def update_json_file(filename, engine="python", indent=4, known_inputs=None):
+    """
+    Update one scenario file with revenue information.
+    
+    The file is streamed: quarters are parsed, priced and written to a
+    temporary file as they arrive, which then replaces the original. Only a
+    quarter (or one batch for the numpy engine) is held in memory at a time,
+    whatever the size of the file.
+    
+    Args:
+        filename (str): A .json file holding an array of quarters, or a
+            .jsonl/.ndjson file with one quarter per line.
+        engine (str): Revenue engine, "python" or "numpy".
+        indent (int): Output indentation of .json files, or None for compact output.
+        known_inputs (str, optional): Input hash the file was last priced with.
+            If it still matches, the file is left untouched.
+        
+    Returns:
+        dict: Result with 'file' and 'status' ("ok", "unchanged" or "error"),
+            plus the number of 'quarters' priced or the 'error' message. Successful
+            results also carry the 'inputs' hash, 'mtime_ns' and 'size' of the file,
+            and its 'index' entry (see scenario_index).
+    """
+    import scenario_index
+    
+    name = scenario_index.scenario_name(filename)
+    try:
+        if known_inputs is not None:
+            # Hash-only pass, so that unchanged files are never rewritten
+            hasher = InputHasher()
+            summary = scenario_index.ScenarioSummary()
+            for quarter in iter_scenario_quarters(filename):
+                hasher.update(quarter)
+                summary.add(quarter)
+            if hasher.hexdigest() == known_inputs and hasher.all_priced:
+                stat = os.stat(filename)
+                return {"file": filename, "status": "unchanged", "quarters": len(summary.headcount),
+                        "inputs": known_inputs, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                        "index": scenario_index.make_entry(filename, summary.record(name))}
+        
+        hasher = InputHasher()
+        summary = scenario_index.ScenarioSummary()
+        priced = summary.track(_add_revenue(price_stream(iter_scenario_quarters(filename), engine), hasher))
+        if stream.is_json_lines(filename):
+            quarters = write_atomic(filename, lambda file: stream.write_json_lines(file, priced))
+        else:
+            quarters = write_atomic(filename, lambda file: stream.write_json_array(file, priced, indent))
+        
+        stat = os.stat(filename)
+        return {
+            "file": filename,
+            "status": "ok",
+            "quarters": quarters,
+            "inputs": hasher.hexdigest(),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "index": scenario_index.make_entry(filename, summary.record(name))
+        }
+        
+    except Exception as e:
+        return {"file": filename, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+def _update_with_known_inputs(filename, known_inputs, engine, indent):
+    return update_json_file(filename, engine, indent, known_inputs)
+
+def update_json_files(json_files, engine="python", workers=1, indent=4, verbose=True, known_inputs=None):
     """
     Update the specified JSON files with revenue information.
     
     Args:
         json_files (list): List of JSON filenames to update.
+        engine (str): Revenue engine, "python" or "numpy".
+        workers (int): Worker processes; 1 runs in this process, None uses one per CPU.
+        indent (int): Output indentation, or None for compact output.
+        verbose (bool): Print a line per file.
+        known_inputs (dict, optional): Input hash per filename from a previous
+            run; files whose inputs still match are not rewritten.
+        
+    Returns:
+        dict: Summary with 'total', 'succeeded' (filenames), 'unchanged'
+            (filenames), 'failed' ({'file', 'error'} dicts), 'seconds', and
+            'results' holding the per-file result of every success.
     """
-    for filename in json_files:
-        try:
-            with open(filename, 'r') as file:
-                company_data = json.load(file)
-            
-            for quarter in company_data:
-                revenue_info = calculate_revenue(quarter)
-                quarter["Revenue"] = revenue_info["Revenue"]
-                quarter["RevenueMin"] = revenue_info["RevenueMin"]
-                quarter["RevenueMax"] = revenue_info["RevenueMax"]
-                quarter["RevenuePerEmployee"] = revenue_info["RevenuePerEmployee"]
-                quarter["CapitalToRevenueRatio"] = revenue_info["CapitalToRevenueRatio"]
-            
-            with open(filename, 'w') as file:
-                json.dump(company_data, file, indent=4)
-            
-            print(f"Updated {filename} with revenue information.")
+    start = time.perf_counter()
+    update = partial(_update_with_known_inputs, engine=engine, indent=indent)
+    known = [(known_inputs or {}).get(filename) for filename in json_files]
+    
+    if workers == 1:
+        results = map(update, json_files, known)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, min(64, len(json_files) // ((workers or os.cpu_count() or 1) * 4)))
+        # Workers keep their own timers and revenue cache; bring their
+        # statistics back to this process with every result
+        work = partial(_collect_cache_counts, update)
+        if instrument.enabled:
+            work = partial(instrument.collect, work)
+        results = executor.map(work, json_files, known, chunksize=chunksize)
+        results = (_merge_worker_stats(item) for item in results)
+    
+    summary = {"total": len(json_files), "succeeded": [], "unchanged": [], "failed": [], "results": []}
+    try:
+        for result in results:
+            if result["status"] == "error":
+                summary["failed"].append({"file": result["file"], "error": result["error"]})
+                if verbose:
+                    print(f"Error processing {result['file']}: {result['error']}")
+                continue
             
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
+            summary["results"].append(result)
+            if result["status"] == "ok":
+                summary["succeeded"].append(result["file"])
+                if verbose:
+                    print(f"Updated {result['file']} with revenue information.")
+            else:
+                summary["unchanged"].append(result["file"])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    return summary
+
+def _collect_cache_counts(func, *args):
+    before = _cached_headcount_revenue.cache_info()
+    result = func(*args)
+    after = _cached_headcount_revenue.cache_info()
+    return result, {"hits": after.hits - before.hits, "misses": after.misses - before.misses}
+
+def _merge_worker_stats(item):
+    if instrument.enabled:
+        item, timers = item
+        instrument.merge(timers)
+    result, counts = item
+    merge_revenue_cache_stats(counts)
+    return result
 
-def process_directory(directory_path="."):
+def update_columnar_file(path):
+    """
+    Update a columnar scenario file (.npz or .parquet) with revenue information.
+    
+    The headcount columns are priced in one pass by the vectorized engine and
+    the revenue columns are rewritten atomically.
+    
+    Args:
+        path (str): Columnar file written by columnar.write_table.
+        
+    Returns:
+        dict: Result with 'file' and 'status' ("ok" or "error"), plus the
+            number of 'quarters' priced or the 'error' message.
+    """
+    try:
+        import columnar
+        import rev_np
+        
+        table = columnar.read_table(path)
+        countries, occupations = columnar.headcount_matrices(table)
+        engine = rev_np.get_engine(table["country_names"].tolist(), table["occupation_names"].tolist())
+        for column, values in engine.price(countries, occupations, table["Capital"]).items():
+            table[column] = values.astype(float)
+        columnar.write_table(path, table)
+        return {"file": path, "status": "ok", "quarters": len(table["Capital"])}
+        
+    except Exception as e:
+        return {"file": path, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+def list_json_files(directory_path="."):
+    """
+    List the scenario files (saas_growth_*.json, .jsonl or .ndjson) in a directory.
+    
+    Other JSON files, such as the manifest, the scenario index or anything
+    unrelated that happens to share the directory, are left out.
+    
+    Args:
+        directory_path (str): Path to directory containing JSON files.
+        
+    Returns:
+        list: Paths of the scenario files.
+    """
+    with os.scandir(directory_path) as entries:
+        return [entry.path for entry in entries
+                if entry.name.startswith(SCENARIO_PREFIX)
+                and entry.name.endswith(('.json',) + stream.JSON_LINES_EXTENSIONS) and entry.is_file()]
+
+def process_directory(directory_path=".", engine="python", workers=1, indent=4, verbose=True, incremental=False,
+                      filters=()):
     """
     Process all JSON files in the specified directory.
     
+    In incremental mode a manifest in the directory records, per file, the
+    hash of its revenue inputs and the size and mtime it had after pricing,
+    together with the version of the multiplier tables. Files whose size and
+    mtime are unchanged are skipped without being opened; files that were
+    touched but whose inputs hash the same are not rewritten. Changing the
+    tables reprices everything.
+    
     Args:
         directory_path (str): Path to directory containing JSON files.
+        engine (str): Revenue engine, "python" or "numpy".
+        workers (int): Worker processes; 1 runs in this process, None uses one per CPU.
+        indent (int): Output indentation, or None for compact output.
+        verbose (bool): Print a line per file.
+        incremental (bool): Only reprice files whose inputs changed since the last run.
+        filters (iterable): scenario_index.parse_filter outputs; only scenarios
+            matching all of them are priced, selected from the directory's index.
+        
+    Returns:
+        dict: Summary from update_json_files plus the number of 'skipped' files,
+            or None if the directory could not be read.
     """
+    import scenario_index
+    
     json_files = []
     
     try:
-        json_files = [os.path.join(directory_path, f) for f in os.listdir(directory_path) 
-                     if f.endswith('.json')]
+        if filters:
+            json_files = scenario_index.select_files(directory_path, filters)
+        else:
+            json_files = list_json_files(directory_path)
     except Exception as e:
         print(f"Error reading directory {directory_path}: {e}")
-        return
+        return None
     
     if not json_files:
         print(f"No JSON files found in {directory_path}")
-        return
+        summary = update_json_files([], engine)
+        summary["skipped"] = 0
+        return summary
+    
+    skipped = []
+    known_inputs = {}
+    if incremental:
+        manifest = load_manifest(directory_path)
+        version = tables_version()
+        if manifest.get("tables_version") != version:
+            manifest = {"tables_version": version, "files": {}}
+        
+        pending = []
+        for filename in json_files:
+            entry = manifest["files"].get(os.path.basename(filename))
+            if entry is None:
+                pending.append(filename)
+                continue
+            stat = os.stat(filename)
+            if stat.st_mtime_ns == entry["mtime_ns"] and stat.st_size == entry["size"]:
+                skipped.append(filename)
+            else:
+                known_inputs[filename] = entry["inputs"]
+                pending.append(filename)
+        json_files = pending
+    
+    summary = update_json_files(json_files, engine, workers, indent, verbose, known_inputs)
+    summary["total"] += len(skipped)
+    summary["skipped"] = len(skipped)
+    
+    # Keep the scenario index current with the entries built while pricing
+    try:
+        scenario_index.update_index(directory_path, [result.pop("index") for result in summary["results"]],
+                                    repriced=True)
+    except OSError as e:
+        print(f"Error updating the scenario index of {directory_path}: {e}")
+    
+    if incremental:
+        present = {os.path.basename(filename) for filename in skipped}
+        if filters:
+            # Files left out by the filters keep their entries
+            selected = {os.path.basename(filename) for filename in json_files}
+            present |= {os.path.basename(filename) for filename in list_json_files(directory_path)} - selected
+        files = {name: entry for name, entry in manifest["files"].items() if name in present}
+        for result in summary["results"]:
+            files[os.path.basename(result["file"])] = {
+                "inputs": result["inputs"],
+                "mtime_ns": result["mtime_ns"],
+                "size": result["size"]
+            }
+        manifest["files"] = files
+        save_manifest(directory_path, manifest)
     
-    update_json_files(json_files)
-    print(f"Processed {len(json_files)} JSON files with revenue data.")
+    print(f"Processed {len(json_files)} JSON files with revenue data "
+          f"({len(summary['failed'])} failed, {len(skipped)} skipped, {summary['seconds']}s).")
+    return summary
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    import contextlib
     
-    if len(sys.argv) > 1:
-        directory_path = sys.argv[1]
-        if not os.path.isdir(directory_path):
-            print(f"Error: {directory_path} is not a valid directory.")
-            sys.exit(1)
-    else:
-        directory_path = "."
+    parser = argparse.ArgumentParser(description="Add revenue information to scenario JSON files.")
+    parser.add_argument("directory_path", nargs="?", default=".",
+                        help="Directory containing JSON files, or a columnar .npz/.parquet file (default: .)")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python", help="Revenue engine (default: python)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--compact", action="store_true", help="Write compact JSON instead of indenting")
+    parser.add_argument("--summary", help="Write a JSON summary of successes and failures to this file, or - for stdout")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't print a line per file")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Only reprice files whose headcount, capital or the revenue tables changed")
+    parser.add_argument("--where", action="append", default=[], metavar="FIELD OP VALUE",
+                        help="Only price scenarios matching this scenario index filter, "
+                             "e.g. growth_type=exponential; repeat to combine")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="Record revenue timings and write them as JSON to FILE, or - for a table; "
+                             "also prints revenue cache statistics")
+    args = parser.parse_args()
+    try:
+        import scenario_index
+        filters = [scenario_index.parse_filter(spec) for spec in args.where]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.stats:
+        instrument.enable()
+    
+    if args.directory_path.endswith((".npz", ".parquet")) and os.path.isfile(args.directory_path):
+        result = update_columnar_file(args.directory_path)
+        if result["status"] != "ok":
+            print(f"Error processing {args.directory_path}: {result['error']}")
+            sys.exit(2)
+        print(f"Updated {result['quarters']} quarters in {args.directory_path} with revenue information.")
+        sys.exit(0)
+    
+    if not os.path.isdir(args.directory_path):
+        print(f"Error: {args.directory_path} is not a valid directory.")
+        sys.exit(1)
+    
+    # With the summary on stdout, progress messages go to stderr so it stays valid JSON
+    messages = sys.stderr if args.summary == "-" else sys.stdout
+    with contextlib.redirect_stdout(messages):
+        summary = process_directory(args.directory_path, args.engine, args.workers or None,
+                                    None if args.compact else 4, not args.quiet, args.incremental, filters)
+    if summary is None:
+        sys.exit(1)
+    
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, indent=4)
+        print()
+    elif args.summary:
+        write_json_atomic(args.summary, summary)
     
-    process_directory(directory_path)
-    print("Revenue calculation completed.")
\ No newline at end of file
+    with contextlib.redirect_stdout(messages):
+        print("Revenue calculation completed.")
+        if args.stats:
+            instrument.dump(args.stats)
+        if args.stats and args.engine == "python":
+            cache = revenue_cache_stats()
+            print(f"Revenue cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.1%}), "
+                  f"{cache['size']} configurations kept")
+    if summary["failed"]:
+        sys.exit(2)
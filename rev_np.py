@@ -0,0 +1,231 @@
+import numpy as np
+
+import instrument
+import rev
+from quarter import Quarter
+
+# Half-way points closer than this (relative) are recomputed in the reference order
+TIE_TOLERANCE = 1e-9
+
+def _round_thousands(values):
+    # np.round rounds half to even, like round() in rev.calculate_revenue
+    return np.round(values / 1000) * 1000
+
+def _near_tie(values):
+    scaled = values / 1000
+    return np.abs(scaled - np.floor(scaled) - 0.5) <= TIE_TOLERANCE * np.maximum(1.0, np.abs(scaled))
+
+def default_tables():
+    """The multiplier and salary tables of rev, in the form RevenueEngine accepts."""
+    return {
+        "country_multipliers": dict(rev.COUNTRY_MULTIPLIERS),
+        "role_multipliers": dict(rev.ROLE_MULTIPLIERS),
+        "base_salaries": dict(rev.BASE_SALARIES)
+    }
+
+def finish_metrics(total_min, total_max, total_employees, capital):
+    """
+    Rounds unrounded min/max revenue into the metrics of rev.calculate_revenue.
+
+    Arrays broadcast against each other, so one call can finish a whole sweep.
+
+    Args:
+        total_min (array): Unrounded minimum revenue.
+        total_max (array): Unrounded maximum revenue.
+        total_employees (array): Headcount.
+        capital (array): Capital in dollars.
+
+    Returns:
+        dict: Revenue, RevenueMin, RevenueMax, RevenuePerEmployee and CapitalToRevenueRatio arrays.
+    """
+    revenue = _round_thousands((total_min + total_max) / 2)
+    total_employees = np.broadcast_to(total_employees, revenue.shape)
+    revenue_per_employee = np.round(np.divide(revenue, total_employees, out=np.zeros_like(revenue),
+                                              where=total_employees > 0))
+    capital = np.broadcast_to(capital, revenue.shape)
+    ratio = np.divide(capital, revenue, out=np.zeros_like(revenue), where=revenue > 0)
+    return {
+        "Revenue": revenue.astype(np.int64),
+        "RevenueMin": _round_thousands(total_min).astype(np.int64),
+        "RevenueMax": _round_thousands(total_max).astype(np.int64),
+        "RevenuePerEmployee": revenue_per_employee.astype(np.int64),
+        "CapitalToRevenueRatio": ratio
+    }
+
+class RevenueEngine:
+    """
+    Prices stacks of quarters as matrix operations.
+
+    The country multipliers, role multipliers and base salaries are compiled
+    into arrays once for a fixed column order. Revenue then factors into
+    (country-weighted headcount) x (role value per employee), which is two
+    matrix products for any number of quarters.
+
+    Args:
+        country_names (list): Column order of the country headcount arrays.
+        role_names (list): Column order of the occupation headcount arrays.
+        tables (dict, optional): 'country_multipliers', 'role_multipliers' and
+            'base_salaries' replacing the tables in rev; see default_tables.
+    """
+
+    def __init__(self, country_names, role_names, tables=None):
+        self.country_names = list(country_names)
+        self.role_names = list(role_names)
+        tables = tables or default_tables()
+
+        self.country_factors = np.array(
+            [tables["country_multipliers"].get(c, rev.DEFAULT_COUNTRY_MULTIPLIER) for c in self.country_names], dtype=float)
+        base_salaries = np.array(
+            [tables["base_salaries"].get(r, rev.DEFAULT_BASE_SALARY) for r in self.role_names], dtype=float)
+        multipliers = np.array(
+            [tables["role_multipliers"].get(r, rev.DEFAULT_ROLE_MULTIPLIER) for r in self.role_names], dtype=float)
+        self.base_salaries = base_salaries
+        self.multipliers_min = multipliers[:, 0]
+        self.multipliers_max = multipliers[:, 1]
+        # Revenue per employee of each role at USA salaries: columns are (min, max)
+        self.role_values = base_salaries[:, None] * multipliers
+
+    def _exact_revenue(self, countries, occupations):
+        """
+        Recomputes min/max revenue with the same operation order as rev.calculate_revenue.
+
+        Used only for the few quarters whose fast result sits on a rounding
+        boundary, so the rounded output always matches the reference.
+        """
+        role_total = occupations.sum(axis=-1, keepdims=True)
+        role_percent = np.divide(occupations, role_total, out=np.zeros(occupations.shape), where=role_total > 0)
+        total_min = np.zeros(len(countries))
+        total_max = np.zeros(len(countries))
+        for c, country_factor in enumerate(self.country_factors):
+            for r, base_salary in enumerate(self.base_salaries):
+                role_count = countries[:, c] * role_percent[:, r]
+                salary_cost = base_salary * country_factor * role_count
+                total_min += salary_cost * self.multipliers_min[r]
+                total_max += salary_cost * self.multipliers_max[r]
+        return total_min, total_max
+
+    def price(self, countries, occupations, capital):
+        """
+        Computes the revenue metrics of rev.calculate_revenue for many quarters at once.
+
+        Args:
+            countries (array): Headcount per country, shape (..., countries).
+            occupations (array): Headcount per occupation, shape (..., roles).
+            capital (array): Capital in millions, shape (...).
+
+        Returns:
+            dict: Revenue, RevenueMin, RevenueMax, RevenuePerEmployee and
+                CapitalToRevenueRatio arrays of shape (...).
+        """
+        countries = np.asarray(countries, dtype=float)
+        occupations = np.asarray(occupations, dtype=float)
+        shape = countries.shape[:-1]
+        countries = countries.reshape(-1, len(self.country_names))
+        occupations = occupations.reshape(-1, len(self.role_names))
+        capital = np.asarray(capital, dtype=float).reshape(-1) * 1000000
+
+        total_employees = countries.sum(axis=1)
+        role_total = occupations.sum(axis=1)
+        country_cost = countries @ self.country_factors
+        role_values = np.divide(occupations @ self.role_values, role_total[:, None],
+                                out=np.zeros((len(occupations), 2)), where=role_total[:, None] > 0)
+        total_min = country_cost * role_values[:, 0]
+        total_max = country_cost * role_values[:, 1]
+
+        ties = _near_tie(total_min) | _near_tie(total_max) | _near_tie((total_min + total_max) / 2)
+        if ties.any():
+            total_min[ties], total_max[ties] = self._exact_revenue(countries[ties], occupations[ties])
+
+        metrics = finish_metrics(total_min, total_max, total_employees, capital)
+        return {name: values.reshape(shape) for name, values in metrics.items()}
+
+# (tables version, country names, role names) -> engine compiled from rev's tables
+_engines = {}
+
+def get_engine(country_names, role_names):
+    """
+    Returns the compiled engine for a column order, building it on first use.
+
+    Engines are keyed on rev.check_revenue_cache's version of the tables, so
+    editing the tables in rev compiles new engines instead of reusing stale ones.
+    """
+    version = rev.check_revenue_cache()
+    key = (version, tuple(country_names), tuple(role_names))
+    if key not in _engines:
+        # Engines compiled from earlier tables are never used again
+        for stale in [k for k in _engines if k[0] != version]:
+            del _engines[stale]
+        _engines[key] = RevenueEngine(*key[1:])
+    return _engines[key]
+
+def quarters_to_arrays(quarters):
+    """
+    Stacks quarter dicts into headcount matrices.
+
+    Columns follow the order in which countries and roles first appear, which
+    for generated scenarios is the order of every quarter's dicts.
+
+    Quarter records that share their name tuples, as every quarter of a
+    simulated scenario does, are stacked straight from their count arrays.
+
+    Returns:
+        tuple: (country_names, role_names, countries, occupations, capital).
+    """
+    if quarters and all(isinstance(q, Quarter) for q in quarters):
+        first = quarters[0]
+        if all(q.country_names is first.country_names and q.occupation_names is first.occupation_names
+               for q in quarters):
+            countries = np.array([q.countries for q in quarters], dtype=float)
+            occupations = np.array([q.occupations for q in quarters], dtype=float)
+            capital = np.array([q.capital for q in quarters], dtype=float)
+            return list(first.country_names), list(first.occupation_names), countries, occupations, capital
+        quarters = [q.to_dict() for q in quarters]
+
+    country_names = list(dict.fromkeys(c for q in quarters for c in q.get("Countries", {})))
+    role_names = list(dict.fromkeys(r for q in quarters for r in q.get("Occupations", {})))
+    countries = np.array([[q.get("Countries", {}).get(c, 0) for c in country_names] for q in quarters],
+                         dtype=float).reshape(len(quarters), len(country_names))
+    occupations = np.array([[q.get("Occupations", {}).get(r, 0) for r in role_names] for q in quarters],
+                           dtype=float).reshape(len(quarters), len(role_names))
+    capital = np.array([q.get("Capital", 0) for q in quarters], dtype=float)
+    return country_names, role_names, countries, occupations, capital
+
+@instrument.timed("revenue.numpy_batch")
+def price_quarters(quarters):
+    """
+    Vectorized equivalent of calling rev.calculate_revenue on every quarter.
+
+    Args:
+        quarters (list): Quarter dicts with 'Countries', 'Occupations' and 'Capital',
+            or Quarter records.
+
+    Returns:
+        list: One revenue dict per quarter, with the same values and types as
+            rev.calculate_revenue.
+    """
+    if not quarters:
+        return []
+    country_names, role_names, countries, occupations, capital = quarters_to_arrays(quarters)
+    metrics = get_engine(country_names, role_names).price(countries, occupations, capital)
+
+    results = []
+    for i in range(len(quarters)):
+        revenue = int(metrics["Revenue"][i])
+        results.append({
+            "Revenue": revenue,
+            "RevenueMin": int(metrics["RevenueMin"][i]),
+            "RevenueMax": int(metrics["RevenueMax"][i]),
+            "RevenuePerEmployee": int(metrics["RevenuePerEmployee"][i]),
+            "CapitalToRevenueRatio": float(metrics["CapitalToRevenueRatio"][i]) if revenue > 0 else 0
+        })
+    return results
+
+def price_batch(results):
+    """
+    Prices every quarter of a batch.simulate_batch result.
+
+    Returns:
+        dict: Revenue metric arrays of shape (companies, quarters).
+    """
+    engine = get_engine(results["country_names"], results["occupation_names"])
+    return engine.price(results["countries"], results["occupations"], results["capital"])
@@ -1,12 +1,412 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, request, abort, g
+from collections import OrderedDict
+from datetime import datetime, timezone
+from time import perf_counter, sleep
+import asyncio
+import hashlib
 import json
 import os
+import re
+import threading
+
+import instrument
+import rev
+import scenario_index
+import series
+import stream
+import wire
 
 app = Flask(__name__)
 
-def load_data():
-    with open('saas_growth_quadratic_1.json', 'r') as file:
-        return json.load(file)
+# Directory holding the saas_growth_*.json scenarios served by the API
+DATA_DIR = os.environ.get("SCENARIO_DIR", ".")
+DEFAULT_SCENARIO = "saas_growth_quadratic_1"
+SCENARIO_PREFIX = rev.SCENARIO_PREFIX
+SCENARIO_NAME = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+# Seconds between checks of a watched scenario file, and between keep-alive
+# comments on an idle event stream (which also detect closed connections)
+WATCH_INTERVAL = float(os.environ.get("WATCH_INTERVAL", "1.0"))
+HEARTBEAT_INTERVAL = 15.0
+
+class ScenarioCache:
+    """
+    In-memory cache of parsed scenario files.
+
+    Every lookup stats the file and reloads it only if its mtime or size
+    changed, so edits on disk show up on the next request without re-parsing
+    unchanged files. Each entry keeps the serialized response body and an
+    ETag, so cached scenarios are served without touching json at all.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Set once every scenario has been loaded, see warm_cache
+        self.warmed = False
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json")
+
+    def names(self):
+        """Names of the scenario files currently in the directory, sorted."""
+        with os.scandir(self.directory) as entries:
+            return sorted(
+                entry.name[:-5] for entry in entries
+                if entry.name.startswith(SCENARIO_PREFIX) and entry.name.endswith(".json") and entry.is_file()
+            )
+
+    def _load(self, name, stat):
+        with open(self._path(name), 'r') as file:
+            data = json.load(file)
+        return self._entry(name, data, stat)
+
+    def _entry(self, name, data, stat):
+        with instrument.timer("web.serialize"):
+            body = json.dumps(data).encode()
+        return {
+            "name": name,
+            "data": data,
+            "body": body,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "etag": hashlib.sha1(body).hexdigest(),
+            "last_modified": datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+        }
+
+    def get(self, name):
+        """
+        Returns the cache entry for a scenario, reloading it if the file changed.
+
+        Returns:
+            dict: Entry with 'data', 'body', 'etag' and 'last_modified', or None
+                if the scenario does not exist.
+        """
+        if not SCENARIO_NAME.match(name):
+            return None
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(name, None)
+            return None
+
+        entry = self._entries.get(name)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = self._load(name, stat)
+            with self._lock:
+                self._entries[name] = entry
+        return entry
+
+    def series(self, name):
+        """
+        Returns the chart-ready series of a scenario as (body, etag), or None.
+
+        Computed once per version of the file and kept on its cache entry, so
+        a reload of the file also invalidates its series.
+        """
+        return self._derived(name, "series", series.build_series)
+
+    def compact(self, name):
+        """
+        Returns a scenario in the compact wire format as (body, etag), or None.
+
+        See wire.encode_scenario; cached on the entry like series.
+        """
+        return self._derived(name, "compact", wire.encode_scenario)
+
+    def compact_series(self, name):
+        """
+        Returns the series of a scenario in the compact wire format as (body, etag), or None.
+        """
+        return self._derived(name, "compact_series", lambda data: wire.encode_series(series.build_series(data)))
+
+    def _derived(self, name, key, build):
+        entry = self.get(name)
+        if entry is None:
+            return None
+        if f"{key}_body" not in entry:
+            body = json.dumps(build(entry["data"])).encode()
+            entry[f"{key}_etag"] = hashlib.sha1(body).hexdigest()
+            entry[f"{key}_body"] = body
+        return entry[f"{key}_body"], entry[f"{key}_etag"]
+
+    def load_all(self):
+        """Loads every scenario in the directory; called once at startup."""
+        for name in self.names():
+            try:
+                self.get(name)
+            except (OSError, ValueError) as e:
+                print(f"Error loading scenario {name}: {e}")
+        self.warmed = True
+
+    async def load_all_async(self, concurrency=8):
+        """
+        Loads every scenario in the directory, several files at a time.
+
+        Reads run in executor threads while already-read chunks are parsed
+        incrementally on the event loop (see stream.load_json_async), so
+        startup on a large corpus is not serialized on disk I/O.
+
+        Args:
+            concurrency (int): Maximum number of files being read at once.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(name):
+            async with semaphore:
+                try:
+                    stat = os.stat(self._path(name))
+                    data = await stream.load_json_async(self._path(name))
+                except (OSError, ValueError) as e:
+                    print(f"Error loading scenario {name}: {e}")
+                    return
+                entry = self._entry(name, data, stat)
+                with self._lock:
+                    self._entries[name] = entry
+
+        await asyncio.gather(*(load(name) for name in self.names()))
+        self.warmed = True
+
+scenario_cache = ScenarioCache(DATA_DIR)
+
+_warm_lock = threading.Lock()
+
+def warm_cache():
+    """
+    Loads every scenario into scenario_cache, once.
+
+    Runs before the first request whatever server hosts the app (see
+    warm_cache_before_request); importing run loads nothing, and scenarios
+    not loaded here are read on first use anyway.
+    """
+    with _warm_lock:
+        if scenario_cache.warmed:
+            return
+        if not os.path.isdir(scenario_cache.directory):
+            print(f"Error: scenario directory {scenario_cache.directory} does not exist.")
+            scenario_cache.warmed = True
+            return
+        asyncio.run(scenario_cache.load_all_async())
+
+# (growth_type, percentiles) -> (scenario ETags the bands were built from, body, etag),
+# least recently used first; percentiles come from the query string, so the cache is bounded
+_bands_cache = OrderedDict()
+_bands_lock = threading.Lock()
+BANDS_CACHE_SIZE = 256
+
+def growth_type_bands(growth_type, percentiles):
+    """
+    Returns the percentile bands of one growth type as (body, etag), or None.
+
+    Rebuilt only when a scenario of that growth type is added, removed or changed.
+    """
+    names = [name for name in scenario_cache.names() if scenario_index.growth_type_of(name) == growth_type]
+    entries = [entry for entry in map(scenario_cache.get, names) if entry is not None]
+    if not entries:
+        return None
+
+    key = (growth_type, percentiles)
+    etags = tuple(entry["etag"] for entry in entries)
+    with _bands_lock:
+        cached = _bands_cache.get(key)
+        if cached is not None:
+            _bands_cache.move_to_end(key)
+    if cached is None or cached[0] != etags:
+        series_list = [json.loads(scenario_cache.series(entry["name"])[0]) for entry in entries]
+        bands = series.percentile_bands(series_list, percentiles)
+        bands["growth_type"] = growth_type
+        body = json.dumps(bands).encode()
+        cached = (etags, body, hashlib.sha1(body).hexdigest())
+        with _bands_lock:
+            _bands_cache[key] = cached
+            _bands_cache.move_to_end(key)
+            if len(_bands_cache) > BANDS_CACHE_SIZE:
+                _bands_cache.popitem(last=False)
+    return cached[1], cached[2]
+
+# (etag, encoding) -> compressed body, least recently used first
+_compressed = OrderedDict()
+_compressed_lock = threading.Lock()
+COMPRESSED_CACHE_SIZE = 1024
+
+def compressed_body(body, etag, encoding):
+    """
+    Returns body compressed with encoding, compressing it only the first time.
+
+    Bodies are keyed by their ETag, so a changed scenario gets a new entry and
+    the stale one ages out of the cache.
+    """
+    key = (etag, encoding)
+    with _compressed_lock:
+        cached = _compressed.get(key)
+        if cached is not None:
+            _compressed.move_to_end(key)
+            return cached
+    cached = wire.compress(body, encoding)
+    with _compressed_lock:
+        _compressed[key] = cached
+        if len(_compressed) > COMPRESSED_CACHE_SIZE:
+            _compressed.popitem(last=False)
+    return cached
+
+def conditional_response(body, etag, last_modified=None):
+    """
+    Builds a JSON response that carries ETag/Last-Modified and answers
+    conditional GETs with 304 Not Modified.
+
+    Bodies are sent with Brotli or gzip when the client accepts it, from
+    the precompressed cache. Each coding gets its own ETag.
+    """
+    encoding = wire.choose_encoding(request.accept_encodings) if len(body) >= wire.MIN_COMPRESS_SIZE else None
+    if encoding is not None:
+        body = compressed_body(body, etag, encoding)
+        etag = f"{etag}-{encoding}"
+    response = app.response_class(body, mimetype="application/json")
+    if encoding is not None:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def requested_format():
+    """The ?format= of the request: "json" (default) or "compact", see wire."""
+    response_format = request.args.get("format", "json")
+    if response_format not in wire.FORMATS:
+        abort(400, description=f"format must be one of: {', '.join(wire.FORMATS)}")
+    return response_format
+
+def scenario_response(name):
+    response_format = requested_format()
+    try:
+        entry = scenario_cache.get(name)
+        compact = scenario_cache.compact(name) if entry is not None and response_format == "compact" else None
+    except (OSError, ValueError) as e:
+        abort(500, description=f"Error loading scenario {name}: {e}")
+    if entry is None:
+        abort(404, description=f"Unknown scenario: {name}")
+    if compact is not None:
+        return conditional_response(*compact, entry["last_modified"])
+    return conditional_response(entry["body"], entry["etag"], entry["last_modified"])
+
+def base_etag(value):
+    """Strips quotes, W/ and the coding suffix of conditional_response from an ETag."""
+    value = value.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    value = value.strip('"')
+    for encoding in wire.ENCODINGS:
+        if value.endswith(f"-{encoding}"):
+            return value[:-len(encoding) - 1]
+    return value
+
+def server_sent_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+def watch_scenario(name, known_etag=None, interval=WATCH_INTERVAL):
+    """
+    Yields server-sent events as a scenario file and its directory change.
+
+    The file is checked every interval seconds through scenario_cache, which
+    only re-reads it when its mtime or size changed. Every new version of the
+    series is sent as a 'patch' event holding only the changed quarters (see
+    series.diff_series), with the series ETag as event id. Scenario files
+    added to or removed from the directory are sent as a 'scenarios' event,
+    and 'removed' ends the stream if the watched file or the directory goes
+    away or can no longer be read.
+
+    Args:
+        name (str): Scenario to watch.
+        known_etag (str, optional): ETag of the series (plain or compact) the
+            client already has. If it is not the current one, the first patch
+            starts at quarter 0.
+    """
+    sent = None
+    try:
+        names = set(scenario_cache.names())
+    except OSError:
+        # The directory went away or became unreadable
+        yield server_sent_event("removed", {"name": name})
+        return
+    idle = 0.0
+    while True:
+        try:
+            current = scenario_cache.series(name)
+            if current and sent is None and known_etag is not None and known_etag != current[1]:
+                # The client may hold the compact series; None if the file just went away
+                compact = scenario_cache.compact_series(name)
+                current = None if compact is None else (*current, compact[1])
+        except (OSError, ValueError):
+            # Caught while the file was being written; the next check sees the finished file
+            current = False
+        if current is None:
+            yield server_sent_event("removed", {"name": name})
+            return
+
+        if current:
+            body, etag = current[:2]
+            if sent is None and known_etag in current[1:]:
+                # The version the client loaded needs no patch
+                sent = (json.loads(body), etag)
+            if sent is None or sent[1] != etag:
+                new = json.loads(body)
+                patch = series.diff_series(sent[0] if sent else None, new)
+                if patch is not None:
+                    yield server_sent_event("patch", patch, etag)
+                    idle = 0.0
+                sent = (new, etag)
+
+        try:
+            current_names = set(scenario_cache.names())
+        except OSError:
+            yield server_sent_event("removed", {"name": name})
+            return
+        if current_names != names:
+            added = [{"name": new_name, "growth_type": scenario_index.growth_type_of(new_name)}
+                     for new_name in sorted(current_names - names)]
+            yield server_sent_event("scenarios", {"added": added, "removed": sorted(names - current_names)})
+            names = current_names
+            idle = 0.0
+
+        if idle >= HEARTBEAT_INTERVAL:
+            yield ": keep-alive\n\n"
+            idle = 0.0
+        sleep(interval)
+        idle += interval
+
+@app.before_request
+def warm_cache_before_request():
+    # Requests arriving while the first one warms the cache wait for it
+    if not scenario_cache.warmed:
+        warm_cache()
+
+@app.before_request
+def start_timer():
+    if instrument.enabled:
+        g.request_start = perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        # Timed per route rule, so every scenario shares one timer
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        instrument.record(f"http {request.method} {rule}", perf_counter() - start)
+    return response
+
+@app.route('/metrics')
+def get_metrics():
+    body = json.dumps({"enabled": instrument.enabled, "timers": instrument.stats(),
+                       "revenue_cache": rev.revenue_cache_stats()}).encode()
+    return app.response_class(body, mimetype="application/json")
 
 @app.route('/')
 def index():
@@ -14,8 +414,144 @@ def index():
 
 @app.route('/api/data')
 def get_data():
-    data = load_data()
-    return jsonify(data)
+    return scenario_response(DEFAULT_SCENARIO)
+
+# Summary fields of the scenario index added to each scenario of a query
+INDEX_FIELDS = ("seed", "final_headcount", "peak_headcount", "capital_raised", "funding_quarters", "final_revenue")
+
+# Scenario index of DATA_DIR as of the last query; kept in memory, never saved by a request
+_scenario_index = None
+_index_lock = threading.Lock()
+
+def current_index():
+    """
+    Returns the scenario index of DATA_DIR, refreshed against the files.
+
+    Only new or changed files are summarized again (see scenario_index.load_index),
+    and the result stays in memory, so serving a query never writes to the
+    directory; the generator and rev.py save the index on disk.
+    """
+    global _scenario_index
+    with _index_lock:
+        _scenario_index = scenario_index.load_index(DATA_DIR, save=False, known=_scenario_index)
+        return _scenario_index
+
+def query_scenarios(args):
+    """
+    Selects scenarios with the scenario index from /api/scenarios query arguments.
+
+    Accepts repeated where=FIELD OP VALUE filters, FIELD=VALUE shortcuts for
+    equality, sort=[-]FIELD and limit=N; see scenario_index.query.
+
+    Returns:
+        list: (name, index entry) pairs of the matching scenarios, in order.
+    """
+    try:
+        filters = [scenario_index.parse_filter(spec) for spec in args.getlist("where")]
+        filters += [scenario_index.parse_filter(f"{field}={args[field]}")
+                    for field in scenario_index.FIELDS if field in args]
+        sort = args.get("sort")
+        if sort:
+            scenario_index.check_field(sort.lstrip("-"))
+    except ValueError as e:
+        abort(400, description=str(e))
+    limit = args.get("limit")
+    if limit is not None:
+        if not (limit.isascii() and limit.isdigit()):
+            abort(400, description="limit must be a non-negative integer")
+        limit = int(limit)
+
+    served = set(scenario_cache.names())
+    index = {key: entry for key, entry in current_index().items() if entry["name"] in served}
+    return [(entry["name"], entry) for entry in scenario_index.query(index, filters, sort, limit)]
+
+@app.route('/api/scenarios')
+def list_scenarios():
+    if request.args:
+        # Only the scenarios matching the query are loaded
+        selected = query_scenarios(request.args)
+    else:
+        selected = [(name, None) for name in scenario_cache.names()]
+
+    scenarios = []
+    for name, index_entry in selected:
+        try:
+            entry = scenario_cache.get(name)
+        except (OSError, ValueError):
+            continue
+        if entry is not None:
+            scenario = {
+                "name": name,
+                "growth_type": scenario_index.growth_type_of(name),
+                "quarters": len(entry["data"]),
+                "etag": entry["etag"],
+                "last_modified": entry["last_modified"].isoformat()
+            }
+            if index_entry is not None:
+                scenario.update((field, index_entry.get(field)) for field in INDEX_FIELDS)
+            scenarios.append(scenario)
+    body = json.dumps(scenarios).encode()
+    return conditional_response(body, hashlib.sha1(body).hexdigest())
+
+@app.route('/api/scenarios/<name>')
+def get_scenario(name):
+    return scenario_response(name)
+
+@app.route('/api/scenarios/<name>/series')
+def get_scenario_series(name):
+    response_format = requested_format()
+    try:
+        result = scenario_cache.compact_series(name) if response_format == "compact" else scenario_cache.series(name)
+    except (OSError, ValueError) as e:
+        abort(500, description=f"Error loading scenario {name}: {e}")
+    if result is None:
+        abort(404, description=f"Unknown scenario: {name}")
+    return conditional_response(*result)
+
+@app.route('/api/scenarios/<name>/events')
+def get_scenario_events(name):
+    """
+    Server-sent event stream of the changes to a scenario, see watch_scenario.
+
+    Pass the ETag of the series already loaded as ?etag=; reconnecting
+    EventSources resume from their Last-Event-ID instead.
+    """
+    try:
+        entry = scenario_cache.get(name)
+    except (OSError, ValueError) as e:
+        abort(500, description=f"Error loading scenario {name}: {e}")
+    if entry is None:
+        abort(404, description=f"Unknown scenario: {name}")
+    known_etag = request.headers.get("Last-Event-ID") or request.args.get("etag")
+    events = watch_scenario(name, base_etag(known_etag) if known_etag else None)
+    return app.response_class(events, mimetype="text/event-stream",
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/growth-types')
+def list_growth_types():
+    counts = {}
+    for name in scenario_cache.names():
+        growth_type = scenario_index.growth_type_of(name)
+        if growth_type is not None:
+            counts[growth_type] = counts.get(growth_type, 0) + 1
+    body = json.dumps([{"growth_type": g, "scenarios": n} for g, n in sorted(counts.items())]).encode()
+    return conditional_response(body, hashlib.sha1(body).hexdigest())
+
+@app.route('/api/growth-types/<growth_type>/bands')
+def get_growth_type_bands(growth_type):
+    try:
+        percentiles = tuple(float(p) for p in request.args.get("percentiles", "5,50,95").split(","))
+    except ValueError:
+        abort(400, description="percentiles must be a comma-separated list of numbers")
+    if not all(0 <= p <= 100 for p in percentiles):
+        abort(400, description="percentiles must be between 0 and 100")
+    percentiles = tuple(int(p) if p.is_integer() else p for p in percentiles)
+
+    result = growth_type_bands(growth_type, percentiles)
+    if result is None:
+        abort(404, description=f"No scenarios with growth type: {growth_type}")
+    return conditional_response(*result)
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # Threaded, so open event streams don't block other requests
+    app.run(debug=True, threaded=True)
@@ -0,0 +1,134 @@
+from bisect import bisect
+from itertools import accumulate
+
+# Hiring weights, heavily weighted toward US growth
+COUNTRY_WEIGHTS = {
+    "USA": 0.8,
+    "India": 0.1,
+    "UK": 0.05,
+    "France": 0.03,
+    "Brazil": 0.02
+}
+DEFAULT_COUNTRY_WEIGHT = 0.05
+
+# Hiring weights favouring Software Engineering and Sales
+OCCUPATION_WEIGHTS = {
+    "Software Engineering": 0.4,
+    "Sales": 0.3,
+    "Customer Success": 0.15,
+    "Product Management": 0.15
+}
+# Shared equally by the occupations missing from OCCUPATION_WEIGHTS
+OTHER_OCCUPATIONS_WEIGHT = 0.15
+
+def country_weights(names, overrides=None):
+    """
+    Returns the hiring weight of each country, in the order of names.
+
+    Args:
+        names (iterable): Country names.
+        overrides (dict, optional): Country -> weight, replacing the defaults
+            for this scenario. Countries in neither get DEFAULT_COUNTRY_WEIGHT.
+
+    Returns:
+        list: One weight per country.
+    """
+    weights = {**COUNTRY_WEIGHTS, **(overrides or {})}
+    return [weights.get(name, DEFAULT_COUNTRY_WEIGHT) for name in names]
+
+def occupation_weights(names, overrides=None):
+    """
+    Returns the hiring weight of each occupation, in the order of names.
+
+    Occupations without a weight of their own share OTHER_OCCUPATIONS_WEIGHT.
+
+    Args:
+        names (iterable): Occupation names.
+        overrides (dict, optional): Occupation -> weight, replacing the defaults
+            for this scenario.
+
+    Returns:
+        list: One weight per occupation.
+    """
+    names = list(names)
+    weights = {**OCCUPATION_WEIGHTS, **(overrides or {})}
+    # Split across the occupations beyond the four core ones, as the original tables did
+    other = OTHER_OCCUPATIONS_WEIGHT / (len(names) - 4) if len(names) > 4 else OTHER_OCCUPATIONS_WEIGHT
+    return [weights.get(name, other) for name in names]
+
+class WeightTable:
+    """
+    Cumulative weights of one dimension, built once and reused for every draw.
+
+    draw() consumes the random stream exactly like
+    rng.choices(range(n), weights=weights)[0] and returns the same index, but
+    without re-accumulating the weights on every call. Draws cost O(log n).
+    """
+
+    __slots__ = ("weights", "cum_weights", "total", "hi", "_alias")
+
+    def __init__(self, weights):
+        self.weights = list(weights)
+        self.cum_weights = list(accumulate(self.weights))
+        self.total = self.cum_weights[-1] + 0.0 if self.cum_weights else 0.0
+        if not self.total > 0.0:
+            raise ValueError("Total of weights must be greater than zero")
+        self.hi = len(self.weights) - 1
+        self._alias = None
+
+    def __len__(self):
+        return len(self.weights)
+
+    def draw(self, rng):
+        """Returns the index of one weighted draw from rng (random module or random.Random)."""
+        return bisect(self.cum_weights, rng.random() * self.total, 0, self.hi)
+
+    def alias(self):
+        """The AliasTable of the same weights, built on first use."""
+        if self._alias is None:
+            self._alias = AliasTable(self.weights)
+        return self._alias
+
+class AliasTable:
+    """
+    Vose alias table for O(1) weighted draws.
+
+    Draws have the same distribution as WeightTable.draw, one rng.random()
+    call each, but map random numbers to indices differently, so seeded
+    output differs from the reference engine.
+    """
+
+    __slots__ = ("weights", "n", "prob", "alias")
+
+    def __init__(self, weights):
+        self.weights = list(weights)
+        n = self.n = len(self.weights)
+        total = sum(self.weights)
+        if not total > 0:
+            raise ValueError("Total of weights must be greater than zero")
+
+        scaled = [w * n / total for w in self.weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding error and keeps prob 1.0
+
+    def __len__(self):
+        return self.n
+
+    def draw(self, rng):
+        """Returns the index of one weighted draw from rng (random module or random.Random)."""
+        u = rng.random() * self.n
+        index = int(u)
+        return index if u - index < self.prob[index] else self.alias[index]
+
+def as_table(weights):
+    """Returns weights as a table with a draw method, building a WeightTable from a list."""
+    return weights if hasattr(weights, "draw") else WeightTable(weights)
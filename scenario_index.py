@@ -0,0 +1,342 @@
+import argparse
+import json
+import operator
+import os
+import re
+
+import rev
+
+# Per-directory summary of every scenario file (see load_index)
+INDEX_NAME = ".scenario_index.json"
+INDEX_VERSION = 1
+
+# Fields that can be filtered and sorted on; headcount@Q and peak_headcount@Q
+# (quarter Q, counting from 1) are computed from the headcount series
+FIELDS = ("name", "growth_type", "seed", "quarters", "final_headcount", "peak_headcount", "capital_raised",
+          "funding_rounds", "final_revenue")
+
+OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt
+}
+
+SCENARIO_NAME = re.compile(r"^saas_growth_(?P<growth_type>.+)_(?P<index>\d+)$")
+
+FILTER = re.compile(r"^(?P<field>[\w\-]+(?:@\d+)?)\s*(?P<op>>=|<=|!=|=|>|<)\s*(?P<value>.*)$")
+
+def growth_type_of(name):
+    """
+    Extracts the growth type from a scenario name like 'saas_growth_linear_1'.
+
+    Returns:
+        str: The growth type, or None if the name doesn't follow the pattern.
+    """
+    match = SCENARIO_NAME.match(name)
+    return match.group("growth_type") if match else None
+
+class ScenarioSummary:
+    """
+    Accumulates the index record of one scenario from its quarters, one at a time.
+
+    Used while scenario files are written or priced, so the index never needs
+    a second pass over the file.
+    """
+
+    __slots__ = ("headcount", "capital_raised", "funding_quarters", "last_capital", "last_quarter")
+
+    def __init__(self):
+        self.headcount = []
+        self.capital_raised = 0.0
+        self.funding_quarters = []
+        self.last_capital = None
+        self.last_quarter = None
+
+    def add(self, quarter):
+        """Adds the next quarter dict of the scenario."""
+        self.headcount.append(sum(quarter.get("Countries", {}).values()))
+        capital = quarter.get("Capital", 0)
+        if self.last_capital is None:
+            self.capital_raised = capital
+        elif capital > self.last_capital:
+            # Capital only moves at funding rounds
+            self.capital_raised += capital - self.last_capital
+            self.funding_quarters.append(len(self.headcount))
+        self.last_capital = capital
+        self.last_quarter = quarter
+
+    def track(self, quarters):
+        """Yields quarters unchanged, adding each one on the way."""
+        for quarter in quarters:
+            self.add(quarter)
+            yield quarter
+
+    def record(self, name, seed=None):
+        """
+        Returns the index record of the quarters added so far.
+
+        Final revenue comes from the last quarter if it was priced, otherwise
+        it is calculated, so unpriced scenarios can be filtered on it too.
+        """
+        final_revenue = None
+        if self.last_quarter is not None:
+            final_revenue = self.last_quarter.get("Revenue")
+            if final_revenue is None:
+                final_revenue = rev.calculate_revenue(self.last_quarter)["Revenue"]
+        return {
+            "name": name,
+            "growth_type": growth_type_of(name),
+            "seed": seed,
+            "quarters": len(self.headcount),
+            "headcount": self.headcount,
+            "final_headcount": self.headcount[-1] if self.headcount else 0,
+            "peak_headcount": max(self.headcount, default=0),
+            "capital_raised": round(self.capital_raised, 2),
+            "funding_quarters": self.funding_quarters,
+            "funding_rounds": len(self.funding_quarters),
+            "final_revenue": final_revenue
+        }
+
+def scenario_name(filename):
+    """Name of the scenario stored in a file, e.g. 'saas_growth_linear_1'."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def make_entry(filename, record):
+    """Adds the size and mtime of filename to its record, to detect later edits."""
+    stat = os.stat(filename)
+    return {**record, "file": os.path.basename(filename), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def summarize_file(filename, seed=None):
+    """
+    Builds the index entry of a scenario file by streaming it once.
+
+    Returns:
+        dict: The entry, see ScenarioSummary.record and make_entry.
+    """
+    summary = ScenarioSummary()
+    for quarter in rev.iter_scenario_quarters(filename):
+        summary.add(quarter)
+    return make_entry(filename, summary.record(scenario_name(filename), seed))
+
+def read_index(directory_path="."):
+    """
+    Reads the index of a directory as it is on disk, without checking it.
+
+    Returns:
+        dict: File basename -> entry; empty if there is no readable index.
+    """
+    try:
+        with open(os.path.join(directory_path, INDEX_NAME), 'r') as file:
+            index = json.load(file)
+        if index.get("version") == INDEX_VERSION and isinstance(index.get("scenarios"), dict):
+            return index["scenarios"]
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {}
+
+def save_index(directory_path, entries):
+    rev.write_json_atomic(os.path.join(directory_path, INDEX_NAME),
+                          {"version": INDEX_VERSION, "scenarios": dict(sorted(entries.items()))}, indent=None)
+
+def update_index(directory_path, entries, repriced=False):
+    """
+    Adds or replaces entries in the index of a directory.
+
+    Seeds are only known at generation time. Entries of regenerated files
+    replace the seed, even with None; entries of repriced files keep the one
+    already in the index, since pricing leaves the quarters the seed produced.
+
+    Args:
+        directory_path (str): Directory holding the scenarios.
+        entries (list): Entries from make_entry or summarize_file.
+        repriced (bool): The entries come from adding revenue to existing files.
+    """
+    index = read_index(directory_path)
+    for entry in entries:
+        previous = index.get(entry["file"])
+        if repriced and previous is not None:
+            entry = {**entry, "seed": previous.get("seed")}
+        index[entry["file"]] = entry
+    save_index(directory_path, index)
+
+def _current_entry(entry, stat):
+    if entry is not None and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        return entry
+    return None
+
+def load_index(directory_path=".", refresh=True, save=True, known=None):
+    """
+    Loads the index of a directory.
+
+    With refresh, every scenario file is stat'ed: files that are new or whose
+    size or mtime changed since they were indexed are summarized again, and
+    entries of deleted files are dropped. Only those files are opened, and
+    the index is saved back if anything changed. Files changed behind the
+    generator's and rev's back lose their seed, which may no longer
+    reproduce them.
+
+    Args:
+        directory_path (str): Directory holding the scenarios.
+        refresh (bool): Bring the index up to date with the files.
+        save (bool): Save a refreshed index back to the directory. Readers
+            that must not write, like the web app, pass False and keep the
+            result in memory.
+        known (dict, optional): Entries from an earlier call, used for files
+            whose saved entry is missing or out of date but which match them.
+
+    Returns:
+        dict: File basename -> entry.
+    """
+    index = read_index(directory_path)
+    if not refresh:
+        return index
+
+    current = {}
+    changed = False
+    for filename in rev.list_json_files(directory_path):
+        key = os.path.basename(filename)
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            # Deleted since the directory was listed
+            continue
+        entry = _current_entry(index.get(key), stat) or _current_entry((known or {}).get(key), stat)
+        if entry is None:
+            try:
+                entry = summarize_file(filename)
+            except (OSError, ValueError) as e:
+                print(f"Error indexing {filename}: {e}")
+                continue
+        changed = changed or entry is not index.get(key)
+        current[key] = entry
+    if save and (changed or len(current) != len(index)):
+        try:
+            save_index(directory_path, current)
+        except OSError:
+            # A read-only directory can still be queried
+            pass
+    return current
+
+def field_value(entry, field):
+    """
+    Returns the value of a filter or sort field of an entry, or None if it has none.
+    """
+    name, _, quarter = field.partition("@")
+    if not quarter:
+        return entry.get(name)
+    headcount = entry.get("headcount", [])[:int(quarter)]
+    if not headcount:
+        return None
+    if name == "headcount":
+        return headcount[-1] if len(headcount) == int(quarter) else None
+    if name == "peak_headcount":
+        return max(headcount)
+    raise ValueError(f"Only headcount and peak_headcount take @QUARTER, got: {field}")
+
+def check_field(field):
+    name, _, quarter = field.partition("@")
+    if (name not in FIELDS or quarter) and not (quarter and name in ("headcount", "peak_headcount")):
+        raise ValueError(f"Unknown field {field}; expected one of {', '.join(FIELDS)}, "
+                         "headcount@QUARTER or peak_headcount@QUARTER")
+
+def parse_filter(spec):
+    """
+    Parses a filter like "peak_headcount@8>=200" or "growth_type=exponential".
+
+    Returns:
+        tuple: (field, operator function, value). Numbers are compared as
+            numbers, anything else as a string.
+    """
+    match = FILTER.match(spec.strip())
+    if not match:
+        raise ValueError(f"Expected FIELD OP VALUE with OP one of {' '.join(OPERATORS)}, got: {spec}")
+    field, op, value = match.group("field", "op", "value")
+    check_field(field)
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return field, OPERATORS[op], value
+
+def query(index, filters=(), sort=None, limit=None):
+    """
+    Selects index entries.
+
+    Args:
+        index (dict): Output of load_index.
+        filters (iterable): Outputs of parse_filter; all must match. Entries
+            missing a field never match a filter on it.
+        sort (str, optional): Field to sort by, prefixed with '-' for descending.
+            Entries missing the field come last.
+        limit (int, optional): Maximum number of entries returned.
+
+    Returns:
+        list: Matching entries, sorted by name unless sort is given.
+    """
+    matches = []
+    for entry in index.values():
+        for field, compare, value in filters:
+            actual = field_value(entry, field)
+            try:
+                if actual is None or not compare(actual, value):
+                    break
+            except TypeError:
+                break
+        else:
+            matches.append(entry)
+
+    matches.sort(key=lambda entry: entry.get("name", ""))
+    if sort:
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        check_field(field)
+        present = [entry for entry in matches if field_value(entry, field) is not None]
+        missing = [entry for entry in matches if field_value(entry, field) is None]
+        present.sort(key=lambda entry: field_value(entry, field), reverse=descending)
+        matches = present + missing
+    return matches[:limit] if limit is not None else matches
+
+def select_files(directory_path, filters=(), sort=None, limit=None):
+    """Paths of the scenario files in a directory that match a query."""
+    entries = query(load_index(directory_path), filters, sort, limit)
+    return [os.path.join(directory_path, entry["file"]) for entry in entries]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the scenario index of a directory.")
+    parser.add_argument("directory_path", nargs="?", default=".", help="Directory of scenario files (default: .)")
+    parser.add_argument("--where", action="append", default=[], metavar="FIELD OP VALUE",
+                        help="Filter, e.g. growth_type=exponential or peak_headcount@8>=200; repeat to combine. "
+                             f"Fields: {', '.join(FIELDS)}, headcount@QUARTER, peak_headcount@QUARTER")
+    parser.add_argument("--sort", help="Field to sort by, prefixed with - for descending, e.g. --sort=-final_revenue")
+    parser.add_argument("--limit", type=int, help="Show at most this many scenarios")
+    parser.add_argument("--json", action="store_true", help="Print the matching entries as JSON")
+    parser.add_argument("--files", action="store_true", help="Print only the paths of the matching files")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory_path):
+        parser.error(f"{args.directory_path} is not a valid directory")
+    try:
+        filters = [parse_filter(spec) for spec in args.where]
+        if args.sort:
+            check_field(args.sort.lstrip("-"))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.limit is not None and args.limit < 0:
+        parser.error("--limit must not be negative")
+
+    entries = query(load_index(args.directory_path), filters, args.sort, args.limit)
+    if args.json:
+        print(json.dumps(entries, indent=4))
+    elif args.files:
+        for entry in entries:
+            print(os.path.join(args.directory_path, entry["file"]))
+    else:
+        for entry in entries:
+            revenue = f"{entry['final_revenue'] / 1e6:,.1f}M" if entry.get("final_revenue") is not None else "n/a"
+            print(f"{entry['name']:<48}{entry['quarters']:>4}q{entry['final_headcount']:>8}"
+                  f"{entry['peak_headcount']:>8} peak{entry['capital_raised']:>9.2f}M raised"
+                  f"{entry['funding_rounds']:>3} rounds{revenue:>12}")
+        print(f"{len(entries)} matching scenarios")
@@ -0,0 +1,143 @@
+import numpy as np
+
+import rev
+
+def _revenue_info(quarter):
+    # Unpriced quarters (rev.py not run yet) are priced on the fly
+    if "Revenue" in quarter:
+        return quarter
+    return rev.calculate_revenue(quarter)
+
+def build_series(quarters):
+    """
+    Turns a scenario's quarters into the series the dashboard charts plot.
+
+    Revenue and capital are in millions of dollars; headcounts are absolute.
+
+    Args:
+        quarters (list): Quarter dicts of one scenario.
+
+    Returns:
+        dict: Chart-ready series keyed by chart, plus the 'latest' key metrics.
+    """
+    revenue = [_revenue_info(q) for q in quarters]
+    country_names = list(dict.fromkeys(c for q in quarters for c in q.get("Countries", {})))
+    occupation_names = list(dict.fromkeys(o for q in quarters for o in q.get("Occupations", {})))
+    headcount = [sum(q.get("Countries", {}).values()) for q in quarters]
+
+    series = {
+        "quarters": [q.get("Quarter", "") for q in quarters],
+        "headcount": headcount,
+        "revenue": {
+            "mid": [r["Revenue"] / 1000000 for r in revenue],
+            "min": [r["RevenueMin"] / 1000000 for r in revenue],
+            "max": [r["RevenueMax"] / 1000000 for r in revenue]
+        },
+        "countries": {c: [q.get("Countries", {}).get(c, 0) for q in quarters] for c in country_names},
+        "occupations": {o: [q.get("Occupations", {}).get(o, 0) for q in quarters] for o in occupation_names},
+        "capital": [q.get("Capital", 0) for q in quarters],
+        "capital_to_revenue": [r["CapitalToRevenueRatio"] for r in revenue],
+        "revenue_per_employee": [r["RevenuePerEmployee"] for r in revenue],
+        "latest": None
+    }
+    if quarters:
+        latest = quarters[-1]
+        series["latest"] = {
+            "quarter": latest.get("Quarter", ""),
+            "revenue": revenue[-1]["Revenue"],
+            "revenue_max": revenue[-1]["RevenueMax"],
+            "revenue_per_employee": revenue[-1]["RevenuePerEmployee"],
+            "capital": latest.get("Capital", 0),
+            "capital_to_revenue": revenue[-1]["CapitalToRevenueRatio"],
+            "headcount": headcount[-1],
+            "occupations": dict(latest.get("Occupations", {}))
+        }
+    return series
+
+# Keys of build_series holding one value per quarter; revenue, countries and
+# occupations hold one such array per name
+QUARTERLY_SERIES = ("quarters", "headcount", "revenue", "countries", "occupations", "capital",
+                    "capital_to_revenue", "revenue_per_employee")
+
+def _first_difference(old, new, limit):
+    for i, (old_value, new_value) in enumerate(zip(old[:limit], new[:limit])):
+        if old_value != new_value:
+            return i
+    return limit
+
+def diff_series(old, new):
+    """
+    Finds the quarters of a scenario that changed between two versions of its series.
+
+    Appending quarters, as a running simulation does, gives a patch holding
+    only the new quarters; repricing rewrites every quarter from the first
+    one whose revenue changed.
+
+    Args:
+        old (dict or None): build_series output the client has, or None if it has nothing.
+        new (dict): Current build_series output.
+
+    Returns:
+        dict: Patch with 'start' (first changed quarter), 'length' (quarters in
+            new), the QUARTERLY_SERIES of new from start on and 'latest'; None
+            if nothing changed. The client keeps its first start quarters and
+            replaces the rest. Patches start at 0 when countries or occupations
+            were added or removed.
+    """
+    length = len(new["quarters"])
+    if old is None or any(set(old[key]) != set(new[key]) for key in ("revenue", "countries", "occupations")):
+        start = 0
+    else:
+        start = min(len(old["quarters"]), length)
+        for key in QUARTERLY_SERIES:
+            if isinstance(new[key], dict):
+                for name, values in new[key].items():
+                    start = _first_difference(old[key][name], values, start)
+            else:
+                start = _first_difference(old[key], new[key], start)
+        if start == length == len(old["quarters"]) and old["latest"] == new["latest"]:
+            return None
+
+    patch = {"start": start, "length": length, "latest": new["latest"]}
+    for key in QUARTERLY_SERIES:
+        if isinstance(new[key], dict):
+            patch[key] = {name: values[start:] for name, values in new[key].items()}
+        else:
+            patch[key] = new[key][start:]
+    return patch
+
+def percentile_bands(series_list, percentiles=(5, 50, 95)):
+    """
+    Computes per-quarter percentile bands across several scenarios' series.
+
+    Scenarios may have different horizons; each quarter's band uses the
+    scenarios that reach it.
+
+    Args:
+        series_list (list): Outputs of build_series.
+        percentiles (tuple): Percentiles to report.
+
+    Returns:
+        dict: 'quarters', 'scenarios' and, for headcount, revenue, capital and
+            revenue per employee, a dict like {'p5': [...], 'p50': [...], 'p95': [...]}.
+    """
+    longest = max(series_list, key=lambda s: len(s["quarters"]), default={"quarters": []})
+    horizon = len(longest["quarters"])
+
+    def bands(values):
+        matrix = np.full((len(values), horizon), np.nan)
+        for row, value in enumerate(values):
+            matrix[row, :len(value)] = value
+        if not len(values) or not horizon:
+            return {f"p{p}": [] for p in percentiles}
+        points = np.nanpercentile(matrix, percentiles, axis=0)
+        return {f"p{p}": point.tolist() for p, point in zip(percentiles, points)}
+
+    return {
+        "quarters": longest["quarters"],
+        "scenarios": len(series_list),
+        "headcount": bands([s["headcount"] for s in series_list]),
+        "revenue": bands([s["revenue"]["mid"] for s in series_list]),
+        "capital": bands([s["capital"] for s in series_list]),
+        "revenue_per_employee": bands([s["revenue_per_employee"] for s in series_list])
+    }
@@ -0,0 +1,208 @@
+import asyncio
+import json
+from json.decoder import WHITESPACE
+
+# Characters read per chunk when streaming a file
+CHUNK_SIZE = 1 << 16
+
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+def is_json_lines(filename):
+    return filename.endswith(JSON_LINES_EXTENSIONS)
+
+class ArrayParser:
+    """
+    Incremental parser for one top-level JSON array.
+
+    Text is pushed in with feed() in chunks of any size, and every element
+    completed so far is returned straight away, so only the element being
+    parsed is ever buffered. Each element is decoded by the C decoder
+    (json.JSONDecoder.raw_decode).
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "start"  # start -> first -> (value <-> separator) -> done
+        # Don't retry an incomplete element until the buffer has grown past this
+        self._retry_at = 0
+
+    def feed(self, text):
+        """
+        Adds text and returns the list of elements it completed.
+        """
+        self._buffer += text
+        if len(self._buffer) < self._retry_at:
+            return []
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Returns the remaining elements, raising ValueError if the array is incomplete.
+        """
+        elements = self._parse(final=True)
+        if self._state != "done":
+            raise ValueError("Unexpected end of JSON array")
+        return elements
+
+    def _parse(self, final):
+        buffer = self._buffer
+        pos = 0
+        elements = []
+        self._retry_at = 0
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, found {char!r}")
+                self._state = "first"
+                pos += 1
+            elif self._state in ("first", "value"):
+                if char == "]" and self._state == "first":
+                    self._state = "done"
+                    pos += 1
+                    continue
+                try:
+                    element, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # Wait for the element to be complete; doubling keeps re-parsing linear
+                    self._retry_at = 2 * (len(buffer) - pos)
+                    break
+                # A number cut off by the end of the buffer may continue in the next chunk
+                if not final and isinstance(element, (int, float)) and not isinstance(element, bool) \
+                        and (end == len(buffer) or buffer[end] in _NUMBER_CHARS):
+                    break
+                elements.append(element)
+                self._state = "separator"
+                pos = end
+            elif self._state == "separator":
+                if char == ",":
+                    self._state = "value"
+                elif char == "]":
+                    self._state = "done"
+                else:
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+                pos += 1
+            else:
+                raise ValueError(f"Extra data after JSON array: {char!r}")
+
+        self._buffer = buffer[pos:]
+        return elements
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    """
+    Yields the elements of the JSON array in a text file one at a time.
+    """
+    parser = ArrayParser()
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+def iter_json_lines(file):
+    """
+    Yields the values of a JSON Lines file one at a time, skipping blank lines.
+    """
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+def iter_quarters(filename, chunk_size=CHUNK_SIZE):
+    """
+    Yields the quarters of a scenario file one at a time.
+
+    Args:
+        filename (str): A .json file holding an array of quarters, or a
+            .jsonl/.ndjson file with one quarter per line.
+        chunk_size (int): Characters read at a time from .json files.
+    """
+    with open(filename, 'r') as file:
+        if is_json_lines(filename):
+            yield from iter_json_lines(file)
+        else:
+            yield from iter_json_array(file, chunk_size)
+
+def write_json_array(file, items, indent=4):
+    """
+    Writes an iterable to a text file as a JSON array, one element at a time.
+
+    The output is byte-identical to json.dump(list(items), file, indent=indent),
+    without materializing the list.
+
+    Returns:
+        int: Number of elements written.
+    """
+    newline = "\n" + " " * indent if indent is not None else ""
+    file.write("[")
+    separator = newline
+    count = 0
+    for item in items:
+        file.write(separator)
+        file.write(json.dumps(item, indent=indent).replace("\n", newline))
+        separator = "," + (newline or " ")
+        count += 1
+    # An empty list is dumped as "[]" without a line break
+    if count and indent is not None:
+        file.write("\n")
+    file.write("]")
+    return count
+
+def write_json_lines(file, items):
+    """
+    Writes an iterable to a text file as JSON Lines.
+
+    Returns:
+        int: Number of lines written.
+    """
+    count = 0
+    for item in items:
+        file.write(json.dumps(item))
+        file.write("\n")
+        count += 1
+    return count
+
+async def load_json_async(filename, chunk_size=CHUNK_SIZE, executor=None):
+    """
+    Reads and parses a scenario file without blocking the event loop on I/O.
+
+    Chunks are read in an executor thread and parsed on the loop as they
+    arrive, so with several files loading at once one file's reads overlap
+    another file's parsing.
+
+    Args:
+        filename (str): A .json array or a .jsonl/.ndjson file.
+        chunk_size (int): Characters read per executor call.
+        executor (concurrent.futures.Executor, optional): Executor for the
+            reads; the loop's default executor if omitted.
+
+    Returns:
+        list: The elements of the file.
+    """
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(executor, open, filename, 'r')
+    try:
+        if is_json_lines(filename):
+            text = await loop.run_in_executor(executor, file.read)
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+        parser = ArrayParser()
+        elements = []
+        while True:
+            chunk = await loop.run_in_executor(executor, file.read, chunk_size)
+            if not chunk:
+                break
+            elements.extend(parser.feed(chunk))
+        elements.extend(parser.close())
+        return elements
+    finally:
+        file.close()
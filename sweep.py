@@ -0,0 +1,252 @@
+import argparse
+import copy
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+import columnar
+import rev
+import rev_np
+import scenario_index
+
+# CLI axis prefixes -> (table, what the scale factor applies to)
+AXES = {
+    "country": ("country_multipliers", None),
+    "salary": ("base_salaries", None),
+    "role": ("role_multipliers", (0, 1)),
+    "role_min": ("role_multipliers", (0,)),
+    "role_max": ("role_multipliers", (1,))
+}
+
+# Cells of the (quarters x parameter sets) matrices computed per chunk
+CHUNK_CELLS = 4_000_000
+
+def load_corpus(path):
+    """
+    Loads every scenario of a directory of JSON or JSON Lines files, or a columnar file, into one table.
+
+    Returns:
+        dict: A columnar table (see columnar.scenarios_to_table).
+    """
+    if os.path.isfile(path):
+        return columnar.read_table(path)
+    scenarios = {}
+    for filename in sorted(rev.list_json_files(path)):
+        scenarios[scenario_index.scenario_name(filename)] = list(rev.iter_scenario_quarters(filename))
+    return columnar.scenarios_to_table(scenarios)
+
+def apply_overrides(overrides, base=None):
+    """
+    Builds the revenue tables of one parameter set.
+
+    Args:
+        overrides (dict): Any of 'country_multipliers', 'role_multipliers' and
+            'base_salaries', each a partial {name: value} dict. Role multipliers
+            are (min, max) pairs.
+        base (dict, optional): Tables to start from; defaults to rev's.
+
+    Returns:
+        dict: Complete tables for rev_np.RevenueEngine.
+    """
+    tables = copy.deepcopy(base or rev_np.default_tables())
+    for table, values in overrides.items():
+        if table not in tables:
+            raise ValueError(f"Unknown table: {table}")
+        for name, value in values.items():
+            tables[table][name] = tuple(value) if table == "role_multipliers" else value
+    return tables
+
+def parse_axis(spec):
+    """
+    Parses a CLI axis like "country.India=0.8,1.0,1.2".
+
+    The values scale the default entry: country multipliers, base salaries,
+    both role multipliers ("role"), or only the minimum or maximum one
+    ("role_min", "role_max").
+
+    Returns:
+        tuple: (label, list of (label, overrides) points).
+    """
+    key, sep, values = spec.partition("=")
+    prefix, dot, name = key.partition(".")
+    if not sep or not dot or prefix not in AXES:
+        raise ValueError(f"Expected {{{','.join(AXES)}}}.NAME=SCALE[,SCALE...], got: {spec}")
+    try:
+        scales = [float(v) for v in values.split(",")]
+    except ValueError:
+        raise ValueError(f"Scales must be numbers: {spec}") from None
+
+    table, indices = AXES[prefix]
+    defaults = rev_np.default_tables()[table]
+    if table == "role_multipliers":
+        default = defaults.get(name, rev.DEFAULT_ROLE_MULTIPLIER)
+    elif table == "country_multipliers":
+        default = defaults.get(name, rev.DEFAULT_COUNTRY_MULTIPLIER)
+    else:
+        default = defaults.get(name, rev.DEFAULT_BASE_SALARY)
+
+    points = []
+    for scale in scales:
+        if indices is None:
+            value = default * scale
+        else:
+            value = tuple(v * scale if i in indices else v for i, v in enumerate(default))
+        points.append((f"{key}={scale:g}", {table: {name: value}}))
+    return key, points
+
+def build_grid(axes):
+    """
+    Returns the Cartesian product of several axes as named parameter sets.
+
+    Args:
+        axes (list): Outputs of parse_axis.
+
+    Returns:
+        list: (label, overrides) pairs, one per grid point.
+    """
+    grid = []
+    for combination in itertools.product(*(points for _, points in axes)):
+        overrides = {}
+        for _, point in combination:
+            for table, values in point.items():
+                overrides.setdefault(table, {}).update(values)
+        grid.append((" ".join(label for label, _ in combination), overrides))
+    return grid
+
+def _compile(tables, country_names, role_names):
+    engine = rev_np.RevenueEngine(country_names, role_names, tables)
+    return engine, engine.country_factors, engine.role_values
+
+def sweep(table, parameter_sets):
+    """
+    Prices every quarter of a corpus under many sets of revenue tables.
+
+    The headcount matrices are stacked once. Each parameter set then only
+    contributes one country-factor vector and one role-value matrix, so all
+    sets are priced with two matrix products per chunk. Quarters on a rounding
+    boundary are recomputed in the reference order, so every result equals
+    rev.calculate_revenue with that set's tables.
+
+    Args:
+        table (dict): Columnar corpus from load_corpus.
+        parameter_sets (list): Complete table dicts, see apply_overrides.
+
+    Returns:
+        dict: Revenue, RevenueMin, RevenueMax, RevenuePerEmployee and
+            CapitalToRevenueRatio arrays of shape (parameter sets, quarters).
+    """
+    country_names = table["country_names"].tolist()
+    role_names = table["occupation_names"].tolist()
+    countries, occupations = columnar.headcount_matrices(table)
+    countries = countries.astype(float)
+    occupations = occupations.astype(float)
+    capital = table["Capital"].astype(float) * 1000000
+
+    total_employees = countries.sum(axis=1)
+    role_total = occupations.sum(axis=1)
+    # Occupation mix per quarter; the same for every parameter set
+    role_share = np.divide(occupations, role_total[:, None], out=np.zeros_like(occupations),
+                           where=role_total[:, None] > 0)
+
+    compiled = [_compile(tables, country_names, role_names) for tables in parameter_sets]
+    factors = np.array([c[1] for c in compiled]).reshape(len(compiled), len(country_names))
+    values_min = np.array([c[2][:, 0] for c in compiled]).reshape(len(compiled), len(role_names))
+    values_max = np.array([c[2][:, 1] for c in compiled]).reshape(len(compiled), len(role_names))
+
+    rows = len(total_employees)
+    results = {name: [] for name in ("Revenue", "RevenueMin", "RevenueMax", "RevenuePerEmployee",
+                                     "CapitalToRevenueRatio")}
+    chunk = max(1, CHUNK_CELLS // max(1, rows))
+    for start in range(0, len(compiled), chunk):
+        stop = min(start + chunk, len(compiled))
+        country_cost = factors[start:stop] @ countries.T
+        total_min = country_cost * (values_min[start:stop] @ role_share.T)
+        total_max = country_cost * (values_max[start:stop] @ role_share.T)
+
+        ties = (rev_np._near_tie(total_min) | rev_np._near_tie(total_max)
+                | rev_np._near_tie((total_min + total_max) / 2))
+        for offset in np.flatnonzero(ties.any(axis=1)):
+            tied = ties[offset]
+            engine = compiled[start + offset][0]
+            total_min[offset, tied], total_max[offset, tied] = engine._exact_revenue(countries[tied],
+                                                                                     occupations[tied])
+
+        for name, values in rev_np.finish_metrics(total_min, total_max, total_employees, capital).items():
+            results[name].append(values)
+    return {name: np.concatenate(values) if values else np.zeros((0, rows)) for name, values in results.items()}
+
+def summarize(table, results, labels):
+    """
+    Summarizes a sweep per parameter set, relative to the first set.
+
+    Returns:
+        list: One dict per parameter set with the corpus' total final-quarter
+            revenue, total revenue over all quarters, median final revenue per
+            employee, and the change of final revenue against the first set.
+    """
+    scenario = table["scenario"]
+    final = np.r_[scenario[1:] != scenario[:-1], True] if len(scenario) else np.zeros(0, dtype=bool)
+    final_revenue = results["Revenue"][:, final].sum(axis=1)
+    total_revenue = results["Revenue"].sum(axis=1)
+    if final.any():
+        per_employee = np.median(results["RevenuePerEmployee"][:, final], axis=1)
+    else:
+        per_employee = np.zeros(len(labels))
+    baseline = final_revenue[0] if len(final_revenue) else 0
+
+    return [
+        {
+            "parameters": label,
+            "final_revenue": int(final_revenue[i]),
+            "total_revenue": int(total_revenue[i]),
+            "median_revenue_per_employee": float(per_employee[i]),
+            "change": float(final_revenue[i] / baseline - 1) if baseline else None
+        }
+        for i, label in enumerate(labels)
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price a scenario corpus under a grid of revenue multipliers.")
+    parser.add_argument("corpus", nargs="?", default=".", help="Directory of scenario JSON files, or a .npz/.parquet file")
+    parser.add_argument("--vary", action="append", default=[], metavar="AXIS.NAME=SCALE,...",
+                        help="Scale a default, e.g. country.India=0.8,1.0,1.2 or role.Sales=0.9,1.1; "
+                             f"axes: {', '.join(AXES)}. Several --vary options form a grid")
+    parser.add_argument("--grid", help="JSON file with a list of {'name': ..., overrides} parameter sets")
+    parser.add_argument("--output", help="Write the per-set summary to this JSON file")
+    parser.add_argument("--arrays", help="Save the full (sets x quarters) metric arrays to this .npz file")
+    args = parser.parse_args()
+
+    try:
+        grid = [("baseline", {})]
+        if args.vary:
+            grid += build_grid([parse_axis(spec) for spec in args.vary])
+        if args.grid:
+            with open(args.grid, 'r') as file:
+                for i, entry in enumerate(json.load(file)):
+                    entry = dict(entry)
+                    grid.append((entry.pop("name", f"set {i + 1}"), entry))
+        parameter_sets = [apply_overrides(overrides) for _, overrides in grid]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    table = load_corpus(args.corpus)
+    loaded = time.perf_counter()
+    results = sweep(table, parameter_sets)
+    priced = time.perf_counter()
+    summary = summarize(table, results, [label for label, _ in grid])
+
+    for row in summary:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "n/a"
+        print(f"{row['parameters']:<48}{row['final_revenue'] / 1e6:>14,.1f}M{change:>9}"
+              f"{row['median_revenue_per_employee']:>12,.0f}/employee")
+    print(f"Priced {len(table['scenario'])} quarters under {len(grid)} parameter sets in "
+          f"{priced - loaded:.3f}s (loading took {loaded - start:.3f}s)")
+
+    if args.output:
+        rev.write_json_atomic(args.output, summary)
+    if args.arrays:
+        np.savez(args.arrays, labels=np.array([label for label, _ in grid], dtype=str), **results)
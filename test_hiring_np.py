@@ -0,0 +1,48 @@
+import statistics
+
+import numpy as np
+import pytest
+
+import batch
+import hiring_np
+import randomize_2
+from benchmark import run_engine
+
+def final_headcounts(engine, growth_type, seeds, num_quarters=20):
+    return [sum(run_engine(engine, growth_type, num_quarters, seed)["Countries"].values()) for seed in seeds]
+
+@pytest.mark.parametrize("growth_type", ["linear", "decline", "failure", "exponential_to_decline"])
+def test_seeded_numpy_scenarios_are_reproducible(growth_type):
+    first = randomize_2.generate_scenario(growth_type, seed=7, engine="numpy", num_quarters=20)
+    second = randomize_2.generate_scenario(growth_type, seed=7, engine="numpy", num_quarters=20)
+    assert first == second
+
+def test_seeded_batches_are_reproducible():
+    first = batch.simulate_batch(50, "decline", 20, seed=3)
+    second = batch.simulate_batch(50, "decline", 20, seed=3)
+    assert np.array_equal(first["countries"], second["countries"])
+    assert np.array_equal(first["occupations"], second["occupations"])
+    assert np.array_equal(first["countries"].sum(axis=2), first["occupations"].sum(axis=2))
+
+@pytest.mark.parametrize("growth_type", ["linear", "decline", "failure", "exponential_to_decline"])
+def test_numpy_engine_matches_reference_headcount(growth_type):
+    seeds = range(400)
+    reference = final_headcounts("python", growth_type, seeds)
+    numpy_engine = final_headcounts("numpy", growth_type, seeds)
+    # Fixed seeds keep this deterministic; the bound is four standard errors of the difference
+    error = (statistics.variance(reference) / len(reference) + statistics.variance(numpy_engine) / len(numpy_engine)) ** 0.5
+    assert abs(statistics.mean(reference) - statistics.mean(numpy_engine)) <= 4 * error + 0.05
+
+def test_departures_on_empty_categories_are_lost():
+    rng = hiring_np.make_rng(0)
+    removed = hiring_np.draw_departures(rng, np.full(10000, 4), [0, 5], [1.0, 1.0])
+    assert removed[:, 0].sum() == 0
+    # Half of the draws land on the empty category, as in the reference engine
+    assert removed.sum(axis=1).mean() == pytest.approx(2.0, abs=0.05)
+
+def test_remove_employees_keeps_totals_equal():
+    rng = hiring_np.make_rng(1)
+    countries, occupations = hiring_np.remove_employees(
+        rng, 6, np.array([1, 0, 6]), np.array([3, 4, 0]), [1.0, 1.0, 1.0], [1.0, 1.0, 1.0])
+    assert countries.sum() == occupations.sum()
+    assert (countries >= 0).all() and (occupations >= 0).all()
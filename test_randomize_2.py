@@ -0,0 +1,54 @@
+import pytest
+
+import randomize_2
+
+def test_parse_growth_types():
+    assert randomize_2.parse_growth_types(["linear", "decline:5"], 3) == [("linear", 3), ("decline", 5)]
+
+@pytest.mark.parametrize("spec", ["linear:0", "linear:-2", "linear:x", "unknown"])
+def test_parse_growth_types_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        randomize_2.parse_growth_types([spec], 3)
+
+@pytest.mark.parametrize("argv", [["-n", "-1"], ["-n", "0"], ["linear:-2"], ["-w", "-3"]])
+def test_main_rejects_non_positive_counts(argv, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        randomize_2.main(argv + ["-o", str(tmp_path)])
+    assert exit_info.value.code == 2
+    assert "error:" in capsys.readouterr().err
+    assert list(tmp_path.iterdir()) == []
+
+def test_main_generates_scenarios(tmp_path):
+    randomize_2.main(["linear:2", "-q", "4", "-s", "1", "-o", str(tmp_path)])
+    assert sorted(path.name for path in tmp_path.glob("saas_growth_*.json")) == [
+        "saas_growth_linear_1.json", "saas_growth_linear_2.json"]
+
+def write_weights(tmp_path, text):
+    path = tmp_path / "weights.json"
+    path.write_text(text)
+    return str(path)
+
+def test_load_weights(tmp_path):
+    path = write_weights(tmp_path, '{"countries": {"USA": 0.5, "UK": 1}, "occupations": {"Legal": 0}}')
+    assert randomize_2.load_weights(path) == {"countries": {"USA": 0.5, "UK": 1}, "occupations": {"Legal": 0}}
+
+@pytest.mark.parametrize("text", [
+    '[]',
+    '{"regions": {}}',
+    '{"countries": [0.5]}',
+    '{"countries": {"Germany": 0.5}}',
+    '{"occupations": {"Astronaut": 1}}',
+    '{"countries": {"USA": "high"}}',
+    '{"countries": {"USA": -0.1}}',
+    '{"countries": {"USA": true}}',
+    '{"countries": {"USA": 0, "India": 0, "UK": 0, "France": 0, "Brazil": 0}}'
+])
+def test_load_weights_rejects_bad_files(tmp_path, text):
+    with pytest.raises(ValueError):
+        randomize_2.load_weights(write_weights(tmp_path, text))
+
+def test_main_reports_bad_weights(tmp_path, capsys):
+    path = write_weights(tmp_path, '{"countries": {"USA": -1}}')
+    with pytest.raises(SystemExit):
+        randomize_2.main(["linear", "--weights", path, "-o", str(tmp_path / "out")])
+    assert "non-negative number" in capsys.readouterr().err
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pytest
+
+import randomize_2
+import rev
+
+@pytest.fixture
+def directory(tmp_path):
+    randomize_2.generate_initial_conditions(2, "linear", seed=1, num_quarters=8, output_dir=str(tmp_path))
+    return tmp_path
+
+def process(directory):
+    return rev.process_directory(str(directory), verbose=False, incremental=True)
+
+def test_incremental_run_skips_untouched_files(directory):
+    first = process(directory)
+    assert len(first["succeeded"]) == 2 and first["skipped"] == 0
+    assert os.path.exists(directory / rev.MANIFEST_NAME)
+
+    second = process(directory)
+    assert second["succeeded"] == [] and second["skipped"] == 2
+
+def test_touched_file_with_same_inputs_is_not_rewritten(directory):
+    process(directory)
+    path = directory / "saas_growth_linear_1.json"
+    contents = path.read_bytes()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    summary = process(directory)
+    assert summary["unchanged"] == [str(path)] and summary["skipped"] == 1
+    assert path.read_bytes() == contents
+
+def test_changed_headcount_is_repriced(directory):
+    process(directory)
+    path = directory / "saas_growth_linear_2.json"
+    with open(path) as file:
+        quarters = json.load(file)
+    quarters[-1]["Countries"]["USA"] += 10
+    quarters[-1]["Occupations"]["Sales"] += 10
+    with open(path, 'w') as file:
+        json.dump(quarters, file)
+
+    summary = process(directory)
+    assert summary["succeeded"] == [str(path)] and summary["skipped"] == 1
+    with open(path) as file:
+        assert json.load(file)[-1]["Revenue"] == rev.calculate_revenue(quarters[-1])["Revenue"]
+
+def test_changed_tables_reprice_everything(directory, monkeypatch):
+    process(directory)
+    monkeypatch.setitem(rev.COUNTRY_MULTIPLIERS, "USA", 1.1)
+    summary = process(directory)
+    assert len(summary["succeeded"]) == 2 and summary["skipped"] == 0
+
+QUARTER = {"Countries": {"USA": 3, "India": 2}, "Occupations": {"Sales": 4, "Legal": 1}, "Capital": 2.0}
+
+def test_cached_revenue_is_reused():
+    rev.clear_revenue_cache()
+    first = rev.calculate_revenue(QUARTER)
+    assert rev.calculate_revenue(dict(QUARTER, Capital=5.0))["Revenue"] == first["Revenue"]
+    stats = rev.revenue_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+def test_editing_a_table_invalidates_the_cache(monkeypatch):
+    import rev_np
+
+    before = rev.calculate_revenue(QUARTER)["Revenue"]
+    assert rev_np.price_quarters([QUARTER])[0]["Revenue"] == before
+
+    monkeypatch.setitem(rev.COUNTRY_MULTIPLIERS, "USA", 2.0)
+    edited = rev.calculate_revenue(QUARTER)["Revenue"]
+    assert edited > before
+    assert rev_np.price_quarters([QUARTER])[0]["Revenue"] == edited
+
+    # Replacing a whole table is noticed too
+    monkeypatch.setattr(rev, "BASE_SALARIES", {})
+    replaced = rev.calculate_revenue(QUARTER)["Revenue"]
+    assert replaced == rev.headcount_revenue(("USA", "India"), (3, 2), ("Sales", "Legal"), (4, 1))[2]
+    assert rev_np.price_quarters([QUARTER])[0]["Revenue"] == replaced
+
+def test_restored_tables_give_the_original_revenue(monkeypatch):
+    before = rev.calculate_revenue(QUARTER)["Revenue"]
+    with monkeypatch.context() as patch:
+        patch.setitem(rev.ROLE_MULTIPLIERS, "Sales", (5, 6))
+        assert rev.calculate_revenue(QUARTER)["Revenue"] != before
+    assert rev.calculate_revenue(QUARTER)["Revenue"] == before
+
+@pytest.mark.parametrize("value, size", [("", rev.DEFAULT_REVENUE_CACHE_SIZE), ("0", 0), ("12", 12),
+                                         ("-1", rev.DEFAULT_REVENUE_CACHE_SIZE),
+                                         ("lots", rev.DEFAULT_REVENUE_CACHE_SIZE)])
+def test_revenue_cache_size(monkeypatch, value, size):
+    monkeypatch.setenv("PS_REVENUE_CACHE", value)
+    assert rev.revenue_cache_size() == size
@@ -0,0 +1,33 @@
+import pytest
+
+import randomize_2
+import rev
+import rev_np
+
+@pytest.fixture(scope="module")
+def quarters():
+    quarters = []
+    for seed, growth_type in enumerate(randomize_2.GROWTH_TYPES):
+        quarters.extend(randomize_2.generate_scenario(growth_type, seed=seed, num_quarters=16))
+    return quarters
+
+def test_numpy_engine_matches_calculate_revenue(quarters):
+    assert rev_np.price_quarters(quarters) == [rev.calculate_revenue(quarter) for quarter in quarters]
+
+def test_recomputed_ties_match_calculate_revenue(quarters, monkeypatch):
+    # Every quarter counts as a near tie, so all of them go through _exact_revenue
+    monkeypatch.setattr(rev_np, "TIE_TOLERANCE", 1.0)
+    assert rev_np.price_quarters(quarters) == [rev.calculate_revenue(quarter) for quarter in quarters]
+
+def test_exact_half_thousands_round_like_calculate_revenue():
+    # 65000 * (1.0 + 2.0) / 2 = 97500 sits exactly on a rounding boundary
+    quarter = {"Countries": {"USA": 1}, "Occupations": {"Administration": 1}, "Capital": 1.0}
+    assert rev_np.price_quarters([quarter]) == [rev.calculate_revenue(quarter)]
+    assert rev_np.price_quarters([quarter])[0]["Revenue"] == 98000
+
+def test_empty_and_unknown_categories():
+    quarters = [
+        {"Countries": {"USA": 0}, "Occupations": {"Sales": 0}, "Capital": 2.0},
+        {"Countries": {"Germany": 3}, "Occupations": {"Research": 3}, "Capital": 0.5}
+    ]
+    assert rev_np.price_quarters(quarters) == [rev.calculate_revenue(quarter) for quarter in quarters]
@@ -0,0 +1,78 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import randomize_2
+import run
+import scenario_index
+import wire
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    for growth_type, seed in [("linear", 1), ("linear", 2), ("decline", 3)]:
+        quarters = randomize_2.generate_scenario(growth_type, seed=seed, num_quarters=8)
+        with open(tmp_path / f"saas_growth_{growth_type}_{seed}.json", 'w') as file:
+            json.dump(quarters, file)
+    monkeypatch.setattr(run, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(run, "scenario_cache", run.ScenarioCache(str(tmp_path)))
+    monkeypatch.setattr(run, "_scenario_index", None)
+    return run.app.test_client()
+
+def names(response):
+    assert response.status_code == 200
+    return [scenario["name"] for scenario in response.get_json()]
+
+def test_query_without_index_file(client, tmp_path):
+    assert names(client.get("/api/scenarios?growth_type=linear")) == ["saas_growth_linear_1", "saas_growth_linear_2"]
+    # Serving the query must not write the index
+    assert not os.path.exists(tmp_path / scenario_index.INDEX_NAME)
+
+def test_query_sees_externally_edited_file(client, tmp_path):
+    assert names(client.get("/api/scenarios?final_headcount=1")) == []
+
+    path = tmp_path / "saas_growth_decline_3.json"
+    with open(path) as file:
+        quarters = json.load(file)
+    quarters[-1]["Countries"] = {"USA": 1}
+    quarters[-1]["Occupations"] = {"Sales": 1}
+    with open(path, 'w') as file:
+        json.dump(quarters, file, indent=2)
+
+    assert names(client.get("/api/scenarios?final_headcount=1")) == ["saas_growth_decline_3"]
+    assert names(client.get("/api/scenarios")) == ["saas_growth_decline_3", "saas_growth_linear_1",
+                                                   "saas_growth_linear_2"]
+
+def test_gzip_negotiation_and_etags(client):
+    plain = client.get("/api/scenarios/saas_growth_linear_1")
+    assert plain.status_code == 200 and plain.content_encoding is None
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    compressed = client.get("/api/scenarios/saas_growth_linear_1", headers={"Accept-Encoding": "gzip"})
+    assert compressed.content_encoding == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    # Each coding has its own ETag, so caches never mix them up
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    not_modified = client.get("/api/scenarios/saas_growth_linear_1",
+                              headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]})
+    assert not_modified.status_code == 304
+    refused = client.get("/api/scenarios/saas_growth_linear_1", headers={"Accept-Encoding": "gzip;q=0"})
+    assert refused.content_encoding is None
+
+def test_compact_format(client):
+    plain = client.get("/api/scenarios/saas_growth_linear_1").get_json()
+    compact = client.get("/api/scenarios/saas_growth_linear_1?format=compact").get_json()
+    assert wire.decode_scenario(compact) == plain
+    assert client.get("/api/scenarios/saas_growth_linear_1?format=xml").status_code == 400
+
+def test_event_stream_ends_when_directory_becomes_unreadable(client, monkeypatch):
+    events = run.watch_scenario("saas_growth_linear_1", interval=0)
+    assert next(events).startswith("event: patch")
+
+    def unreadable():
+        raise PermissionError("directory is gone")
+    monkeypatch.setattr(run.scenario_cache, "names", unreadable)
+    assert next(events) == run.server_sent_event("removed", {"name": "saas_growth_linear_1"})
+    assert next(events, None) is None
@@ -0,0 +1,60 @@
+import pytest
+
+import scenario_index
+
+def entry(name, headcount, seed=None, final_revenue=None):
+    return {
+        "name": name,
+        "growth_type": scenario_index.growth_type_of(name),
+        "seed": seed,
+        "quarters": len(headcount),
+        "headcount": headcount,
+        "final_headcount": headcount[-1],
+        "peak_headcount": max(headcount),
+        "final_revenue": final_revenue,
+        "file": f"{name}.json"
+    }
+
+INDEX = {e["file"]: e for e in [
+    entry("saas_growth_linear_1", [5, 8, 12], seed=1, final_revenue=1000),
+    entry("saas_growth_linear_2", [5, 9, 20, 25], seed=2, final_revenue=3000),
+    entry("saas_growth_decline_1", [6, 30, 10], seed=3),
+    entry("saas_growth_stagnation-growth_1", [4, 4, 40], final_revenue=2000)
+]}
+
+def names(entries):
+    return [e["name"] for e in entries]
+
+def test_growth_type_of():
+    assert scenario_index.growth_type_of("saas_growth_stagnation-growth_12") == "stagnation-growth"
+    assert scenario_index.growth_type_of("other_file") is None
+
+def test_parse_filter():
+    field, compare, value = scenario_index.parse_filter("peak_headcount@2 >= 9")
+    assert (field, value) == ("peak_headcount@2", 9) and compare(9, value)
+    assert scenario_index.parse_filter("growth_type=linear")[2] == "linear"
+    for spec in ["growth_type", "unknown=1", "headcount>3", "final_headcount@2=3"]:
+        with pytest.raises(ValueError):
+            scenario_index.parse_filter(spec)
+
+def test_filters_combine():
+    filters = [scenario_index.parse_filter(spec) for spec in ["growth_type=linear", "final_headcount>12"]]
+    assert names(scenario_index.query(INDEX, filters)) == ["saas_growth_linear_2"]
+
+def test_quarter_fields():
+    query = scenario_index.query
+    parse = scenario_index.parse_filter
+    assert names(query(INDEX, [parse("headcount@2>=9")])) == ["saas_growth_decline_1", "saas_growth_linear_2"]
+    assert names(query(INDEX, [parse("peak_headcount@3<=12")])) == ["saas_growth_linear_1"]
+    # Scenarios shorter than the quarter never match
+    assert names(query(INDEX, [parse("headcount@4>0")])) == ["saas_growth_linear_2"]
+
+def test_sort_puts_missing_values_last_and_limit():
+    entries = scenario_index.query(INDEX, sort="-final_revenue")
+    assert names(entries) == ["saas_growth_linear_2", "saas_growth_stagnation-growth_1", "saas_growth_linear_1",
+                              "saas_growth_decline_1"]
+    assert names(scenario_index.query(INDEX, sort="seed", limit=2)) == ["saas_growth_linear_1", "saas_growth_linear_2"]
+
+def test_missing_fields_never_match():
+    assert names(scenario_index.query(INDEX, [scenario_index.parse_filter("final_revenue<5000")])) == [
+        "saas_growth_linear_1", "saas_growth_linear_2", "saas_growth_stagnation-growth_1"]
@@ -0,0 +1,63 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import stream
+
+VALUES = [
+    {"Quarter": "Q1-2022", "Countries": {"USA": 4, "India": 1}, "Capital": 1.25},
+    [1, [2, 3], {"a": "]}, \"quoted\""}],
+    12345,
+    -0.5e-3,
+    "text with , and ]",
+    True,
+    None,
+    {}
+]
+
+def parse_in_chunks(text, size):
+    parser = stream.ArrayParser()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    elements.extend(parser.close())
+    return elements
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_array_parser_across_every_chunk_size(indent):
+    text = json.dumps(VALUES, indent=indent)
+    for size in range(1, len(text) + 1):
+        assert parse_in_chunks(text, size) == VALUES
+
+def test_numbers_split_across_chunks_are_not_cut():
+    assert parse_in_chunks("[12345, 67]", 3) == [12345, 67]
+
+@pytest.mark.parametrize("text", ["[1, 2", "[1 2]", "{}", "[1] 2"])
+def test_array_parser_rejects_malformed_arrays(text):
+    with pytest.raises(ValueError):
+        parse_in_chunks(text, 2)
+
+def test_empty_array():
+    assert parse_in_chunks(" [ ] ", 1) == []
+
+@pytest.mark.parametrize("indent", [None, 0, 2, 4])
+@pytest.mark.parametrize("items", [[], [{}], VALUES])
+def test_write_json_array_matches_json_dump(items, indent):
+    expected = io.StringIO()
+    json.dump(items, expected, indent=indent)
+    written = io.StringIO()
+    assert stream.write_json_array(written, iter(items), indent) == len(items)
+    assert written.getvalue() == expected.getvalue()
+
+def test_iter_quarters_and_load_json_async(tmp_path):
+    array = tmp_path / "scenario.json"
+    array.write_text(json.dumps(VALUES, indent=4))
+    lines = tmp_path / "scenario.jsonl"
+    with open(lines, 'w') as file:
+        stream.write_json_lines(file, VALUES)
+
+    for path in (array, lines):
+        assert list(stream.iter_quarters(str(path), chunk_size=7)) == VALUES
+        assert asyncio.run(stream.load_json_async(str(path), chunk_size=7)) == VALUES
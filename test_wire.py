@@ -0,0 +1,45 @@
+import gzip
+
+import pytest
+
+import randomize_2
+import rev
+import series
+import wire
+
+@pytest.fixture(scope="module")
+def scenario():
+    quarters = randomize_2.generate_scenario("piecewise_funding", seed=4, num_quarters=16)
+    for quarter in quarters[:10]:
+        quarter.update(rev.calculate_revenue(quarter))
+    return quarters
+
+def test_delta_round_trip():
+    assert wire.delta_encode([5, 7, 7, 10]) == [5, 2, 0, 3]
+    assert wire.delta_decode(wire.delta_encode([3, -2, 8, 8])) == [3, -2, 8, 8]
+
+def test_quarter_labels_wrap_years():
+    assert wire.quarter_labels("Q3-2022", 4) == ["Q3-2022", "Q4-2022", "Q1-2023", "Q2-2023"]
+
+def test_scenario_round_trip(scenario):
+    # Only some quarters are priced, so revenue fields are missing from the rest
+    assert wire.decode_scenario(wire.encode_scenario(scenario)) == scenario
+
+def test_irregular_labels_round_trip():
+    quarters = [{"Quarter": "Q1-2022", "Countries": {"USA": 1}, "Occupations": {"Sales": 1}},
+                {"Quarter": "later", "Countries": {"USA": 2}, "Occupations": {"Sales": 2}}]
+    assert wire.decode_scenario(wire.encode_scenario(quarters)) == quarters
+
+def test_series_round_trip(scenario):
+    priced = [dict(quarter, **rev.calculate_revenue(quarter)) for quarter in scenario]
+    built = series.build_series(priced)
+    payload = wire.encode_series(built)
+    assert "capital_to_revenue" in payload["derived"]
+    assert wire.decode_series(payload) == built
+
+def test_gzip_is_deterministic():
+    body = b"x" * 2000
+    assert wire.compress(body, "gzip") == wire.compress(body, "gzip")
+    assert gzip.decompress(wire.compress(body, "gzip")) == body
+    with pytest.raises(ValueError):
+        wire.compress(body, "deflate")
@@ -0,0 +1,224 @@
+import gzip
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content codings the API can send, most preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Bodies smaller than this are sent as they are
+MIN_COMPRESS_SIZE = 512
+
+# Bodies are compressed once and cached, so spend the time on the smallest output
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Wire formats accepted in ?format=
+FORMATS = ("json", "compact")
+
+# Series whose headcount arrays are delta-encoded in the compact format
+SERIES_DELTAS = ("headcount", "countries", "occupations", "revenue_per_employee")
+
+# Series of decimals sent as integers in the compact format: revenue in
+# millions is a whole number of thousands, capital has two decimals
+SERIES_SCALES = {"revenue": 1000, "capital": 100}
+
+QUARTER_LABEL = re.compile(r"^Q([1-4])-(\d+)$")
+
+def compress(body, encoding):
+    """
+    Compresses a response body.
+
+    Args:
+        body (bytes): The body.
+        encoding (str): "br" or "gzip", see ENCODINGS.
+
+    Returns:
+        bytes: The compressed body. Gzip output has no timestamp, so the
+            same body always compresses to the same bytes.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the preferred supported coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: werkzeug's request.accept_encodings.
+
+    Returns:
+        str: A member of ENCODINGS, or None to send the body uncompressed.
+    """
+    for encoding in ENCODINGS:
+        if accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+def delta_encode(values):
+    """[5, 7, 7, 10] -> [5, 2, 0, 3]"""
+    previous = 0
+    deltas = []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return deltas
+
+def delta_decode(deltas):
+    """[5, 2, 0, 3] -> [5, 7, 7, 10]"""
+    value = 0
+    values = []
+    for delta in deltas:
+        value += delta
+        values.append(value)
+    return values
+
+def quarter_labels(first, count):
+    """
+    Returns count consecutive quarter labels starting at first, e.g. Q4-2022, Q1-2023, ...
+    """
+    match = QUARTER_LABEL.match(first)
+    index = int(match.group(2)) * 4 + int(match.group(1)) - 1
+    return [f"Q{i % 4 + 1}-{i // 4}" for i in range(index, index + count)]
+
+def _encode_labels(labels):
+    # Consecutive labels, as every generated scenario has, become {'first', 'count'}
+    if labels and QUARTER_LABEL.match(labels[0]) and quarter_labels(labels[0], len(labels)) == labels:
+        return {"first": labels[0], "count": len(labels)}
+    return labels
+
+def _decode_labels(labels):
+    if isinstance(labels, dict):
+        return quarter_labels(labels["first"], labels["count"])
+    return labels
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def encode_scenario(quarters):
+    """
+    Encodes a scenario's quarter dicts in the compact wire format.
+
+    Every field becomes one array across quarters instead of a key repeated
+    in every quarter. Countries and occupations become one array per name,
+    and every all-integer array is sent as deltas from the previous quarter,
+    which are small numbers for headcounts that barely change.
+
+    Countries or occupations missing from a quarter decode as 0, as in
+    series.build_series; other fields missing from a quarter are sent as null
+    and left out when decoding.
+
+    Returns:
+        dict: {'format': 'compact', 'length', 'deltas' (keys holding deltas),
+            'Quarter', 'Countries', 'Occupations', and one array per other field}.
+    """
+    country_names = list(dict.fromkeys(c for q in quarters for c in q.get("Countries", {})))
+    occupation_names = list(dict.fromkeys(o for q in quarters for o in q.get("Occupations", {})))
+    fields = list(dict.fromkeys(key for q in quarters for key in q
+                                if key not in ("Quarter", "Countries", "Occupations")))
+
+    payload = {
+        "format": "compact",
+        "length": len(quarters),
+        "deltas": ["Countries", "Occupations"],
+        "Quarter": _encode_labels([q.get("Quarter", "") for q in quarters]),
+        "Countries": {c: delta_encode([q.get("Countries", {}).get(c, 0) for q in quarters]) for c in country_names},
+        "Occupations": {o: delta_encode([q.get("Occupations", {}).get(o, 0) for q in quarters])
+                        for o in occupation_names}
+    }
+    for field in fields:
+        values = [q.get(field) for q in quarters]
+        if all(_is_int(value) for value in values):
+            payload[field] = delta_encode(values)
+            payload["deltas"].append(field)
+        else:
+            payload[field] = values
+    return payload
+
+def decode_scenario(payload):
+    """
+    Decodes encode_scenario's output back into quarter dicts.
+    """
+    payload = _undelta(payload)
+    fields = [key for key in payload if key not in ("format", "length", "deltas", "Quarter", "Countries", "Occupations")]
+    labels = _decode_labels(payload["Quarter"])
+    quarters = []
+    for i in range(payload["length"]):
+        quarter = {
+            "Quarter": labels[i],
+            "Countries": {name: values[i] for name, values in payload["Countries"].items()},
+            "Occupations": {name: values[i] for name, values in payload["Occupations"].items()}
+        }
+        for field in fields:
+            if payload[field][i] is not None:
+                quarter[field] = payload[field][i]
+        quarters.append(quarter)
+    return quarters
+
+def encode_series(series):
+    """
+    Encodes the output of series.build_series in the compact wire format:
+    the same keys, with the headcount arrays in SERIES_DELTAS delta-encoded.
+
+    The series in SERIES_SCALES are multiplied by their scale and sent as
+    deltas of integers, listed in 'scale', whenever dividing by the scale
+    gives back exactly the same floats. The capital to revenue ratio is left
+    out when the client can recompute it exactly from capital and revenue,
+    the same way rev.calculate_revenue does ('derived').
+    """
+    payload = dict(series, format="compact", quarters=_encode_labels(series["quarters"]),
+                   deltas=list(SERIES_DELTAS), scale={}, derived=[])
+    for key in SERIES_DELTAS:
+        payload[key] = _map_arrays(series[key], delta_encode)
+
+    for key, scale in SERIES_SCALES.items():
+        scaled = _map_arrays(series[key], lambda values: [round(value * scale) for value in values])
+        if _map_arrays(scaled, lambda values: [value / scale for value in values]) == series[key]:
+            payload[key] = _map_arrays(scaled, delta_encode)
+            payload["deltas"].append(key)
+            payload["scale"][key] = scale
+
+    if "revenue" in payload["scale"] and _capital_to_revenue(series) == series["capital_to_revenue"]:
+        del payload["capital_to_revenue"]
+        payload["derived"].append("capital_to_revenue")
+    return payload
+
+def _capital_to_revenue(series):
+    # The same arithmetic as rev.calculate_revenue and decodeCompact in templates/index.html
+    ratios = []
+    for capital, revenue in zip(series["capital"], series["revenue"]["mid"]):
+        revenue = round(revenue * 1000) * 1000
+        ratios.append(capital * 1000000 / revenue if revenue > 0 else 0)
+    return ratios
+
+def decode_series(payload):
+    """
+    Decodes encode_series' output back into the output of series.build_series.
+    """
+    series = _undelta(payload)
+    for key, scale in series.pop("scale").items():
+        series[key] = _map_arrays(series[key], lambda values: [value / scale for value in values])
+    series["quarters"] = _decode_labels(series["quarters"])
+    if "capital_to_revenue" in series.pop("derived"):
+        series["capital_to_revenue"] = _capital_to_revenue(series)
+    del series["format"], series["deltas"]
+    return series
+
+def _map_arrays(value, func):
+    # Applies func to an array, or to every array of a {name: array} dict
+    if isinstance(value, dict):
+        return {name: func(values) for name, values in value.items()}
+    return func(value)
+
+def _undelta(payload):
+    # The same decoding as decodeCompact in templates/index.html
+    payload = dict(payload)
+    for key in payload["deltas"]:
+        payload[key] = _map_arrays(payload[key], delta_decode)
+    return payload